@@ -68,8 +68,75 @@ class EventEmitter:
             self._cbks[evt](*a, **kv)
 
 
+class Stats:
+    """Connection quality: RTT of PING/login matched by msg id, frame/byte counters.
+    pin: push report() to this virtual pin every `every` ms while connected (None = off)
+    ping: also send a PING every `ping` ms so RTT is sampled while the link is busy (0 = heartbeat only)
+    """
+    def __init__(self, pin=None, every=10000, ping=0, n=32, timeout=5000, inflight=8):
+        self.pin = pin
+        self.every = every
+        self.ping = ping
+        self.timeout = timeout
+        self.inflight = inflight
+        self.fl = {}
+        self.buf = [0] * n
+        self.t_push = self.t_ping = 0
+        self.reset()
+
+    def reset(self):
+        for j in range(len(self.buf)):
+            self.buf[j] = 0
+        self.k = self.n = 0
+        self.rtt = self.rtt_min = self.rtt_max = self.srtt = 0
+        self.login = -1
+        self.tx_n = self.tx_b = self.rx_n = self.rx_b = 0
+        self.conns = self.drops = self.lost = 0
+
+    def sent(self, cmd, id, n, now):
+        self.tx_n += 1
+        self.tx_b += n
+        if cmd == MSG_PING or cmd == MSG_HW_LOGIN or cmd == MSG_LOGIN:
+            if len(self.fl) >= self.inflight:
+                self.expire(now, True)
+            self.fl[id] = now
+
+    def rsp(self, id, now):
+        t = self.fl.pop(id, None)
+        if t is None:
+            return -1
+        r = now - t
+        self.rtt = r
+        if not self.n or r < self.rtt_min:
+            self.rtt_min = r
+        if r > self.rtt_max:
+            self.rtt_max = r
+        self.srtt = r if not self.n else self.srtt + (r - self.srtt) // 8
+        self.n += 1
+        self.buf[self.k] = r
+        self.k = (self.k + 1) % len(self.buf)
+        return r
+
+    def expire(self, now, oldest=False):
+        for id in list(self.fl):
+            if oldest or now - self.fl[id] > self.timeout:
+                del self.fl[id]
+                self.lost += 1
+                if oldest:
+                    return
+
+    def p95(self):
+        v = sorted(self.buf[:min(self.n, len(self.buf))])
+        return v[(len(v) * 95 + 99) // 100 - 1] if v else 0
+
+    def report(self):
+        return "rtt %d/%d/%d p95 %d n %d tx %d/%d rx %d/%d conn %d drop %d lost %d" % (
+            self.rtt_min, self.srtt, self.rtt_max, self.p95(), self.n, self.tx_n, self.tx_b,
+            self.rx_n, self.rx_b, self.conns, self.drops, self.lost)
+
+
 class BlynkProtocol(EventEmitter):
-    def __init__(self, auth, tmpl_id=None, fw_ver=None, heartbeat=50, buffin=1024, log=None):
+    def __init__(self, auth, tmpl_id=None, fw_ver=None, heartbeat=50, buffin=1024, log=None, stats=None):
         EventEmitter.__init__(self)
         self.heartbeat = heartbeat*1000
         self.buffin = buffin
@@ -77,6 +144,7 @@ class BlynkProtocol(EventEmitter):
         self.auth = auth
         self.tmpl_id = tmpl_id
         self.fw_ver = fw_ver
+        self.stats = stats
         self.state = DISCONNECTED
         self.connect()
 
@@ -95,6 +163,12 @@ class BlynkProtocol(EventEmitter):
     def log_event(self, *val):
         self._send(MSG_EVENT_LOG, *val)
 
+    def bridge_bind(self, ch, auth):
+        self._send(MSG_BRIDGE, ch, 'i', auth)
+
+    def bridge_write(self, ch, pin, *val):
+        self._send(MSG_BRIDGE, ch, 'vw', pin, *val)
+
     def _send(self, cmd, *args, **kwargs):
         if 'id' in kwargs:
             id = kwargs.get('id')
@@ -114,6 +188,7 @@ class BlynkProtocol(EventEmitter):
         self.log('<', cmd, id, '|', *args)
         msg = struct.pack("!BHH", cmd, id, dlen) + data
         self.lastSend = gettime()
+        if self.stats: self.stats.sent(cmd, id, len(msg), self.lastSend)
         self._write(msg)
 
     def connect(self):
@@ -122,10 +197,15 @@ class BlynkProtocol(EventEmitter):
         (self.lastRecv, self.lastSend, self.lastPing) = (gettime(), 0, 0)
         self.bin = b""
         self.state = CONNECTING
+        if self.stats:
+            self.stats.conns += 1
+            self.stats.lost += len(self.stats.fl)
+            self.stats.fl = {}
         self._send(MSG_HW_LOGIN, self.auth)
 
     def disconnect(self):
         if self.state == DISCONNECTED: return
+        if self.stats and self.bin: self.stats.drops += 1
         self.bin = b""
         self.state = DISCONNECTED
         self.emit('disconnected')
@@ -140,9 +220,19 @@ class BlynkProtocol(EventEmitter):
              now - self.lastRecv > self.heartbeat)):
             self._send(MSG_PING)
             self.lastPing = now
-        
+        st = self.stats
+        if st and self.state == CONNECTED:
+            if st.ping and now - st.t_ping >= st.ping:
+                st.t_ping = now
+                st.expire(now)
+                self._send(MSG_PING)
+            if st.pin is not None and now - st.t_push >= st.every:
+                st.t_push = now
+                self.virtual_write(st.pin, st.report())
+
         if data != None and len(data):
             self.bin += data
+            if st: st.rx_b += len(data)
 
         while True:
             if len(self.bin) < 5:
@@ -154,12 +244,15 @@ class BlynkProtocol(EventEmitter):
             self.lastRecv = now
             if cmd == MSG_RSP:
                 self.bin = self.bin[5:]
+                if st: st.rx_n += 1
 
                 self.log('>', cmd, i, '|', dlen)
+                r = st.rsp(i, now) if st else -1
                 if self.state == CONNECTING and i == 1:
                     if dlen == STA_SUCCESS:
                         self.state = CONNECTED
-                        dt = now - self.lastSend
+                        dt = now - self.lastSend if r < 0 else r
+                        if st: st.login = r
                         info = ['ver', __version__, 'h-beat', self.heartbeat//1000, 'buff-in', self.buffin, 'dev', sys.platform+'-py']
                         if self.tmpl_id:
                             info.extend(['tmpl', self.tmpl_id])
@@ -186,6 +279,7 @@ class BlynkProtocol(EventEmitter):
 
                 data = self.bin[5:5+dlen]
                 self.bin = self.bin[5+dlen:]
+                if st: st.rx_n += 1
 
                 args = list(map(lambda x: x.decode('utf8'), data.split(b'\0')))
 
@@ -202,6 +296,7 @@ class BlynkProtocol(EventEmitter):
                     self.emit("redirect", args[0], int(args[1]))
                 else:
                     print("Unexpected command: ", cmd)
+                    if st: st.drops += 1
                     return self.disconnect()
 
 import socket
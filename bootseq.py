@@ -0,0 +1,107 @@
+# 開機排程
+# 每個階段是一般函式或產生器 (yield 表示在等外部事件，讓出給其他階段)，after 指定必須先完成的階段
+# run() 依加入順序輪流推進可執行的階段，全部都在等待時 sleep poll ms
+# mark(name) 記錄事件時間 (例如控制通道連上即 'ready')；timeline 為 [(名稱, 開始 ms, 結束 ms), ...]
+# 階段丟出例外時記為失敗 (結束時間為 -1)，依賴它的階段不執行
+# serial=True 時每個階段都排在前一個加入的階段之後 (循序開機，供比較)
+
+import time
+
+try:
+    ticks_ms, ticks_diff, sleep_ms = time.ticks_ms, time.ticks_diff, time.sleep_ms
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+
+class Seq:
+    def __init__(self, poll=5, t0=None, serial=False):
+        self.poll = poll
+        self.serial = serial
+        self.t0 = ticks_ms() if t0 is None else t0
+        self.ph = []  # [名稱, 函式, 前置, 產生器, 開始, 結束]
+        self.ev = []
+        self.res = {}
+
+    def add(self, name, fn, after=()):
+        if self.serial and self.ph:
+            after = tuple(after) + (self.ph[-1][0],)
+        self.ph.append([name, fn, after, None, None, None])
+
+    def mark(self, name):
+        self.ev.append((name, ticks_diff(ticks_ms(), self.t0)))
+
+    def at(self, name):
+        for n, t in self.ev:
+            if n == name:
+                return t
+        for p in self.ph:
+            if p[0] == name:
+                return p[5]
+        return None
+
+    def _end(self, p, ok):
+        p[5] = ticks_diff(ticks_ms(), self.t0) if ok else -1
+
+    def _state(self, name):
+        for p in self.ph:
+            if p[0] == name:
+                return p[5]
+        return -1
+
+    def run(self):
+        while True:
+            busy = waiting = False
+            for p in self.ph:
+                if p[5] is not None:
+                    continue
+                ok = True
+                for a in p[2]:
+                    e = self._state(a)
+                    if e is None:
+                        ok = False
+                    elif e < 0:
+                        p[5] = -1
+                        ok = False
+                        break
+                if not ok:
+                    if p[5] is None:
+                        waiting = True
+                    continue
+                waiting = True
+                try:
+                    if p[4] is None:
+                        p[4] = ticks_diff(ticks_ms(), self.t0)
+                        r = p[1]()
+                        if not hasattr(r, "send"):
+                            self.res[p[0]] = r
+                            self._end(p, True)
+                            busy = True
+                            continue
+                        p[3] = r
+                    next(p[3])
+                except StopIteration as e:
+                    self.res[p[0]] = e.value
+                    self._end(p, True)
+                    busy = True
+                except Exception:
+                    self._end(p, False)
+                    busy = True
+            if not waiting:
+                return self
+            if not busy:
+                sleep_ms(self.poll)
+
+    @property
+    def timeline(self):
+        return [(p[0], p[4], p[5]) for p in self.ph]
+
+    def report(self):
+        """'wifi:0-712 hw:0-21 ... ready@1034'，失敗的階段顯示 name:t0-x"""
+        s = []
+        for n, a, b in self.timeline:
+            s.append("%s:%s-%s" % (n, "-" if a is None else a, "x" if b is None or b < 0 else b))
+        for n, t in self.ev:
+            s.append("%s@%d" % (n, t))
+        return " ".join(s)
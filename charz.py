@@ -0,0 +1,141 @@
+# 馬達/伺服特性量測與校正表
+# Sweep - 依序對每個通道 (名稱, 設定 duty 函式, 讀值函式, duty 清單) 掃過清單中的 duty：
+#         設定後等 settle ms，再每 period ms 讀 n 次；每筆樣本立即寫入 log，不在 RAM 累積
+#         log 檔頭為一行以逗號分隔的通道名稱，之後每筆 REC: 通道 u8, duty u16, 讀值 u16, ms u32 (little endian)
+#         非阻塞：主迴圈每圈呼叫 step(now)，全部完成呼叫 on_done(self)
+# Curve - duty -> 讀值 的分段線性表 (主機 pongBot/Host/charfit.py 由 log 擬合)，duty(v) 反查讀值 v 所需的 duty
+# load() 讀取校正檔 (每行 "名稱 d:v d:v ...")，回傳 {名稱: Curve}；檔案不存在回傳 {}
+
+import struct
+import time
+
+try:
+    ticks_ms, ticks_diff, ticks_add = time.ticks_ms, time.ticks_diff, time.ticks_add
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+
+FMT = "<BHHI"
+REC = struct.calcsize(FMT)
+
+
+def adc(ch=0):
+    """回傳 ADC 讀值函式 (伺服回授電位器)"""
+    from machine import ADC
+    return ADC(ch).read
+
+
+class Sweep:
+    def __init__(self, path, chans, settle=600, n=8, period=20, on_done=None):
+        self.path = path
+        self.chans = chans
+        self.settle = settle
+        self.n = n
+        self.period = period
+        self.on_done = on_done
+        self.buf = bytearray(REC)
+        self.f = None
+        self.on = False
+        self.rows = 0
+
+    def start(self, now=None):
+        if now is None:
+            now = ticks_ms()
+        self.stop()
+        self.f = open(self.path, "wb")
+        self.f.write((",".join([c[0] for c in self.chans]) + "\n").encode())
+        self.t0 = now
+        self.c = self.k = 0
+        self.rows = 0
+        self.on = True
+        self._set(now)
+
+    def _set(self, now):
+        ch = self.chans[self.c]
+        ch[1](ch[3][self.k])
+        self.i = 0
+        self.t = ticks_add(now, self.settle)
+
+    def step(self, now=None):
+        if not self.on:
+            return
+        if now is None:
+            now = ticks_ms()
+        if ticks_diff(now, self.t) < 0:
+            return
+        ch = self.chans[self.c]
+        struct.pack_into(FMT, self.buf, 0, self.c, ch[3][self.k], ch[2](), ticks_diff(now, self.t0))
+        self.f.write(self.buf)
+        self.rows += 1
+        self.i += 1
+        if self.i < self.n:
+            self.t = ticks_add(now, self.period)
+            return
+        self.f.flush()
+        self.k += 1
+        if self.k == len(ch[3]):
+            ch[1](0)
+            self.k = 0
+            self.c += 1
+            if self.c == len(self.chans):
+                self.stop()
+                if self.on_done:
+                    self.on_done(self)
+                return
+        self._set(now)
+
+    def stop(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+        if self.on:
+            self.on = False
+            if self.c < len(self.chans):
+                self.chans[self.c][1](0)
+
+
+class Curve:
+    def __init__(self, pts):
+        pts = sorted(pts)
+        self.d = [p[0] for p in pts]
+        self.v = [p[1] for p in pts]
+        self.vmax = max(self.v)
+
+    def at(self, d):
+        ds, vs = self.d, self.v
+        if d <= ds[0]:
+            return vs[0]
+        for j in range(1, len(ds)):
+            if d <= ds[j]:
+                return vs[j - 1] + (vs[j] - vs[j - 1]) * (d - ds[j - 1]) // (ds[j] - ds[j - 1])
+        return vs[-1]
+
+    def duty(self, v):
+        """讀值 v 所需的 duty；超出量測範圍時取最接近的端點"""
+        ds, vs = self.d, self.v
+        for j in range(1, len(ds)):
+            a, b = vs[j - 1], vs[j]
+            if a <= v <= b or b <= v <= a:
+                if a == b:
+                    return ds[j - 1]
+                return ds[j - 1] + (ds[j] - ds[j - 1]) * (v - a) // (b - a)
+        return ds[0] if abs(v - vs[0]) < abs(v - vs[-1]) else ds[-1]
+
+
+def load(path):
+    cal = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                a = line.split()
+                if len(a) < 3:
+                    continue
+                pts = []
+                for p in a[1:]:
+                    d, v = p.split(":")
+                    pts.append((int(d), int(v)))
+                cal[a[0]] = Curve(pts)
+    except (OSError, ValueError):
+        pass
+    return cal
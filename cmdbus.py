@@ -0,0 +1,113 @@
+# 指令匯流排：Blynk、MQTT 與本機輸入 (長按匯入、群組) 都把指令放進同一個佇列，由主迴圈每圈執行一次
+# 每個 (種類, 對象) 一格 (SLOTS)，同一格只留最後寫入的值 (last-writer-wins)，佇列大小固定
+# 格子的順序即執行順序：先設定 (伺服等級、轉速)，再開關 (伺服、馬達)，最後發球，讓同一圈的設定先生效
+# put() 在放入時檢查範圍 (超出的丟棄並計數)；STOP 不排隊，立即執行 (急停應註冊 clear() 清掉排隊中的指令)
+# run() 依序執行排隊中的指令 apply(種類, 對象, 值)，再呼叫一次 echo(bus, 執行數) 回報各連線：
+#   done[j] 為這一圈執行過的格，v[j] / src[j] 為其值與來源 (每圈都呼叫，執行數可能為 0；不配置記憶體)
+# q 為排隊中的格數，為 0 時主迴圈可略過 run()
+# 統計：放入 / 執行 / 被覆蓋 / 丟棄次數，排隊時間 (us) 的累計與最大
+
+import time
+from array import array
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+try:
+    ticks_us, ticks_diff = time.ticks_us, time.ticks_diff
+except AttributeError:
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+# 種類
+STOP = const(0)
+RUN = const(1)    # 馬達開關 0/1
+SERVO = const(2)  # 對象 0 開關 0/1，1 等級 1-5
+SPEED = const(3)  # 對象 0 上、1 下馬達 1-100
+FIRE = const(4)   # 多球程式編號 (0 停止)
+
+# 來源
+BLYNK = const(0)
+MQTT = const(1)
+LOCAL = const(2)
+
+SLOTS = ((SERVO, 1), (SPEED, 0), (SPEED, 1), (SERVO, 0), (RUN, 0), (FIRE, 0))
+LO = (1, 1, 1, 0, 0, 0)
+HI = (5, 100, 100, 1, 1, 255)
+_IX = {}
+for _j, _s in enumerate(SLOTS):
+    _IX[_s[0] * 2 + _s[1]] = _j
+
+
+class Bus:
+    def __init__(self, apply, echo=None):
+        n = len(SLOTS)
+        self.apply = apply
+        self.echo = echo
+        self.on = bytearray(n)
+        self.src = bytearray(n)
+        self.v = array("i", [0] * n)
+        self.t = array("L", [0] * n)
+        self.done = bytearray(n)
+        self.q = 0
+        self.reset()
+
+    def reset(self):
+        self.n_put = self.n_run = self.n_lww = self.n_bad = 0
+        self.lat = self.lat_max = 0
+
+    def put(self, k, i, v, src=LOCAL):
+        """排入一個指令；格式或範圍錯誤回傳 False"""
+        if k == STOP:
+            self.n_put += 1
+            self.apply(STOP, i, src)
+            return True
+        j = _IX.get(k * 2 + i)
+        try:
+            v = int(v)
+        except (TypeError, ValueError):
+            j = None
+        if j is None or not LO[j] <= v <= HI[j]:
+            self.n_bad += 1
+            return False
+        self.n_put += 1
+        if self.on[j]:
+            self.n_lww += 1
+        else:
+            self.q += 1
+        self.v[j] = v
+        self.src[j] = src
+        self.t[j] = ticks_us() & 0x3FFFFFFF
+        self.on[j] = 1
+        return True
+
+    def run(self):
+        n = 0
+        self.q = 0
+        for j in range(len(SLOTS)):
+            self.done[j] = self.on[j]
+            if not self.on[j]:
+                continue
+            self.on[j] = 0
+            n += 1
+            d = ticks_diff(ticks_us() & 0x3FFFFFFF, self.t[j]) & 0x3FFFFFFF
+            self.lat += d
+            if d > self.lat_max:
+                self.lat_max = d
+            self.n_run += 1
+            k, i = SLOTS[j]
+            self.apply(k, i, self.v[j])
+        if self.echo:
+            self.echo(self, n)
+
+    def clear(self):
+        """丟棄排隊中的指令 (可由急停的計時器中斷呼叫，不配置記憶體)"""
+        for j in range(len(SLOTS)):
+            self.on[j] = 0
+        self.q = 0
+
+    def report(self):
+        return "put %d run %d lww %d bad %d lat %d/%d us" % (
+            self.n_put, self.n_run, self.n_lww, self.n_bad, self.lat // max(1, self.n_run), self.lat_max)
@@ -0,0 +1,59 @@
+# 滑桿輸入合併：拖動 V3/V4 滑桿時 App 連續送出大量 vw，每個都會設定轉速、寫 PWM、回寫標籤
+# Co(b, pins, win) 接在 BlynkProtocol 的分派 (emit) 與處理函式之間：
+# - pins 中的 Vpin 收到時只記下最新值，主迴圈每圈呼叫 flush(now) 才以最新值呼叫一次處理函式
+# - win>0 時同一 pin 距上次處理不到 win ms 的更新留到 win ms 後 (只送最新值)；靜止後的第一個更新仍在當圈處理
+# - 其他事件 (V10/V12 等按鈕、connected ...) 直接分派，不經過暫存
+# 處理函式仍由原本的 emit 查 _cbks 呼叫，prof 的計時包裝照常生效
+# n_in / n_out 為收到與實際處理的次數
+
+import time
+
+try:
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    ticks_diff = lambda a, b: a - b
+
+
+class Co:
+    def __init__(self, b, pins, win=0):
+        self.emit = b.emit
+        self.win = win
+        self.pins = set(["V%d" % p for p in pins])
+        self.v = {}
+        self.t = {}
+        self.n_in = 0
+        self.n_out = 0
+        b.emit = self._emit
+
+    def _emit(self, evt, *a, **k):
+        if evt in self.pins:
+            self.n_in += 1
+            self.v[evt] = a
+        else:
+            self.emit(evt, *a, **k)
+
+    def due(self, now):
+        """距下一個暫存值可處理的 ms (沒有暫存回傳 None)"""
+        w = None
+        for e in self.v:
+            t = self.t.get(e)
+            d = 0 if t is None or not self.win else max(0, self.win - ticks_diff(now, t))
+            if w is None or d < w:
+                w = d
+        return w
+
+    def flush(self, now):
+        if not self.v:
+            return
+        for e in list(self.v):
+            t = self.t.get(e)
+            if self.win and t is not None and ticks_diff(now, t) < self.win:
+                continue
+            a = self.v.pop(e)
+            self.t[e] = now
+            self.n_out += 1
+            self.emit(e, *a)
+
+    def clear(self):
+        self.v = {}
+        self.t = {}
@@ -0,0 +1,130 @@
+# 多球訓練程序：依程式定時送球，每顆球有自己的上/下馬達速度與伺服等級
+# 程式為 bytes，每顆球 4 bytes: 上馬達(0-100) 下馬達(0-100) 伺服等級(1-5) 間隔(20 ms 單位，距上一顆)
+# 第一顆的間隔即開始前的起轉時間；送球脈衝結束後立刻設定下一顆的速度，馬達在球飛行時先漸變
+# 發球時間依計畫時間累加 (不累積誤差)，due() 回傳距下一事件的毫秒數，主迴圈據此縮短等待
+# ready() 可選：到時間但輪速未穩定時最多延後 hold ms 再發球
+
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+try:
+    ticks_ms, ticks_diff, ticks_add = time.ticks_ms, time.ticks_diff, time.ticks_add
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+
+REC = const(4)
+UNIT = const(20)
+
+
+def prog(*balls):
+    """prog((上, 下, 等級, 間隔ms), ...) -> 程式 bytes"""
+    b = bytearray(len(balls) * REC)
+    for i, (t, m, l, g) in enumerate(balls):
+        b[i * REC:i * REC + REC] = bytes((t, m, l, min(255, g // UNIT)))
+    return bytes(b)
+
+
+class Drill:
+    def __init__(self, fire, setup, pulse=150, done=None, ready=None, hold=500):
+        self.fire = fire      # fire(1/0) 送球腳位
+        self.setup = setup    # setup(等級, 上, 下) 設定下一顆球
+        self.pulse = pulse
+        self.done = done      # done(drill) 程式結束時呼叫
+        self.ready = ready
+        self.hold = hold
+        self.p = None
+        self.on = False
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.t_first = None
+        self.t_last = None
+        self.jit_sum = 0
+        self.jit_max = 0
+
+    def start(self, p, reps=1, now=None):
+        if now is None:
+            now = ticks_ms()
+        if self.on:
+            self.stop()
+        self.p = p
+        self.reps = reps
+        self.i = 0
+        self.pulsing = False
+        self.reset()
+        self.on = True
+        self._prep()
+        self.t_plan = ticks_add(now, p[3] * UNIT)
+
+    def stop(self):
+        if self.on and self.pulsing:
+            self.fire(0)
+        self.on = False
+        self.pulsing = False
+
+    def _prep(self):
+        j = self.i * REC
+        p = self.p
+        self.setup(p[j + 2], p[j], p[j + 1])
+
+    def step(self, now=None):
+        if not self.on:
+            return
+        if now is None:
+            now = ticks_ms()
+        if self.pulsing:
+            if ticks_diff(now, self.t_off) < 0:
+                return
+            self.fire(0)
+            self.pulsing = False
+            self.i += 1
+            if self.i * REC >= len(self.p):
+                self.reps -= 1
+                if self.reps <= 0:
+                    self.on = False
+                    if self.done:
+                        self.done(self)
+                    return
+                self.i = 0
+            self._prep()
+            self.t_plan = ticks_add(self.t_plan, self.p[self.i * REC + 3] * UNIT)
+        late = ticks_diff(now, self.t_plan)
+        if late >= 0:
+            if self.ready and late < self.hold and not self.ready():
+                return
+            self.fire(1)
+            self.pulsing = True
+            self.t_off = ticks_add(now, self.pulse)
+            self.jit_sum += late
+            if late > self.jit_max:
+                self.jit_max = late
+            if self.t_first is None:
+                self.t_first = now
+            self.t_last = now
+            self.n += 1
+
+    def due(self, now=None):
+        """距下一事件的毫秒數；未執行時回傳 -1"""
+        if not self.on:
+            return -1
+        if now is None:
+            now = ticks_ms()
+        d = ticks_diff(self.t_off if self.pulsing else self.t_plan, now)
+        if d < 0 and self.ready:
+            return 5
+        return max(0, d)
+
+    def bpm(self):
+        if self.n < 2:
+            return 0
+        return (self.n - 1) * 60000 // max(1, ticks_diff(self.t_last, self.t_first))
+
+    def report(self):
+        return b"%d,%d,%d,%d" % (self.n, self.bpm(), self.jit_sum // max(1, self.n), self.jit_max)
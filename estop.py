@@ -0,0 +1,84 @@
+# 緊急停止子系統
+# - 主迴圈每圈 feed() 硬體看門狗，主迴圈卡死時由 WDT 重開機 (TB6612 輸入內建下拉，馬達停止)
+# - 計時器中斷每 period ms 檢查控制連線，超過 link_ms 沒收到封包即 trip()
+# - trip() 立即執行所有已註冊的停止動作，並清掉排隊中的動作
+# 停機延遲上限：斷線 link_ms + period；主迴圈卡死 wdt_ms
+
+import time
+
+try:
+    from machine import Timer, WDT
+except ImportError:
+    Timer = WDT = None
+
+try:
+    ticks_ms, ticks_diff = time.ticks_ms, time.ticks_diff
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+
+
+class EStop:
+    def __init__(self, link=None, link_ms=5000, period=100, wdt_ms=8000):
+        self.link = link
+        self.link_ms = link_ms
+        self.period = period
+        self.wdt_ms = wdt_ms
+        self.tripped = False
+        self.reason = None
+        self.t_trip = None
+        self._outs = []
+        self._wdt = None
+        self._tim = None
+
+    def add(self, f):
+        self._outs.append(f)
+        return f
+
+    def start(self):
+        if WDT and self.wdt_ms:
+            try:
+                self._wdt = WDT(timeout=self.wdt_ms)
+            except TypeError:
+                self._wdt = WDT()
+        if Timer and self.period:
+            try:
+                self._tim = Timer(-1)
+            except ValueError:
+                self._tim = Timer(0)
+            self._tim.init(period=self.period, mode=Timer.PERIODIC, callback=self._check)
+
+    def stop(self):
+        if self._tim:
+            self._tim.deinit()
+            self._tim = None
+
+    def feed(self):
+        if self._wdt:
+            self._wdt.feed()
+
+    def check(self):
+        if self.tripped or not self.link:
+            return
+        if ticks_diff(ticks_ms(), self.link()) > self.link_ms:
+            self.trip('link')
+
+    def _check(self, t):
+        try:
+            self.check()
+        except Exception:
+            self.trip('check')
+
+    def trip(self, why='cmd'):
+        self.tripped = True
+        self.reason = why
+        self.t_trip = ticks_ms()
+        for f in self._outs:
+            try:
+                f()
+            except Exception:
+                pass
+
+    def arm(self):
+        self.tripped = False
+        self.reason = None
@@ -0,0 +1,129 @@
+# 多台發球機同步 (Blynk bridge)
+# 指令都寫到對方同一個 Vpin (pin)，由 on(v) 處理；run(k, t) 為 app 在時間 t 開始多球程式 k (k=0 停止)
+# Lead - 領隊：把多球指令轉給同組的每台機器，讓每台 (含自己) 在同一時刻開始
+#        peers 為 [(bridge 通道 vpin, 對方 auth)...]，bind() 在連線後綁定通道
+#        tick(now) 每 ping ms 向每台送 "p",序號；對方立即回 "q",序號,對方的 ticks_ms
+#        由最近 n 次中往返最短的一次估計：單程延遲 owd = 往返/2，時鐘差 off = 對方時間 - (送出 + 往返/2)
+#        (往返最短的樣本排隊最少，去回最對稱)
+#        start(k, now)：本機在 now+lead 開始；送給第 i 台 "a",k,now+lead+off[i] (對方時鐘的開始時間)，
+#        訊息途中的抖動不影響開始時間，只要在 lead ms 內送達；還沒有時鐘差時送 "d",k,lead-owd
+#        comp=False 不補償 (送 "d",k,lead，每台收到後都等 lead)
+# Peer - 隊員：經自己的 bridge 通道 (綁定領隊 auth) 回覆 "q"；
+#        收到 "a",k,t 在自己的時間 t 開始程式 k，"d",k,延遲 在收到後延遲 ms 開始
+# 欄位不足或不是整數的訊息丟棄並計入 n_bad (不讓例外從 blynk.run() 傳出)
+
+import time
+
+try:
+    ticks_ms, ticks_diff, ticks_add = time.ticks_ms, time.ticks_diff, time.ticks_add
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+
+
+class Lead:
+    def __init__(self, blynk, peers, pin, run, lead=600, ping=2000, n=8, comp=True):
+        self.b = blynk
+        self.peers = peers
+        self.pin = pin
+        self.run = run
+        self.lead = lead
+        self.ping = ping
+        self.comp = comp
+        self.smp = [[] for _ in peers]
+        self.n = n
+        self.owd = [None] * len(peers)
+        self.off = [None] * len(peers)
+        self.fl = {}
+        self.seq = 0
+        self.t_ping = None
+        self.n_bad = 0
+
+    def bind(self):
+        for ch, auth in self.peers:
+            self.b.bridge_bind(ch, auth)
+        self.t_ping = None
+
+    def tick(self, now=None):
+        if now is None:
+            now = ticks_ms()
+        if self.t_ping is not None and ticks_diff(now, self.t_ping) < self.ping:
+            return
+        self.t_ping = now
+        for t in list(self.fl):
+            if ticks_diff(now, self.fl[t][1]) > self.ping * 2:
+                del self.fl[t]
+        for i, (ch, _) in enumerate(self.peers):
+            self.seq = self.seq % 0xFFFF + 1
+            self.fl[self.seq] = (i, now)
+            self.b.bridge_write(ch, self.pin, "p", self.seq)
+
+    def on(self, v):
+        try:
+            if v[0] != "q":
+                return
+            q, pt = int(v[1]), int(v[2])
+        except (IndexError, ValueError):
+            self.n_bad += 1
+            return
+        f = self.fl.pop(q, None)
+        if not f:
+            return
+        i, t = f
+        r = ticks_diff(ticks_ms(), t)
+        s = self.smp[i]
+        s.append((r, ticks_diff(pt, ticks_add(t, r // 2))))
+        if len(s) > self.n:
+            s.pop(0)
+        r, o = min(s)
+        self.owd[i] = r // 2
+        self.off[i] = o
+
+    def start(self, k, now=None):
+        if now is None:
+            now = ticks_ms()
+        at = ticks_add(now, self.lead)
+        for i, (ch, _) in enumerate(self.peers):
+            if not self.comp:
+                self.b.bridge_write(ch, self.pin, "d", k, self.lead)
+            elif self.off[i] is None:
+                self.b.bridge_write(ch, self.pin, "d", k, max(0, self.lead - (self.owd[i] or 0)))
+            else:
+                self.b.bridge_write(ch, self.pin, "a", k, ticks_add(at, self.off[i]))
+        self.run(k, at)
+
+
+class Peer:
+    def __init__(self, blynk, ch, lead_auth, pin, run):
+        self.b = blynk
+        self.ch = ch
+        self.auth = lead_auth
+        self.pin = pin
+        self.run = run
+        self.n_bad = 0
+
+    def bind(self):
+        self.b.bridge_bind(self.ch, self.auth)
+
+    def tick(self, now=None):
+        pass
+
+    def on(self, v):
+        try:
+            c = v[0]
+            if c == "p":
+                q = int(v[1])
+            elif c in ("a", "d"):
+                k, t = int(v[1]), int(v[2])
+            else:
+                return
+        except (IndexError, ValueError):
+            self.n_bad += 1
+            return
+        if c == "p":
+            self.b.bridge_write(self.ch, self.pin, "q", q, ticks_ms())
+        elif c == "a":
+            self.run(k, t)
+        else:
+            self.run(k, ticks_add(ticks_ms(), t))
@@ -0,0 +1,125 @@
+# 硬體輸出層：每個腳位只建立一次 Pin/PWM 物件，並快取最後寫入的值
+# - 寫入與快取相同時略過 (skips)，否則寫出 (writes)
+# - begin() ... commit() 之間的寫入先暫存，commit 時每個通道只寫最後的值
+# - cancel(f) 丟棄暫存的寫入並執行 f() (急停從計時器中斷呼叫，f 的寫入立即生效)；
+#   若批次進行中被打斷，其餘寫入直到最外層 commit() 都丟棄 (drops)，commit() 時再執行一次 f()，
+#   蓋掉批次在急停之後改動的狀態 (例如漸變目標)
+# - cache=False 時每次寫入都直接寫出 (不略過、不合併，等同加入 hwout 之前的寫入次數，供比較)
+
+from machine import Pin, PWM
+
+
+class Ch:
+    """單一輸出通道，介面與 Pin / PWM 相同 (value/on/off 或 duty/freq)"""
+
+    def __init__(self, hw, dev, pwm, v=None):
+        self.hw = hw
+        self.dev = dev
+        self.pwm = pwm
+        self.v = v
+        self.p = None
+
+    def value(self, v=None):
+        if v is None:
+            return self.v
+        self.hw.set(self, 1 if v else 0)
+
+    __call__ = value
+
+    def on(self):
+        self.hw.set(self, 1)
+
+    def off(self):
+        self.hw.set(self, 0)
+
+    def duty(self, d=None):
+        if d is None:
+            return self.v
+        self.hw.set(self, int(d))
+
+    def freq(self, f=None):
+        return self.dev.freq(f) if f is not None else self.dev.freq()
+
+
+class HwOut:
+    def __init__(self, cache=True):
+        self.cache = cache
+        self.chs = {}
+        self.q = []
+        self.depth = 0
+        self.writes = 0
+        self.skips = 0
+        self.drops = 0
+        self.cut = None
+
+    def pin(self, n, v=None):
+        c = self.chs.get(n)
+        if c is None:
+            c = Ch(self, Pin(n, Pin.OUT), False)
+            self.chs[n] = c
+        if v is not None:
+            c.value(v)
+        return c
+
+    def pwm(self, n, freq=1000, duty=0):
+        c = self.chs.get(n)
+        if c is None:
+            c = Ch(self, PWM(Pin(n, Pin.OUT), freq=freq, duty=duty), True, duty)
+            self.chs[n] = c
+        return c
+
+    def set(self, c, v):
+        if self.cut:
+            self.drops += 1
+            return
+        if self.depth and self.cache:
+            if c.p is None:
+                self.q.append(c)
+            c.p = v
+            return
+        self._w(c, v)
+
+    def _w(self, c, v):
+        if v == c.v and self.cache:
+            self.skips += 1
+            return
+        c.v = v
+        if c.pwm:
+            c.dev.duty(v)
+        else:
+            c.dev.value(v)
+        self.writes += 1
+
+    def begin(self):
+        self.depth += 1
+
+    def commit(self):
+        if not self.depth:
+            return
+        self.depth -= 1
+        if self.depth:
+            return
+        f = self.cut
+        if f:
+            self.cut = None
+            if f is not True:
+                f()
+            return
+        for c in self.q:
+            v = c.p
+            c.p = None
+            self._w(c, v)
+        del self.q[:]
+
+    def cancel(self, f=None):
+        for c in self.q:
+            c.p = None
+        del self.q[:]
+        d = self.depth
+        self.depth = 0
+        self.cut = None
+        if f:
+            f()
+        self.depth = d
+        if d:
+            self.cut = f or True
@@ -1,14 +1,19 @@
-import network,time,BlynkLib
-from machine import Pin,PWM
-from umqtt.simple import MQTTClient
+import network,time,BlynkLib,estop,preset,mqttlink,presetdb,topics,reactor,telemetry,ramp,hwout,drill,wifi,bootseq,memmon,shotlog,coalesce,cmdbus,ntptime
 import gc
 
 gc.collect()
 
 WIFI=[{"ssid":"shepherd","password":"Good@11255"},{"ssid":"aron","password":"00000000"}]
 AUTH="O-npu_Lj5Kh2v_oyBF67kAcskwlxuKx6"
+WIFI_DB="wifi.dat"
+WIFI_T=10000
+LINK_CHK=500
 MQTT_BROKER="broker.hivemq.com"
+MQTT_PORT=0
 MQTT_CLIENT="pongBot"
+MQTT_KA=30
+MQTT_DEFER=250
+BOOT_SERIAL=False
 BALL_PIN=5
 MA1,MA2,MAPWM=5,4,14
 MB1,MB2,MBPWM=12,13,15
@@ -17,6 +22,71 @@ LONG_T=3000
 HOLD_T=3000
 GAUGE_INT=30
 SERVO_MAP=[0,30,50,70,90,100]
+HB=2
+BSTAT_PIN=16
+BSTAT_T=10000
+BSTAT_PING=5000
+PROF_V=8
+PROF_OUT=17
+GRP_ROLE=None
+GRP_V=20
+GRP_PEERS=[]
+GRP_CH=30
+GRP_LEAD=""
+GRP_LEAD_MS=600
+GRP_PING=2000
+CO_PINS=(3,4)
+CO_WIN=50
+CB_PIN=(1,3,4,0,2,6)
+CB_WHY=('v5','mqtt','cmd')
+CB_ECHO_T=200
+LINK_T=5000
+WDT_T=8000
+LEGACY_SAVE=False
+PDB_SLOTS=8
+TICK=10
+REACTOR=True
+TELE_T=5000
+TELE_BUDGET=1200
+RAMP_T=400
+RAMP_P=1
+RAMP_STAG=150
+RPM_CTL=False
+# 轉速計腳位：ESP8266 沒有空的可中斷腳位 (1/3 為 UART0 REPL，0/2/15 為開機腳位，16 不支援中斷)
+# 須另外騰出腳位 (例如 DIO flash 模式的 GPIO10) 才設定；None 時不啟用閉迴路控制，特性量測只掃伺服
+TACH_A,TACH_B=None,None
+TACH_PPR=2
+RPM_MAX=6000
+RPM_KP,RPM_KI,RPM_KD=120,400,0
+RPM_TOL=3
+CTL_T=20
+CAL_DB="motor.cal"
+CZ_LOG="charz.bin"
+CZ_V=9
+CZ_GRID=tuple(range(0,1024,64))+(1023,)
+CZ_SERVO=tuple(range(77,24,-4))
+CZ_SETTLE=600
+CZ_N=8
+CZ_T=20
+SERVO_ADC=0
+MM_SEC=("link","net","drill","motor","btn","tele")
+MM_BUDGET=4096
+MM_LOW=8192
+MM_GAP=6
+MM_PROBE=60000
+MM_T=60000
+SLOG="shots"
+SLOG_N=4
+SLOG_MAX=16384
+SLOG_PAGE=512
+SLOG_T=30000
+DRILL_PULSE=150
+DRILL_REPS=1
+DRILLS=[
+    drill.prog(*[(60,60,3,1500)]*10),
+    drill.prog(*[(80,40,3,2000),(40,80,3,2000)]*5),
+    drill.prog(*[(60,60,l,1200) for l in (1,2,3,4,5)]*2),
+]
 
 ps10=None
 ip10=False
@@ -32,136 +102,361 @@ sp=None
 sr=False
 ss=0
 mqtt=None
+es=None
+db=None
+mq=topics.Router()
+rx=None
+tl=None
+rp=None
+hw=hwout.HwOut()
+ball=None
+dr=None
+pc=None
+ts=None
+wl=None
+bs=None
+cz=None
+scal=None
+mm=None
+sl=None
+pf=None
+grp=None
+co=None
+cb=None
+st_t=0
+st_p=False
+shots=0
 
 class DCMotor:
     def __init__(self,i1,i2,pw,f=1000):
-        self.i1=Pin(i1,Pin.OUT)
-        self.i2=Pin(i2,Pin.OUT)
-        self.pw=PWM(Pin(pw))
-        self.pw.freq(f)
+        self.i1=hw.pin(i1)
+        self.i2=hw.pin(i2)
+        self.pw=hw.pwm(pw,f)
         self.r=False
         self.s=0
+        self.pc=None
+        self.cal=None
         self.stop()
+    def out(self,d):
+        if self.pc:return self.pc.set(d*RPM_MAX//1023)
+        if self.cal and d:d=self.cal.duty(d*RPM_MAX//1023)
+        if rp:rp.to(self.pw,d)
+        else:self.pw.duty(d)
     def forward(self,s=100):
         s=max(0,min(100,s))
         self.i1.value(1)
         self.i2.value(0)
-        self.pw.duty(int(s*1023/100))
+        self.out(int(s*1023/100))
         self.r=True
         self.s=s
     def stop(self):
         self.i1.value(0)
         self.i2.value(0)
-        self.pw.duty(0)
+        self.out(0)
         self.r=False
     def set_speed(self,s):
         s=max(0,min(100,s))
         self.s=s
         if self.r:
-            self.pw.duty(int(s*1023/100))
+            self.out(int(s*1023/100))
 
 class DualMotor:
     def __init__(self,a1,a2,ap,b1,b2,bp,f=1000):
         self.ma=DCMotor(a1,a2,ap,f)
         self.mb=DCMotor(b1,b2,bp,f)
     def stop(self):
+        hw.begin()
         self.ma.stop()
         self.mb.stop()
+        hw.commit()
+
+def tachs():
+    global ts,tach
+    if ts is None:
+        ts=()
+        if TACH_A is not None:
+            import tach
+            ts=(tach.Tach(TACH_A,TACH_PPR),tach.Tach(TACH_B,TACH_PPR))
+    return ts
+
+def init_rpm():
+    global pc
+    if not tachs():return
+    pc=tach.Ctl(CTL_T,rpm_ready)
+    for m,t in zip((dm.ma,dm.mb),ts):
+        m.pc=pc.add(tach.Wheel(t,m.pw,RPM_MAX,RPM_KP,RPM_KI,RPM_KD,tol=RPM_TOL))
+        m.pc.set(m.pw.duty()*RPM_MAX//1023)
+
+def rpm_ready(r):
+    if blynk:blynk.virtual_write(7,255 if r else 0)
 
 def init_servo():
     global sp
-    sp=PWM(Pin(SERVO_PIN,Pin.OUT),freq=50,duty=0)
+    sp=hw.pwm(SERVO_PIN,50)
 
 def set_servo(s):
-    sp.duty(int((1.5+(-s/100))*51.2))
+    if s and scal:sp.duty(scal.duty(s*scal.vmax//100))
+    else:sp.duty(int((1.5+(-s/100))*51.2))
+
+def halt():hw.cancel(stop_all)
+
+def stop_all():
+    global sr,ip10,ps10,it10,te10,ip12,ps12,it12,te12
+    if dr:dr.stop()
+    if cz:cz.stop()
+    if dm:dm.stop()
+    sr=False
+    if sp:set_servo(0)
+    if ball:ball.off()
+    ip10,ps10,it10,te10=False,None,False,None
+    ip12,ps12,it12,te12=False,None,False,None
+
+@mq.on(b"pongBot/stop")
+def m_stop(t,m):
+    if es:cb.put(cmdbus.STOP,0,0,cmdbus.MQTT)
+
+@mq.on(b"pongBot/drill",text=True,qos=0)
+def m_drill(t,m):
+    cb.put(cmdbus.FIRE,0,m,cmdbus.MQTT)
+
+@mq.on(b"pongBot/char",text=True)
+def m_char(t,m):
+    if m=="stop" and cz and cz.on:halt()
+
+@mq.on(b"pongBot/prof",text=True)
+def m_prof(t,m):
+    prof_cmd(m or "dump")
+
+@mq.on(b"pongBot/save/successful",text=True)
+def m_saved(t,m):
+    if blynk:blynk.virtual_write(14,"True" if m=="TRUE" else "False")
+
+@mq.on(b"pongBot/importing/successful",text=True)
+def m_imported(t,m):
+    if blynk:blynk.virtual_write(15,"True" if m=="T" else "False")
+
+@mq.on(b"pongBot/importing/data")
+def m_data(t,m):
+    if not blynk:return
+    p=preset.parse(m)
+    if p and not (db and db.get()==p):
+        apply_preset(*p,src=cmdbus.MQTT)
+        if db:db.put(*p)
 
 def mqtt_callback(topic,msg):
-    global blynk,ss,sr
-    if topic==b"pongBot/save/successful" and blynk:
-        payload=msg.decode().strip()
-        blynk.virtual_write(14,"True" if payload=="TRUE" else "False")
-    elif topic==b"pongBot/importing/successful" and blynk:
-        payload=msg.decode().strip()
-        blynk.virtual_write(15,"True" if payload=="T" else "False")
-    elif topic==b"pongBot/importing/data" and blynk:
-        try:
-            payload=msg.decode().strip().strip('"').strip('{}')
-            for pair in payload.split(','):
-                if ':' in pair:
-                    k,v=pair.split(':',1)
-                    k,v=k.strip().strip('"'),int(v.strip().strip('"'))
-                    if k=='servo_level' and 1<=v<=5:
-                        ss=SERVO_MAP[v]
-                        blynk.virtual_write(1,v)
-                        if sr:set_servo(ss)
-                    elif k=='motor_top' and 1<=v<=100:
-                        dm.ma.set_speed(v*0.5)
-                        blynk.virtual_write(3,v)
-                    elif k=='motor_bottom' and 1<=v<=100:
-                        dm.mb.set_speed(v*0.5)
-                        blynk.virtual_write(4,v)
-        except:pass
+    mq.dispatch(topic,msg)
+
+def cur_preset():
+    l=0
+    for i in range(1,6):
+        if SERVO_MAP[i]==ss:
+            l=i
+            break
+    return l,int(dm.ma.s*2),int(dm.mb.s*2)
+
+def apply_preset(l,t,b,src=cmdbus.LOCAL):
+    if l:cb.put(cmdbus.SERVO,1,l,src)
+    if t:cb.put(cmdbus.SPEED,0,t,src)
+    if b:cb.put(cmdbus.SPEED,1,b,src)
+    if src==cmdbus.LOCAL:cmd_run()
+
+def cmd_apply(k,i,v):
+    global sr,ss
+    if k==cmdbus.SPEED:(dm.mb if i else dm.ma).set_speed(v*0.5)
+    elif k==cmdbus.SERVO:
+        if i:
+            ss=SERVO_MAP[v]
+            if sr:set_servo(ss)
+        else:
+            sr=v==1
+            if sr:es.arm()
+            if sr and ss==0:ss=SERVO_MAP[1]
+            set_servo(ss if sr else 0)
+    elif k==cmdbus.RUN:
+        if v:
+            es.arm()
+            dm.ma.forward(dm.ma.s if dm.ma.s>0 else 0.5)
+            dm.mb.forward(dm.mb.s if dm.mb.s>0 else 0.5)
+        else:dm.stop()
+    elif k==cmdbus.FIRE:run_drill(v)
+    elif k==cmdbus.STOP:es.trip(CB_WHY[v])
+
+def cmd_echo(b,n):
+    global st_t,st_p
+    if n:
+        rl=False
+        for j in range(len(CB_PIN)):
+            if not b.done[j]:continue
+            s=cmdbus.SLOTS[j][0]!=cmdbus.FIRE
+            if mqtt:st_p=st_p or s
+            if b.src[j]==cmdbus.BLYNK:rl=rl or s
+            elif blynk:blynk.virtual_write(CB_PIN[j],b.v[j])
+        if rl:reset_labels()
+    if st_p and mqtt and time.ticks_diff(get_ms(),st_t)>=CB_ECHO_T:
+        st_t=get_ms()
+        st_p=False
+        mqtt.publish(b"pongBot/state",preset.pack(*cur_preset()))
+
+def cmd_run():
+    if not cb.q and not st_p:return
+    hw.begin()
+    cb.run()
+    hw.commit()
+
+def drill_fire(v):
+    global shots
+    if v:
+        shots+=1
+        if pc:pc.kick()
+        if sl:
+            l,t,b=cur_preset()
+            sl.add(shotlog.DRILL,t,b,l,get_ms()-dr.t_plan,dr.i)
+    ball.value(v)
+
+def drill_set(l,t,b):
+    global sr,ss
+    hw.begin()
+    sr=True
+    ss=SERVO_MAP[l]
+    set_servo(ss)
+    dm.ma.forward(t*0.5)
+    dm.mb.forward(b*0.5)
+    hw.commit()
+
+def drill_done(d):
+    if mqtt:mqtt.publish(b"pongBot/drill/done",d.report())
+
+def run_drill(k,t=None):
+    if not dr:return
+    if t is None and hasattr(grp,"start"):
+        grp.start(k,get_ms())
+        return
+    if 1<=k<=len(DRILLS):
+        es.arm()
+        dr.start(DRILLS[k-1],DRILL_REPS,get_ms() if t is None else t)
+    else:dr.stop()
+
+def prof_cmd(c):
+    global pf
+    if not pf:
+        if c!="on" or not blynk:return
+        import prof
+        pf=prof.Prof()
+        pf.blynk(blynk)
+        pf.router(mq)
+    if c=="on":pf.enable(True)
+    elif c=="off":pf.enable(False)
+    elif c=="reset":pf.reset()
+    d=pf.dump()
+    if mqtt:mqtt.publish(b"pongBot/prof/dump",d)
+    if blynk:blynk.virtual_write(PROF_OUT,d)
+
+def run_char():
+    global cz
+    if not dm or (cz and cz.on):return
+    es.arm()
+    dm.stop()
+    import charz
+    ch=[("servo",sp.duty,charz.adc(SERVO_ADC),CZ_SERVO)]
+    if tachs():
+        hw.begin()
+        for m in (dm.ma,dm.mb):
+            m.i1.value(1)
+            m.i2.value(0)
+        hw.commit()
+        ch=[("ma",dm.ma.pw.duty,ts[0].sample,CZ_GRID),("mb",dm.mb.pw.duty,ts[1].sample,CZ_GRID)]+ch
+    cz=charz.Sweep(CZ_LOG,ch,CZ_SETTLE,CZ_N,CZ_T,char_done)
+    cz.start(get_ms())
 
-def conn_mqtt():
+def char_done(z):
+    dm.stop()
+    set_servo(0)
+    if blynk:blynk.virtual_write(CZ_V,0)
+    if mqtt:mqtt.publish(b"pongBot/char/done",str(z.rows).encode())
+
+def tele_fill(v):
+    v[0]=int(dm.ma.s*2)
+    v[1]=int(dm.mb.s*2)
+    v[2]=dm.ma.r|dm.mb.r<<1|sr<<2|es.tripped<<3
+    v[3]=cur_preset()[0]
+    v[4]=shots
+    v[7]=gc.mem_free()
+    v[8]=get_ms()//1000
+
+def tele_send(b):
+    if mqtt:mqtt.publish(b"pongBot/telemetry",b)
+
+def stop_log():
+    if sl:sl.add(shotlog.STOP)
+
+def mem_rep(m):
+    if mqtt:mqtt.publish(b"pongBot/mem",m.report())
+
+def save():
+    l,t,b=cur_preset()
+    if db:db.put(l,t,b)
+    if not mqtt:return
+    if LEGACY_SAVE:
+        mqtt.publish(b"pongBot/servo/level",str(l).encode(),True)
+        mqtt.publish(b"pongBot/motor/top",str(t).encode(),True)
+        mqtt.publish(b"pongBot/motor/bottom",str(b).encode(),True)
+    else:mqtt.publish(b"pongBot/preset/save",preset.pack(l,t,b),True)
+
+def imp():
+    p=db.get() if db else None
+    if p:
+        apply_preset(*p)
+        blynk.virtual_write(15,"True")
+    if mqtt:mqtt.publish(b"pongBot/importing",b"AAA" if LEGACY_SAVE else preset.REQ,True)
+
+def conn_mqtt(d=0):
     global mqtt
-    try:
-        mqtt=MQTTClient(MQTT_CLIENT,MQTT_BROKER)
-        mqtt.set_callback(mqtt_callback)
-        mqtt.connect()
-        mqtt.subscribe(b"pongBot/save/successful")
-        mqtt.subscribe(b"pongBot/importing/data")
-        mqtt.subscribe(b"pongBot/importing/successful")
-        return True
-    except:return False
+    mqtt=mqttlink.MqttLink(MQTT_CLIENT,MQTT_BROKER,mqtt_callback,MQTT_KA,MQTT_PORT)
+    for t,q in mq.subs():mqtt.sub(t,q)
+    if not d:return mqtt.poll()
+    mqtt.next=time.ticks_add(mqtt.next,d)
 
 def conn_wifi():
-    w=network.WLAN(network.STA_IF)
-    w.active(True)
-    if not w.isconnected():
-        for wifi in WIFI:
-            w.connect(wifi['ssid'],wifi['password'])
-            t=20
-            while not w.isconnected() and t>0:
-                time.sleep(1)
-                t-=1
-            if w.isconnected():return True
-        return False
-    return True
+    return wifi.join(network.WLAN(network.STA_IF),WIFI,WIFI_DB,WIFI_T)
+
+def link_up():
+    if blynk and not blynk.state:
+        try:blynk.connect()
+        except:pass
+    if mqtt:mqtt.hold(False,MQTT_DEFER)
+
+def link_down():
+    if mqtt:mqtt.hold(True)
+    if blynk:
+        blynk.disconnect()
+        try:blynk.conn.close()
+        except:pass
 
 def get_ms():
     try:return time.ticks_ms()
     except:return int(time.time()*1000)
 
 def proc_btn(bp,gp,lp,ip,ps,it,te):
+    global shots
     now=get_ms()
     if ip and ps:
         e=now-ps
         if e%GAUGE_INT<30 and blynk:
             blynk.virtual_write(gp,min(100,int(e*100/LONG_T)))
         if e>=LONG_T and not it:
-            Pin(BALL_PIN,Pin.OUT).on()
+            shots+=1
+            ball.on()
+            if sl:
+                l,t,b=cur_preset()
+                sl.add(shotlog.SHOT,t,b,l,e-LONG_T,bp)
             if blynk:
                 blynk.virtual_write(bp,1)
-            if mqtt:
-                try:
-                    if bp==10:
-                        v1_level=0
-                        for i in range(1,6):
-                            if SERVO_MAP[i]==ss:
-                                v1_level=i
-                                break
-                        v3_panel=int(dm.ma.s*2)
-                        v4_panel=int(dm.mb.s*2)
-                        mqtt.publish(b"pongBot/servo/level",str(v1_level).encode())
-                        mqtt.publish(b"pongBot/motor/top",str(v3_panel).encode())
-                        mqtt.publish(b"pongBot/motor/bottom",str(v4_panel).encode())
-                    elif bp==12:
-                        mqtt.publish(b"pongBot/importing",b"AAA")
-                except:pass
+            if bp==10:save()
+            elif bp==12:imp()
             it=True
             te=now
     if it and te and now-te>=HOLD_T:
-        Pin(BALL_PIN,Pin.OUT).off()
+        ball.off()
         if blynk:
             blynk.virtual_write(gp,0)
             blynk.virtual_write(bp,0)
@@ -186,46 +481,44 @@ def setup():
     
     @blynk.on("V0")
     def v0(v):
-        global sr,ss
-        sr=v[0]=="1"
-        if sr and ss==0:
-            ss=SERVO_MAP[1]
-        set_servo(ss if sr else 0)
-        reset_labels()
+        cb.put(cmdbus.SERVO,0,v[0]=="1",cmdbus.BLYNK)
     
     @blynk.on("V1")
     def v1(v):
-        global ss
-        l=int(v[0])
-        if 1<=l<=5:
-            ss=SERVO_MAP[l]
-            if sr:set_servo(ss)
-        reset_labels()
+        cb.put(cmdbus.SERVO,1,v[0],cmdbus.BLYNK)
     
     @blynk.on("V2")
     def v2(v):
-        if v[0]=="1":
-            sa=dm.ma.s if dm.ma.s>0 else 0.5
-            sb=dm.mb.s if dm.mb.s>0 else 0.5
-            dm.ma.forward(sa)
-            dm.mb.forward(sb)
-        else:
-            dm.stop()
-        reset_labels()
+        cb.put(cmdbus.RUN,0,v[0]=="1",cmdbus.BLYNK)
     
     @blynk.on("V3")
     def v3(v):
-        pv=int(v[0])
-        if 1<=pv<=100:
-            dm.ma.set_speed(pv*0.5)
-        reset_labels()
+        cb.put(cmdbus.SPEED,0,v[0],cmdbus.BLYNK)
     
     @blynk.on("V4")
     def v4(v):
-        pv=int(v[0])
-        if 1<=pv<=100:
-            dm.mb.set_speed(pv*0.5)
-        reset_labels()
+        cb.put(cmdbus.SPEED,1,v[0],cmdbus.BLYNK)
+    
+    @blynk.on("V5")
+    def v5(v):
+        if v[0]=="1":cb.put(cmdbus.STOP,0,0,cmdbus.BLYNK)
+    
+    @blynk.on("V6")
+    def v6(v):
+        cb.put(cmdbus.FIRE,0,v[0],cmdbus.BLYNK)
+    
+    @blynk.on("V%d"%PROF_V)
+    def vp(v):
+        prof_cmd("on" if v[0]=="1" else "off")
+    
+    @blynk.on("V%d"%CZ_V)
+    def vz(v):
+        if v[0]=="1":run_char()
+        elif cz and cz.on:halt()
+    
+    @blynk.on("V%d"%GRP_V)
+    def vg(v):
+        if grp:grp.on(v)
     
     @blynk.on("V10")
     def v10(v):
@@ -276,33 +569,158 @@ def setup():
         for p in [10,11,12,13]:blynk.virtual_write(p,0)
         blynk.virtual_write(14,"False")
         blynk.virtual_write(15,"False")
+        if grp:grp.bind()
     @blynk.on("disconnected")
-    def disc():pass
-def main():
-    global blynk,dm
-    while not conn_wifi():time.sleep(5)
+    def disc():
+        if co:co.clear()
+        if es:es.trip('disc')
+def on_blynk(ev):
+    try:d=blynk.conn.read(blynk.buffin)
+    except OSError:d=None
+    if not d:
+        blynk.disconnect()
+        return False
+    blynk.process(d)
+
+def on_mqtt(ev):
+    mqtt.poll()
+
+def wait(ms):
+    rx.watch(0,blynk.conn if blynk.state else None,on_blynk)
+    rx.watch(1,mqtt.c.sock if mqtt and mqtt.up else None,on_mqtt)
+    rx.run(ms)
+    blynk.process()
+    if mqtt:mqtt.poll(False)
+
+# 主迴圈一圈；idle=0 時不等待 (主機模擬由呼叫端推進時鐘)
+def step(idle=1):
+    t=time.ticks_us()
+    es.feed()
+    if mm:mm.at(0)
+    if wl:wl.tick(get_ms())
+    if grp:grp.tick(get_ms())
+    ms=TICK
+    if dr and dr.on:ms=min(ms,dr.due(get_ms()))
+    if co and co.v:ms=min(ms,co.due(get_ms()))
+    if not idle:ms=0
+    if mm:
+        ms=max(0,ms-mm.idle(get_ms(),ms,ip10 or ip12 or it10 or it12))
+        mm.at(1)
+    if rx:
+        wait(ms)
+        t=time.ticks_add(t,rx.idle)
+    else:
+        blynk.run()
+        if mqtt:mqtt.poll()
+    if co:co.flush(get_ms())
+    cmd_run()
+    if not rx:
+        i=time.ticks_us()
+        time.sleep_ms(ms)
+        t=time.ticks_add(t,time.ticks_diff(time.ticks_us(),i))
+    if mm:mm.at(2)
+    if dr:dr.step(get_ms())
+    if mm:mm.at(3)
+    if cz and cz.on:cz.step(get_ms())
+    elif pc:pc.step(get_ms())
+    elif rp:rp.step()
+    if mm:mm.at(4)
+    proc_all()
+    if mm:mm.at(5)
+    if tl:tl.tick(get_ms(),time.ticks_diff(time.ticks_us(),t))
+    if sl:sl.tick(get_ms())
+    if mm:mm.at(-1)
+
+def b_wifi():
+    global wl
+    w=network.WLAN(network.STA_IF)
+    while not (yield from wifi.boot(w,WIFI,WIFI_DB,WIFI_T)):time.sleep(5)
+    wl=wifi.Link(w,WIFI,WIFI_DB,link_up,link_down,LINK_CHK)
+
+def b_hw():
+    global rp,dm,ball,dr,scal,cb
+    rp=ramp.Ramp(RAMP_T,RAMP_P,RAMP_STAG)
     dm=DualMotor(MA1,MA2,MAPWM,MB1,MB2,MBPWM)
+    cb=cmdbus.Bus(cmd_apply,cmd_echo)
+    cal={}
+    try:
+        open(CAL_DB).close()
+        import charz
+        cal=charz.load(CAL_DB)
+    except OSError:pass
+    dm.ma.cal=cal.get("ma")
+    dm.mb.cal=cal.get("mb")
+    scal=cal.get("servo")
+    ball=hw.pin(BALL_PIN,0)
+    if RPM_CTL:init_rpm()
+    dr=drill.Drill(drill_fire,drill_set,DRILL_PULSE,drill_done,(lambda:pc.ready) if pc else None)
     init_servo()
-    conn_mqtt()
-    gc.collect()
-    try:blynk=BlynkLib.Blynk(AUTH,insecure=True)
+
+def b_db():
+    global db,sl
+    db=presetdb.PresetDB(slots=PDB_SLOTS)
+    sl=shotlog.Log(SLOG,SLOG_N,SLOG_MAX,SLOG_PAGE,SLOG_T)
+    sl.add(shotlog.BOOT)
+
+def b_blynk(b=None):
+    global blynk,es,grp,co
+    try:blynk=b or BlynkLib.Blynk(AUTH,insecure=True,heartbeat=HB,stats=BlynkLib.Stats(BSTAT_PIN,BSTAT_T,BSTAT_PING))
     except:return
+    es=estop.EStop(lambda:blynk.lastRecv,LINK_T,wdt_ms=WDT_T)
+    es.add(halt)
+    es.add(stop_log)
+    es.add(cb.clear)
     setup()
+    co=coalesce.Co(blynk,CO_PINS,CO_WIN)
+    if GRP_ROLE:
+        import group
+        if GRP_ROLE=="lead":grp=group.Lead(blynk,GRP_PEERS,GRP_V,run_drill,GRP_LEAD_MS,GRP_PING)
+        else:grp=group.Peer(blynk,GRP_CH,GRP_LEAD,GRP_V,run_drill)
+
+def b_ntp():
+    try:ntptime.settime()
+    except:return
+    if sl:sl.synced=True
+
+def b_login():
+    if not blynk:return
+    while blynk.state==BlynkLib.CONNECTING:
+        blynk.run()
+        if blynk.state==BlynkLib.CONNECTED:bs.mark("ready")
+        else:yield
+
+def boot():
+    global bs
+    bs=bootseq.Seq(serial=BOOT_SERIAL)
+    bs.add("wifi",b_wifi)
+    bs.add("hw",b_hw)
+    bs.add("db",b_db)
+    if BOOT_SERIAL:bs.add("mqtt",conn_mqtt)
+    bs.add("gc",gc.collect,("hw","db"))
+    bs.add("blynk",b_blynk,("wifi","gc"))
+    bs.add("login",b_login,("blynk",))
+    if not BOOT_SERIAL:bs.add("mqtt",lambda:conn_mqtt(MQTT_DEFER),("login",))
+    bs.add("ntp",b_ntp,("login","db"))
+    bs.run()
+    print("boot",bs.report())
+    if mqtt:mqtt.publish(b"pongBot/boot",bs.report(),True)
+    return blynk
+
+def main():
+    global rx,tl,mm
+    if not boot():return
+    if REACTOR:rx=reactor.Reactor()
+    tl=telemetry.Telemetry(tele_fill,tele_send,TELE_T,TELE_BUDGET)
+    mm=memmon.Mem(MM_SEC,MM_BUDGET,MM_LOW,MM_GAP,MM_PROBE,MM_T,mem_rep)
+    es.start()
     try:
-        while True:
-            blynk.run()
-            if mqtt:
-                try:mqtt.check_msg()
-                except:pass
-            proc_all()
-            time.sleep(0.01)
+        while True:step()
     except:pass
     finally:
-        dm.stop()
-        set_servo(0)
-        if mqtt:
-            try:mqtt.disconnect()
-            except:pass
+        es.stop()
+        halt()
+        if sl:sl.flush()
+        if mqtt:mqtt.close()
 
 if __name__=="__main__":
     main()
@@ -0,0 +1,130 @@
+# 記憶體監控與回收排程
+# Mem(names) - 主迴圈在每個子系統前呼叫 at(i) (i 為 names 的索引，-1 結束)，取 gc.mem_alloc() 差值累計各段配置量
+#              MicroPython 的物件到回收才釋放，兩次 at() 之間已配置量的增加即該段配置的 bytes；
+#              差值為負表示該段中途觸發了自動回收 (heap 不足)，計入 auto
+#              主機模擬由 Sim/sim.py 的 heap() 以 tracemalloc 提供 mem_alloc/mem_free
+# idle(now, gap, busy) - 主迴圈等待前呼叫，gap 為距下一個排定事件的 ms
+#              上次回收後配置超過 budget 或可用量低於 low 時，在不忙 (不在發球中) 且空檔夠長
+#              (gap >= 最小空檔 + 上次回收耗時) 時 gc.collect()；可用量低於 low/2 時不等空檔立即回收
+#              回收後 budget 調整為可用量的 1/4；每 probe ms 另以試配置二分搜尋最大連續可用區塊
+#              回傳花掉的 ms，主迴圈從等待時間扣除
+# 每 period ms 結算一次各段每分鐘配置量 (rate) 並呼叫 report(self)
+
+import gc
+import time
+from array import array
+
+try:
+    ticks_ms, ticks_us, ticks_diff = time.ticks_ms, time.ticks_us, time.ticks_diff
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+
+def largest(hi, lo=0, step=64):
+    """試配置 bytearray 二分搜尋 hi 以下最大的連續可用區塊 (誤差 step bytes)；會留下垃圾，呼叫後應回收
+    期間停用自動回收，配置失敗直接 MemoryError 而不是先回收一次"""
+    gc.disable()
+    try:
+        while hi - lo > step:
+            m = (lo + hi) // 2
+            try:
+                b = bytearray(m)
+                b = None
+                lo = m
+            except MemoryError:
+                hi = m
+    finally:
+        gc.enable()
+    return lo
+
+
+class Mem:
+    def __init__(self, names, budget=4096, low=8192, gap=6, probe=60000, period=60000, report=None):
+        self.names = names
+        self.acc = array("l", [0] * len(names))
+        self.rate = array("l", [0] * len(names))
+        self.budget = budget
+        self.low = low
+        self.gap = gap
+        self.probe = probe
+        self.period = period
+        self.report_fn = report
+        self.cur = -1
+        self.a = 0
+        self.a0 = None
+        self.t0 = None
+        self.t_probe = None
+        self.gc_us = 0
+        self.gc_max = 0
+        self.collects = 0
+        self.forced = 0
+        self.auto = 0
+        self.free = 0
+        self.free_min = None
+        self.block = None
+
+    def at(self, i):
+        a = gc.mem_alloc()
+        c = self.cur
+        if c >= 0:
+            d = a - self.a
+            if d >= 0:
+                self.acc[c] += d
+            else:
+                self.auto += 1
+                self.a0 = a
+        self.cur = i
+        self.a = a
+
+    def idle(self, now=None, gap=0, busy=False):
+        self.at(-1)
+        if now is None:
+            now = ticks_ms()
+        if self.t0 is None:
+            self.t0 = self.t_probe = now
+            self.a0 = self.a
+        if ticks_diff(now, self.t0) >= self.period:
+            self._roll(now)
+        f = gc.mem_free()
+        self.free = f
+        if self.free_min is None or f < self.free_min:
+            self.free_min = f
+        if self.a - self.a0 < self.budget and f >= self.low:
+            return 0
+        force = f < self.low // 2
+        if not force and (busy or gap < self.gap + self.gc_us // 1000):
+            return 0
+        t = ticks_us()
+        gc.collect()
+        us = ticks_diff(ticks_us(), t)
+        self.gc_us = us if not self.collects else (self.gc_us * 3 + us) // 4
+        if us > self.gc_max:
+            self.gc_max = us
+        self.collects += 1
+        self.forced += force
+        if ticks_diff(now, self.t_probe) >= self.probe:
+            self.t_probe = now
+            self.block = largest(gc.mem_free())
+            gc.collect()
+        self.free = gc.mem_free()
+        self.budget = max(1024, self.free // 4)
+        self.a = self.a0 = gc.mem_alloc()
+        return ticks_diff(ticks_us(), t) // 1000
+
+    def _roll(self, now):
+        el = max(1, ticks_diff(now, self.t0))
+        for i in range(len(self.acc)):
+            self.rate[i] = self.acc[i] * 60000 // el
+            self.acc[i] = 0
+        self.t0 = now
+        if self.report_fn:
+            self.report_fn(self)
+
+    def report(self):
+        """各段 bytes/分 + free 目前/最低 + 最大區塊 + 回收次數/平均 ms/強制 + 自動回收次數"""
+        s = " ".join(["%s:%d" % (n, r) for n, r in zip(self.names, self.rate)])
+        return "%s free %d/%d blk %s gc %d/%d.%dms/%d auto %d" % (
+            s, self.free, self.free_min or 0, "-" if self.block is None else self.block,
+            self.collects, self.gc_us // 1000, self.gc_us // 100 % 10, self.forced, self.auto)
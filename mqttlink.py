@@ -0,0 +1,249 @@
+# MQTT 連線管理
+# - keepalive ping，讀寫錯誤即視為斷線 (不再被 except:pass 吃掉)
+#   收到任何封包 (含 PINGRESP) 都記下時間；1.5 倍 keepalive 沒有收到即視為半開連線並斷線重連
+#   (umqtt 的 check_msg 對 PINGRESP 與沒有資料都回傳 None，所以先以 select.poll 看 socket 是否有資料)
+# - QoS1 publish 與 subscribe 會阻塞等 PUBACK/SUBACK：socket 設 ack_ms 逾時，逾時即斷線重連
+#   (umqtt 的 wait_msg 讀到資料後 setblocking(True) 會清掉逾時，_Client 每次讀完重設)
+# - 指數退避重新連線，clean_session=False 並重新訂閱
+#   QoS0 的訂閱 (動作指令) 每次連線都重新訂閱，確保舊 session 留下的同一 topic 不會是 QoS1 (會在離線時排隊)
+# - hold(True) 暫停重連 (WiFi 斷線時由連線監督呼叫，避免在沒有網路時卡在 DNS/connect)，hold(False, ms) 於 ms 後重連
+#   (connect 是阻塞的 DNS + TCP + CONNACK，延後可避免與 Blynk 的重連擠在主迴圈同一圈)
+# - 斷線期間要保留的訊息 (存檔/匯入請求) 寫入 flash 上的固定大小環形 outbox，重連後依序送出
+
+import select
+import struct
+import time
+
+from umqtt.simple import MQTTClient
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+REC = const(64)  # outbox 每筆: tlen, mlen, topic, msg
+
+
+class Outbox:
+    def __init__(self, path="outbox.bin", cap=16):
+        self.path = path
+        self.cap = cap
+        self.head = 0
+        self.n = 0
+        self.dropped = 0
+        self.buf = bytearray(REC)
+        try:
+            with open(path, "rb") as f:
+                h = f.read(4)
+            self.head, self.n = struct.unpack("!HH", h)
+        except Exception:
+            pass
+        if self.head >= cap or self.n > cap:
+            self.head = self.n = 0
+        try:
+            open(path, "r+b").close()
+        except OSError:
+            with open(path, "wb") as f:
+                f.write(bytes(4 + cap * REC))
+
+    def __len__(self):
+        return self.n
+
+    def _hdr(self, f):
+        f.seek(0)
+        f.write(struct.pack("!HH", self.head, self.n))
+
+    def put(self, topic, msg):
+        lt, lm = len(topic), len(msg)
+        if 2 + lt + lm > REC:
+            return False
+        if self.n == self.cap:
+            self.head = (self.head + 1) % self.cap
+            self.n -= 1
+            self.dropped += 1
+        b = self.buf
+        b[0] = lt
+        b[1] = lm
+        b[2:2 + lt] = topic
+        b[2 + lt:2 + lt + lm] = msg
+        with open(self.path, "r+b") as f:
+            f.seek(4 + (self.head + self.n) % self.cap * REC)
+            f.write(b)
+            self.n += 1
+            self._hdr(f)
+        return True
+
+    def peek(self):
+        if not self.n:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(4 + self.head * REC)
+            f.readinto(self.buf)
+        b = self.buf
+        lt, lm = b[0], b[1]
+        return bytes(b[2:2 + lt]), bytes(b[2 + lt:2 + lt + lm])
+
+    def pop(self):
+        if not self.n:
+            return
+        self.head = (self.head + 1) % self.cap
+        self.n -= 1
+        with open(self.path, "r+b") as f:
+            self._hdr(f)
+
+
+class _Client(MQTTClient):
+    tmo = None
+
+    def wait_msg(self):
+        try:
+            return MQTTClient.wait_msg(self)
+        finally:
+            if self.tmo is not None:
+                self.sock.settimeout(self.tmo)
+
+
+class MqttLink:
+    def __init__(self, client_id, server, cb, keepalive=30, port=0,
+                 outbox="outbox.bin", cap=16, backoff=1000, backoff_max=30000, ack_ms=2000):
+        self.client_id = client_id
+        self.server = server
+        self.port = port
+        self.cb = cb
+        self.keepalive = keepalive
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.ack_ms = ack_ms
+        self.box = Outbox(outbox, cap)
+        self.subs = []
+        self.c = None
+        self.up = False
+        self.held = False
+        self.delay = backoff
+        self.next = time.ticks_ms()
+        self.last_tx = 0
+        self.t_rx = 0
+        self.t_ping = 0
+        self.sp = None
+        self.t_down = self.next
+        self.t_up = None
+        self.connects = 0
+        self.drops = 0
+        self.fails = 0
+        self.stale = 0
+
+    def sub(self, topic, qos=1):
+        self.subs.append((topic, qos))
+        if self.up:
+            try:
+                self.c.subscribe(topic, qos)
+            except Exception:
+                self._drop()
+
+    def connect(self):
+        c = _Client(self.client_id, self.server, self.port, keepalive=self.keepalive)
+        c.set_callback(self.cb)
+        self.c = c
+        present = c.connect(clean_session=False)
+        c.tmo = self.ack_ms / 1000
+        c.sock.settimeout(c.tmo)
+        for t, q in self.subs:
+            if not present or not q:
+                c.subscribe(t, q)
+        self.up = True
+        self.connects += 1
+        self.delay = self.backoff
+        self.sp = select.poll()
+        self.sp.register(c.sock, select.POLLIN)
+        self.last_tx = self.t_rx = self.t_ping = self.t_up = time.ticks_ms()
+        self.drain()
+
+    def _drop(self):
+        if self.c:
+            try:
+                self.c.sock.close()
+            except Exception:
+                pass
+        if self.up:
+            self.drops += 1
+            self.t_down = time.ticks_ms()
+        self.up = False
+        self.next = time.ticks_ms()
+
+    def hold(self, h, ms=0):
+        if h:
+            self._drop()
+        elif self.held:
+            self.next = time.ticks_add(time.ticks_ms(), ms)
+            self.delay = self.backoff
+        self.held = h
+
+    def poll(self, readable=True):
+        """主迴圈每圈呼叫；斷線時依退避時間重連，回傳是否連線中
+        readable=False 表示已知 socket 沒有資料 (reactor)，只處理 keepalive/outbox"""
+        now = time.ticks_ms()
+        if not self.up:
+            if self.held or time.ticks_diff(now, self.next) < 0:
+                return False
+            try:
+                self.connect()
+            except Exception:
+                self._drop()
+                self.fails += 1
+                self.next = time.ticks_add(now, self.delay)
+                self.delay = min(self.delay * 2, self.backoff_max)
+            return self.up
+        try:
+            if readable and self.sp.poll(0):
+                self.t_rx = now
+                self.c.check_msg()
+            if self.box.n:
+                self.drain()
+            if self.keepalive:
+                h = self.keepalive * 500
+                if time.ticks_diff(now, self.t_rx) > 3 * h:
+                    self.stale += 1
+                    self._drop()
+                    return False
+                if time.ticks_diff(now, self.last_tx) > h or (
+                        time.ticks_diff(now, self.t_rx) > h and time.ticks_diff(now, self.t_ping) > h):
+                    self.c.ping()
+                    self.last_tx = self.t_ping = now
+        except Exception:
+            self._drop()
+        return self.up
+
+    def publish(self, topic, msg, keep=False):
+        """keep=True 時斷線或送出失敗的訊息會存入 outbox"""
+        if self.up and not (keep and self.box.n):
+            try:
+                self.c.publish(topic, msg, qos=1 if keep else 0)
+                self.last_tx = time.ticks_ms()
+                if keep:
+                    self.t_rx = self.last_tx
+                return True
+            except Exception:
+                self._drop()
+        if keep:
+            self.box.put(topic, msg)
+        return False
+
+    def drain(self):
+        while self.up and self.box.n:
+            t, m = self.box.peek()
+            try:
+                self.c.publish(t, m, qos=1)
+            except Exception:
+                self._drop()
+                return
+            self.box.pop()
+            self.t_rx = time.ticks_ms()
+        self.last_tx = time.ticks_ms()
+
+    def close(self):
+        if self.up:
+            try:
+                self.c.disconnect()
+            except Exception:
+                pass
+        self.up = False
@@ -0,0 +1,98 @@
+"""
+BlynkLib.Stats：以 msg id 配對 PING/登入回應量測往返時間
+虛擬時間下 SimBlynk 的伺服器往返延遲依階段改變 (基準 + 指數分布抖動)，中途斷線 OUTAGE_MS 後重連；
+裝置每 STORM_MS 送一次 virtual_write (連線忙碌時心跳不會送 PING，只靠 Stats 的 ping 探測取樣)
+  1. 每個階段結束時 Stats 的 min/平均/max/p95 與該階段實際設定的往返延遲比較
+  2. 每幀成本：接收 (process) 與送出 (virtual_write) 在 Stats 關閉/開啟時的 CPU 微秒
+用法: python bench_blynkstats.py
+"""
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import sim
+
+sim.install()
+
+import BlynkLib
+from BlynkLib import MSG_HW
+from blynksim import SimBlynk, frame
+
+HB = 10
+PING_MS = 1000
+STORM_MS = 50
+OUTAGE_MS = 20000
+# (名稱, 秒數, 基準往返 ms, 抖動平均 ms, 是否斷線)
+PHASES = (("正常", 60, 60, 10, False), ("劣化", 60, 250, 120, False),
+          ("斷線", OUTAGE_MS // 1000, 60, 10, True), ("恢復", 40, 60, 10, False))
+N = 2000
+
+
+def session():
+    random.seed(7)
+    sim.virtual(1000000)
+    st = BlynkLib.Stats(ping=PING_MS)
+    b = SimBlynk(heartbeat=HB, stats=st)
+    b.run()
+    rows = []
+    for name, sec, base, jit, down in PHASES:
+        st.reset()
+        b.up = not down
+        end = sim.ticks_ms() + sec * 1000
+        t_storm = sim.ticks_ms()
+        while sim.ticks_ms() < end:
+            now = sim.ticks_ms()
+            b.rtt_ms = int(base + random.expovariate(1 / jit))
+            if now >= t_storm:
+                b.virtual_write(11, now % 100)
+                t_storm += STORM_MS
+            if b.state == BlynkLib.DISCONNECTED and b.up:
+                b.connect()
+            b.run()
+            del b.tx[:]
+            sim.advance(10000)
+        rows.append((name, base, jit, st.rtt_min, st.srtt, st.rtt_max, st.p95(), st.n, st.lost, st.conns,
+                     st.tx_n, st.rx_n))
+    sim.virtual(None)
+    return rows
+
+
+def cost(stats):
+    b = SimBlynk(stats=BlynkLib.Stats() if stats else None)
+    b.run()
+    data = b"".join(frame(MSG_HW, 1 + i, "vw", 3, i % 100) for i in range(N))
+    rx = tx = None
+    for _ in range(10):
+        t = time.perf_counter()
+        b.process(data)
+        r = (time.perf_counter() - t) * 1e6 / N
+        rx = r if rx is None else min(rx, r)
+        t = time.perf_counter()
+        for i in range(N):
+            b.virtual_write(11, i)
+        r = (time.perf_counter() - t) * 1e6 / N
+        tx = r if tx is None else min(tx, r)
+        del b.tx[:]
+    return rx, tx
+
+
+def main():
+    print("心跳 %d s，Stats ping 每 %d ms，裝置每 %d ms 送一次 virtual_write" % (HB, PING_MS, STORM_MS))
+    print("%-6s %12s %22s %6s %6s %6s %6s %12s" % (
+        "階段", "實際 ms", "量測 min/平均/max", "p95", "樣本", "遺失", "連線", "送/收 幀"))
+    for name, base, jit, lo, avg, hi, p95, n, lost, conns, txn, rxn in session():
+        print("%-6s %12s %22s %6d %6d %6d %6d %12s" % (
+            name, "%d+~%d" % (base, jit), "%d/%d/%d" % (lo, avg, hi), p95, n, lost, conns, "%d/%d" % (txn, rxn)))
+    off, on = cost(False), cost(True)
+    print("每幀 CPU (us)      關閉    開啟")
+    print("  接收 process  %7.2f %7.2f" % (off[0], on[0]))
+    print("  送出 vw       %7.2f %7.2f" % (off[1], on[1]))
+
+
+if __name__ == "__main__":
+    main()
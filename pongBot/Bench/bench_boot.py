@@ -0,0 +1,116 @@
+"""
+開機到第一個指令：循序開機 (BOOT_SERIAL=True，與加入 bootseq 前相同的順序) vs bootseq 排程
+兩者都執行真正的 main()，虛擬時間，網路延遲假設：
+  WLAN 晶片掃描 / 關聯+DHCP 見 Sim/network.py
+  MQTT  connect() 阻塞 MQTT_MS (DNS + TCP + CONNACK，本機 broker 替身)
+  Blynk connect() 阻塞 BLYNK_MS (DNS + TCP)，登入回應往返 RTT_MS
+App 在裝置上線 (登入成功) 的瞬間送出 V3/V4 速度與 V2 開馬達
+量測：ready = Blynk 登入成功，指令 = 馬達 PWM 開始輸出，MQTT = MQTT 連上
+bootseq 在 ready 後就進入主迴圈，MQTT 延後 MQTT_DEFER ms 才由主迴圈連線 (阻塞 MQTT_MS，讓登入後 App 的指令先處理)
+冷開機 flash 上沒有 wifi 快取，熱開機有上次的 bssid
+用法: python bench_boot.py
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import machine
+import network
+import wifi
+import BlynkLib
+from umqtt import simple
+from blynksim import SimBlynk
+from broker import Broker
+
+MQTT_MS = 600
+BLYNK_MS = 300
+RTT_MS = 150
+SPEED = 80
+SHEP = network.aps[0]
+
+
+class Done(Exception):
+    pass
+
+
+class AppBlynk(SimBlynk):
+    """登入成功時記錄時間並送出 App 指令"""
+
+    def __init__(self, auth, **kwargs):
+        self.t_ready = None
+        kwargs.pop("insecure", None)
+        SimBlynk.__init__(self, auth, BLYNK_MS, RTT_MS, **kwargs)
+
+    def process(self, data=None):
+        SimBlynk.process(self, data)
+        if self.state == BlynkLib.CONNECTED and self.t_ready is None:
+            self.t_ready = sim.ticks_ms()
+            self.hw(3, SPEED)
+            self.hw(4, SPEED)
+            self.hw(2, 1)
+
+
+def run(m, broker, warm, serial):
+    rig.flash()
+    machine.reset_state()
+    network.aps[:] = [SHEP]
+    network.WLAN()._init()
+    if warm:
+        wifi.save(m.WIFI_DB, SHEP["ssid"], SHEP["bssid"], SHEP["channel"])
+    m.MQTT_BROKER, m.MQTT_PORT = broker.host, broker.port
+    m.REACTOR = False
+    m.BOOT_SERIAL = serial
+    for k in ("blynk", "mqtt", "es", "wl", "bs", "pc"):
+        if hasattr(m, k):
+            setattr(m, k, None)
+    t_cmd = [None]
+    step = m.step
+
+    def probe():
+        step()
+        if t_cmd[0] is None and machine.duties.get(m.MAPWM, 0):
+            t_cmd[0] = sim.ticks_ms()
+        if t_cmd[0] is not None and getattr(m.mqtt, "up", True):
+            raise Done
+
+    m.step = probe
+    sim.virtual(0)
+    try:
+        m.main()
+    finally:
+        m.step = step
+        m.BOOT_SERIAL = False
+        if m.es and m.es._wdt:
+            m.es._wdt.deinit()
+        sim.virtual(None)
+    t_mq = getattr(m.mqtt, "t_up", None)
+    return m.blynk.t_ready, t_cmd[0], t_mq, m.bs.report() if getattr(m, "bs", None) else ""
+
+
+def main():
+    broker = Broker().start()
+    BlynkLib.Blynk = AppBlynk
+    simple.connect_ms = MQTT_MS
+    print("WLAN 掃描 %d ms、關聯+DHCP %d ms；MQTT 連線 %d ms；Blynk 連線 %d ms + 登入往返 %d ms" % (
+        network.scan_ms, network.assoc_ms, MQTT_MS, BLYNK_MS, RTT_MS))
+    print("%-6s %-8s %10s %10s %10s" % ("開機", "方式", "ready ms", "指令 ms", "MQTT ms"))
+    timelines = []
+    for warm in (False, True):
+        for i, (name, serial) in enumerate((("循序", True), ("bootseq", False))):
+            ready, cmd, mq, tl = run(rig.app, broker, warm, serial)
+            print("%-6s %-8s %10s %10s %10s" % ("" if i else ("熱" if warm else "冷"), name, ready, cmd,
+                                                "-" if mq is None else mq))
+            timelines.append(("熱" if warm else "冷", name, tl))
+    print("各階段 (開始-結束 ms)：")
+    for k, name, tl in timelines:
+        print("  %s %-8s %s" % (k, name, tl))
+    broker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+特性量測 -> 擬合 -> 校正表 的完整流程 (虛擬時間，馬達/伺服模型見 Sim/motor.py)
+兩顆馬達特性不同 (下輪磨損 load、起轉電壓較高)，伺服轉速對脈寬非線性
+  1. App 的 CZ_V 開關觸發 mainLike_optimized 的掃描，樣本串流寫入 CZ_LOG
+  2. Host/charfit.py 由 log 擬合出 CAL_DB，比照開機載入
+  3. 比較校正前後：同一個滑桿值下兩輪轉速相對目標 (滑桿% x RPM_MAX) 的誤差、伺服各等級轉速的線性誤差
+另以 tracemalloc 記錄掃描中 charz 持有的記憶體 (第 100 與第 300 筆時)，確認樣本沒有累積在 RAM
+用法: python bench_charz.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+sys.path.insert(0, os.path.join(HERE, "..", "Host"))
+
+import rig
+import sim
+import charz
+import charfit
+from motor import Motor, Servo
+
+SLIDERS = (20, 40, 60, 80, 100)
+
+
+def rig_up():
+    sim.virtual(1000000)
+    rig.app.TACH_A, rig.app.TACH_B = rig.TACH
+    app = rig.boot(period=0)
+    app.pc = None
+    app.blynk.run()
+    ms = [Motor(app.MAPWM, app.TACH_A, v0=0.5),
+          Motor(app.MBPWM, app.TACH_B, load=0.12, v0=0.8)]
+    sv = Servo(app.SERVO_PIN, app.SERVO_ADC)
+    now = [sim.ticks_ms()]
+
+    def advance(n):
+        for _ in range(n):
+            t0 = sim.ticks_us()
+            for m in ms:
+                m.step(1000, t0)
+            sv.step(1000)
+            now[0] += 1
+            if now[0] % app.TICK == 0:
+                rig.tick()
+    return app, ms, sv, advance
+
+
+def wheels(app, ms, advance):
+    """每個滑桿值穩定後兩輪轉速相對目標的誤差 %"""
+    out = []
+    app.blynk.hw(2, 1)
+    for pv in SLIDERS:
+        app.blynk.hw(3, pv)
+        app.blynk.hw(4, pv)
+        advance(1500)
+        goal = int(pv * 0.5 * 1023 / 100) * app.RPM_MAX // 1023
+        out.append([(m.rpm - goal) * 100 / goal for m in ms])
+    app.blynk.hw(2, 0)
+    advance(500)
+    return out
+
+
+def servo(app, sv, advance):
+    """各等級穩定轉速相對 (等級% x 最大轉速) 的誤差，以最大轉速的 % 表示"""
+    out = []
+    app.blynk.hw(0, 1)
+    rps = []
+    for lv in range(1, 6):
+        app.blynk.hw(1, lv)
+        advance(600)
+        rps.append(sv.rps)
+    app.blynk.hw(0, 0)
+    advance(200)
+    top = sv.max_rps
+    for lv, r in zip(range(1, 6), rps):
+        out.append((r - app.SERVO_MAP[lv] / 100 * top) * 100 / top)
+    return out
+
+
+def main():
+    app, ms, sv, advance = rig_up()
+    before_w = wheels(app, ms, advance)
+    before_s = servo(app, sv, advance)
+
+    tracemalloc.start()
+    t0 = sim.ticks_ms()
+    app.blynk.hw(app.CZ_V, 1)
+    advance(app.TICK)
+    held = []
+    while app.cz and app.cz.on:
+        advance(app.TICK)
+        if app.cz.rows in (100, 300) and len(held) < (app.cz.rows > 100) + 1:
+            snap = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, charz.__file__)])
+            held.append(sum(s.size for s in snap.statistics("filename")))
+    tracemalloc.stop()
+    rows = app.cz.rows
+    size = os.path.getsize(app.CZ_LOG)
+    print("掃描 %.1f s (虛擬)，%d 筆樣本，log %d bytes" % ((sim.ticks_ms() - t0) / 1000, rows, size))
+    print("charz 在 RAM 中持有：第 100 筆時 %d bytes、第 300 筆時 %d bytes" % tuple(held))
+
+    cal = charfit.fit(app.CZ_LOG)
+    charfit.write(app.CAL_DB, cal)
+    for name in sorted(cal):
+        k, d0, res = charfit.linfit(cal[name])
+        print("  %-6s 起轉 duty %5.1f  斜率 %6.2f/duty  線性殘差 %5.1f" % (name, d0, k, res))
+    c = charz.load(app.CAL_DB)
+    app.dm.ma.cal = c.get("ma")
+    app.dm.mb.cal = c.get("mb")
+    app.scal = c.get("servo")
+    after_w = wheels(app, ms, advance)
+    after_s = servo(app, sv, advance)
+    app.halt()
+    rig.shutdown()
+    sim.virtual(None)
+
+    print("%-8s %18s %18s" % ("滑桿", "校正前 上/下輪 %", "校正後 上/下輪 %"))
+    for pv, b, a in zip(SLIDERS, before_w, after_w):
+        print("%-8d %8.1f /%7.1f %8.1f /%7.1f" % (pv, b[0], b[1], a[0], a[1]))
+    print("%-8s %12s %12s" % ("伺服等級", "校正前 %", "校正後 %"))
+    for lv, b, a in zip(range(1, 6), before_s, after_s):
+        print("%-8d %12.1f %12.1f" % (lv, b, a))
+
+
+if __name__ == "__main__":
+    main()
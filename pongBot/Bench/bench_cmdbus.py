@@ -0,0 +1,162 @@
+"""
+指令匯流排 (cmdbus.py)：Blynk、MQTT 與本機輸入同時改轉速時的吞吐、排隊時間與一致性 (虛擬時間)
+每秒 RATE 個指令隨機分散在主迴圈的每一圈 (TICK ms) 中到達，來源比例 Blynk 50% / MQTT 30% / 本機 20%：
+  Blynk - V3/V4 轉速、V1 伺服等級 (blynk.process，同等待模式下收到封包時)
+  MQTT  - pongBot/importing/data 預設值 (mqtt_callback)
+  本機  - apply_preset (長按匯入快取命中，當下執行)
+每圈結束時檢查：
+  錯誤  - 上/下馬達的轉速設定不等於最後寫入者的值
+  App   - App 上 V3/V4 顯示的值 (App 自己送的或裝置回寫的) 與實際設定不同的圈數
+最後報告 put/run/被覆蓋次數、排隊時間 (虛擬 us)、Blynk 回寫與 pongBot/state 發佈次數、
+主機 CPU 每個指令 us 與可承受的指令/s，以及只有匯流排本身 (apply 不做事) 的 put+run 成本
+用法: python bench_cmdbus.py
+"""
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import cmdbus
+import preset
+from blynksim import frame
+from BlynkLib import MSG_HW
+
+RATES = (100, 1000, 5000)
+SECS = 2
+MIX = (0.5, 0.3, 0.2)
+SEED = 50
+
+app = rig.app
+
+
+class Pub:
+    """記錄 app 發佈的 MQTT 訊息 (不連 broker)"""
+
+    def __init__(self):
+        self.out = []
+
+    def publish(self, topic, msg, retain=False, qos=0):
+        self.out.append((topic, bytes(msg)))
+
+    def poll(self, block=True):
+        return None
+
+
+def arrivals(rate, rnd):
+    """[(到達 us, 來源, 內容)]"""
+    n = rate * SECS
+    ev = []
+    for _ in range(n):
+        t = rnd.randrange(SECS * 1000000)
+        r = rnd.random()
+        if r < MIX[0]:
+            pin = rnd.choice((3, 3, 4, 4, 1))
+            ev.append((t, cmdbus.BLYNK, (pin, rnd.randint(1, 5) if pin == 1 else rnd.randint(1, 100))))
+        else:
+            p = (rnd.randint(1, 5), rnd.randint(1, 100), rnd.randint(1, 100))
+            ev.append((t, cmdbus.MQTT if r < MIX[0] + MIX[1] else cmdbus.LOCAL, p))
+    ev.sort(key=lambda e: e[0])
+    return ev
+
+
+def shown(a, disp):
+    """從 Blynk 送出的封包更新 App 上 V3/V4 的顯示值"""
+    for pin, v in a.blynk.sent():
+        if pin in ("3", "4"):
+            disp[int(pin)] = int(v[0])
+    del a.blynk.tx[:]
+
+
+def mixed(rate):
+    rnd = random.Random(SEED + rate)
+    sim.virtual(1000000)
+    a = rig.direct(rig.boot(period=0))
+    a.mqtt = pub = Pub()
+    a.blynk.hw(2, 1)
+    rig.tick()
+    a.cb.reset()
+    del a.blynk.tx[:]
+    want = {3: int(a.dm.ma.s * 2), 4: int(a.dm.mb.s * 2)}
+    disp = dict(want)
+    bad = stale = ticks = 0
+    mid = 0
+    cpu = 0.0
+    t0 = sim.ticks_us()
+    ev = arrivals(rate, rnd)
+    k = 0
+    tick = a.TICK * 1000
+    end = t0 + SECS * 1000000 + 300000
+    while sim.ticks_us() < end:
+        c = time.perf_counter()
+        nxt = sim.ticks_us() + tick
+        while k < len(ev) and t0 + ev[k][0] < nxt:
+            t, src, x = ev[k]
+            k += 1
+            sim.set_us(t0 + t)
+            shown(a, disp)
+            if src == cmdbus.BLYNK:
+                mid = mid % 0xFFFF + 1
+                a.blynk.process(frame(MSG_HW, mid, "vw", x[0], x[1]))
+                if x[0] != 1:
+                    want[x[0]] = disp[x[0]] = x[1]
+            else:
+                if src == cmdbus.MQTT:
+                    a.mqtt_callback(b"pongBot/importing/data", bytes(preset.pack(*x)))
+                else:
+                    a.apply_preset(*x)
+                want[3], want[4] = x[1], x[2]
+        sim.set_us(nxt)
+        rig.tick()
+        cpu += time.perf_counter() - c
+        ticks += 1
+        bad += (a.dm.ma.s, a.dm.mb.s) != (want[3] * 0.5, want[4] * 0.5)
+        shown(a, disp)
+        stale += disp != want
+    b = a.cb
+    st = [m for t, m in pub.out if t == b"pongBot/state"]
+    last = preset.parse(st[-1]) if st else None
+    out = {"put": b.n_put, "run": b.n_run, "lww": b.n_lww, "bad": b.n_bad, "lat": b.lat // max(1, b.n_run),
+           "lat_max": b.lat_max, "err": bad, "stale": stale, "ticks": ticks, "state": len(st),
+           "state_ok": last == a.cur_preset(), "us": cpu * 1e6 / max(1, b.n_put), "cps": b.n_put / cpu}
+    a.mqtt = None
+    a.halt()
+    a.es.stop()
+    sim.virtual(None)
+    return out
+
+
+def bus_only(n=20000):
+    """只有匯流排：每圈 put 3 個指令 (其中一個覆蓋) 再 run，apply/echo 不做事"""
+    b = cmdbus.Bus(lambda k, i, v: None, lambda bus, m: None)
+    c = time.perf_counter()
+    for j in range(n // 3):
+        b.put(cmdbus.SPEED, 0, 1 + j % 100, cmdbus.BLYNK)
+        b.put(cmdbus.SPEED, 1, 1 + j % 100, cmdbus.MQTT)
+        b.put(cmdbus.SPEED, 0, 1 + j % 99, cmdbus.LOCAL)
+        b.run()
+    return (time.perf_counter() - c) * 1e6 / (n // 3 * 3), b
+
+
+def main():
+    print("每秒指令 x %d 秒，來源 Blynk/MQTT/本機 = %d/%d/%d%%，每圈 %d ms" % (
+        SECS, MIX[0] * 100, MIX[1] * 100, MIX[2] * 100, app.TICK))
+    print("%7s %7s %7s %7s %5s %9s %9s %5s %6s %7s %6s %8s %9s" % (
+        "指令/s", "put", "執行", "覆蓋", "丟棄", "排隊us", "最長us", "錯誤", "App不符", "state", "最終", "us/指令",
+        "可承受/s"))
+    for rate in RATES:
+        r = mixed(rate)
+        print("%7d %7d %7d %7d %5d %9d %9d %5d %6d/%d %7d %6s %8.1f %9.0f" % (
+            rate, r["put"], r["run"], r["lww"], r["bad"], r["lat"], r["lat_max"], r["err"], r["stale"], r["ticks"],
+            r["state"], "相同" if r["state_ok"] else "不同", r["us"], r["cps"]))
+    us, b = bus_only()
+    print("匯流排本身 (put+run，apply 不做事)：%.2f us/指令，約 %.0f 指令/s；%s" % (us, 1e6 / us, b.report()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+多球訓練：實際每分鐘球數、發球時間抖動、發球時馬達是否已到位
+主迴圈兩種等待方式：
+  固定  - 每圈 sleep TICK ms (原本的主迴圈)
+  due   - 等待時間縮短到 drill.due()，準時處理送球事件
+程式交替上旋/下旋 (80/40 <-> 40/80)，「到位」為發球瞬間漸變已完成的比例
+用法: python bench_drill.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import drill
+
+BALLS = 20
+CADENCES = (1000, 500, 300, 200)
+
+
+def run(cadence, use_due):
+    app = rig.boot()
+    p = drill.prog(*[(80, 40, 3, cadence), (40, 80, 3, cadence)] * (BALLS // 2))
+    ready = []
+    fire = app.drill_fire
+
+    def hook(v):
+        if v:
+            ready.append(not app.rp.busy)
+        fire(v)
+
+    app.dr.fire = hook
+    app.dr.start(p, 1, app.get_ms())
+    while app.dr.on:
+        rig.tick()
+        ms = app.TICK
+        if use_due and app.dr.on:
+            ms = min(ms, app.dr.due(app.get_ms()))
+        time.sleep(ms / 1000)
+    d = app.dr
+    rig.shutdown()
+    return d.bpm(), d.jit_sum / max(1, d.n), d.jit_max, sum(ready[1:]) / max(1, len(ready) - 1)
+
+
+def select():
+    """V6 與 pongBot/drill 都能選擇/停止程式"""
+    app = rig.boot()
+    app.blynk.hw(6, 2)
+    rig.tick()
+    by_blynk = app.dr.on and app.dr.p == app.DRILLS[1]
+    app.mqtt_callback(b"pongBot/drill", b"0")
+    rig.tick()
+    by_mqtt = not app.dr.on
+    rig.shutdown()
+    return by_blynk, by_mqtt
+
+
+def main():
+    b, m = select()
+    print("選擇程式: V6 %s  MQTT 停止 %s" % ("OK" if b else "失敗", "OK" if m else "失敗"))
+    print("每程式 %d 球，主迴圈 TICK %d ms，漸變 %d ms" % (BALLS, rig.app.TICK, rig.app.RAMP_T))
+    print("%-8s %-6s %10s %10s %12s %12s %8s" % ("間隔ms", "等待", "目標球/分", "實際球/分", "平均抖動ms", "最大抖動ms", "到位"))
+    for cadence in CADENCES:
+        for use_due in (False, True):
+            bpm, jit, jmax, ok = run(cadence, use_due)
+            print("%-8d %-6s %10d %10d %12.1f %12d %7.0f%%" % (
+                cadence, "due" if use_due else "固定", 60000 // cadence, bpm, jit, jmax, ok * 100))
+
+
+if __name__ == "__main__":
+    main()
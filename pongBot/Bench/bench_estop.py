@@ -0,0 +1,136 @@
+"""
+急停延遲量測 (模擬環境)
+情境：
+  link  - 網路中斷，主迴圈仍在跑
+  stall - 網路中斷且 blynk.run() 卡在阻塞呼叫 (如重新連線)
+  hang  - 主迴圈與計時器都停擺，只剩硬體看門狗
+  cmd   - V5 停止指令排在 20 筆滑桿指令之後，且 V10 長按進行中
+  batch - V2 開馬達的批次寫入 (hw.begin ... commit) 做到一半時急停觸發 (兩個 forward() 之間)
+用法: python bench_estop.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import machine
+
+LINK_MS = 1500
+PERIOD = 50
+WDT_MS = 1000
+TRIALS = 5
+
+
+def watch_stop(app):
+    """回傳 dict，在馬達 A PWM 被寫成 0 的瞬間記錄時間"""
+    got = {}
+
+    def hook(pin, kind, value):
+        if pin == app.MAPWM and kind == "duty" and value == 0 and "t" not in got:
+            got["t"] = time.monotonic()
+
+    machine.on_write = hook
+    return got
+
+
+def spin_up(app):
+    app.blynk.hw(3, 80)
+    app.blynk.hw(2, 1)
+    rig.loop(50)
+    assert machine.duties[app.MAPWM] > 0
+
+
+def trial_link(stall):
+    app = rig.boot(LINK_MS, PERIOD)
+    spin_up(app)
+    rig.loop(random.randint(0, 1000))
+    got = watch_stop(app)
+    last = app.blynk.lastRecv
+    t0 = time.monotonic()
+    app.blynk.up = False
+    if stall:
+        app.blynk.stall_ms = LINK_MS + 1000
+    rig.loop(LINK_MS * 3, until=lambda: "t" in got)
+    rig.shutdown()
+    machine.on_write = None
+    lat = (got["t"] - t0) * 1000
+    since = got["t"] * 1000 - (last + rig.sim._t0 * 1000)
+    return lat, since, app.es.reason
+
+
+def trial_hang():
+    app = rig.boot(LINK_MS, 0, WDT_MS)
+    spin_up(app)
+    got = watch_stop(app)
+    t0 = time.monotonic()
+    end = t0 + WDT_MS * 3 / 1000
+    while "t" not in got and time.monotonic() < end:
+        time.sleep(0.001)
+    rig.shutdown()
+    machine.on_write = None
+    return (got["t"] - t0) * 1000
+
+
+def trial_cmd():
+    app = rig.boot(LINK_MS, PERIOD)
+    spin_up(app)
+    app.blynk.hw(10, 1)
+    rig.loop(50)
+    for i in range(20):
+        app.blynk.hw(3, 40 + i)
+    app.blynk.hw(5, 1)
+    got = watch_stop(app)
+    t0 = time.monotonic()
+    rig.tick()
+    rig.shutdown()
+    machine.on_write = None
+    return (got["t"] - t0) * 1000, app.ip10
+
+
+def trial_batch():
+    app = rig.boot(LINK_MS, 0)
+    app.blynk.hw(3, 80)
+    app.blynk.hw(4, 60)
+    rig.tick()
+    fwd = app.dm.mb.forward
+
+    def tripped(s=100):
+        app.es.trip('link')
+        fwd(s)
+
+    app.dm.mb.forward = tripped
+    app.blynk.hw(2, 1)
+    rig.tick()
+    del app.dm.mb.forward
+    rig.loop(100)
+    rig.shutdown()
+    on = sum(bool(m.r or m.i1.value() or machine.duties.get(pw)) for m, pw in (
+        (app.dm.ma, app.MAPWM), (app.dm.mb, app.MBPWM)))
+    return app.es.tripped, on, app.hw.drops
+
+
+def stats(xs):
+    xs = sorted(xs)
+    return "min %7.1f  avg %7.1f  max %7.1f ms" % (xs[0], sum(xs) / len(xs), xs[-1])
+
+
+def main():
+    print("急停延遲 (link_ms=%d, period=%d, wdt_ms=%d, %d 次)" % (LINK_MS, PERIOD, WDT_MS, TRIALS))
+    for name, stall in (("link", False), ("stall", True)):
+        res = [trial_link(stall) for _ in range(TRIALS)]
+        print("%-6s 自斷線起  %s" % (name, stats([r[0] for r in res])))
+        print("%-6s 自最後封包 %s  上限 %d ms  觸發: %s" % (
+            name, stats([r[1] for r in res]), LINK_MS + PERIOD, ",".join(sorted(set(r[2] for r in res)))))
+    print("%-6s 自最後 feed %s  上限 %d ms" % ("hang", stats([trial_hang() for _ in range(3)]), WDT_MS))
+    res = [trial_cmd() for _ in range(TRIALS)]
+    print("%-6s 自收到封包 %s  長按已取消: %s" % ("cmd", stats([r[0] for r in res]), not any(r[1] for r in res)))
+    tr, on, drops = trial_batch()
+    print("%-6s 已觸發: %s  仍在轉的馬達: %d  批次中丟棄的寫入: %d" % ("batch", tr, on, drops))
+
+
+if __name__ == "__main__":
+    main()
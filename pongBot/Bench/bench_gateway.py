@@ -0,0 +1,149 @@
+"""
+多機閘道 (Host/gateway.py) 的擴充性：以 Host/loadgen.py 在另一個行程模擬 N 台機器連到本機閘道
+每個 N 分別量測合併寫入 (batch) 與每個封包各自 write：
+  連線    - 全部登入所需秒數
+  記憶體  - 閘道每個連線的 Python 記憶體 (tracemalloc，登入並收過遙測後)，與 budget() 的緩衝上限
+  轉送    - 每 FAN_MS 對全部機器套用一組預設值 (V2/V3/V4 轉速 + V6，同 App 的一次預設)，機器原樣回寫；
+            4 次 fanout() 加上送出 (write) 的微秒、送出到全部回覆 V6 的時間 (中位數/最大)、每組的 write 次數
+  CPU     - 量測期間閘道行程的 CPU 比例 (loadgen 在同一台機器上另一個行程)
+  遙測    - agg() 彙總到的台數 (每台每 TELE_MS 送一次)
+最後以 SLOW 台卡住 (不讀取) 的機器大量轉送，確認卡住連線的緩衝停在 wmax 以內 (超過的丟棄)，並在 h-beat 逾時後被斷線
+用法: python bench_gateway.py [最大台數]
+"""
+
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Host"))
+
+from gateway import Gateway
+from loadgen import TELE_PIN
+
+LOADGEN = os.path.join(HERE, "..", "Host", "loadgen.py")
+SIZES = (10, 100, 1000)
+FANOUTS = 20
+PRESET = ((2, 1), (3, 60), (4, 55))
+FAN_MS = 200
+TELE_MS = 1000
+HB = 2
+SLOW_N = 50
+SLOW = 10
+FLOOD = 2000
+
+
+async def spawn(g, n, secs, slow=0):
+    return await asyncio.create_subprocess_exec(
+        sys.executable, LOADGEN, g.host, str(g.port), str(n), "--secs", str(secs), "--tele", str(TELE_MS),
+        "--hb", str(HB), "--slow", str(slow), stdout=asyncio.subprocess.PIPE)
+
+
+async def logins(g, n, timeout=30):
+    end = time.monotonic() + timeout
+    while len(g.devs) < n and time.monotonic() < end:
+        await asyncio.sleep(0.02)
+    return len(g.devs)
+
+
+async def result(p):
+    out, _ = await p.communicate()
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+async def scale(n, batch):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    g = await Gateway(batch=batch).start()
+    acks = {}
+
+    def on_vw(s, pin, vals):
+        if pin == "6":
+            acks[vals[0]] = acks.get(vals[0], 0) + 1
+    g.on_vw = on_vw
+    secs = 2 + FANOUTS * FAN_MS / 1000 + n / 250
+    p = await spawn(g, n, secs)
+    t0 = time.monotonic()
+    up = await logins(g, n)
+    t_conn = time.monotonic() - t0
+    await asyncio.sleep(TELE_MS / 1000 + 0.2)
+    mem = (tracemalloc.get_traced_memory()[0] - base) / max(1, up)
+    tracemalloc.stop()
+    tele = g.agg(TELE_PIN)[0]
+
+    call, lat, w = [], [], []
+    cpu = time.process_time()
+    t_run = time.monotonic()
+    for k in range(FANOUTS):
+        seq = str(k)
+        w0 = g.stats["writes"]
+        t = time.perf_counter()
+        for pin, v in PRESET:
+            g.fanout(pin, v)
+        g.fanout(6, seq)
+        g._flush()
+        call.append((time.perf_counter() - t) * 1e6)
+        end = time.monotonic() + 2
+        while acks.get(seq, 0) < up and time.monotonic() < end:
+            await asyncio.sleep(0.001)
+        lat.append((time.perf_counter() - t) * 1000)
+        w.append(g.stats["writes"] - w0)
+        await asyncio.sleep(max(0, FAN_MS / 1000 - lat[-1] / 1000))
+    cpu = (time.process_time() - cpu) / (time.monotonic() - t_run)
+    lg = await result(p)
+    g.close()
+    return {"up": up, "conn_s": t_conn, "mem": mem, "budget": g.budget(), "call_us": statistics.median(call),
+            "lat50": statistics.median(lat), "latmax": max(lat), "writes": statistics.median(w), "cpu": cpu,
+            "tele": tele, "rtt": lg["rtt_p50"], "lost": sum(acks.get(str(k), 0) < up for k in range(FANOUTS))}
+
+
+async def stuck():
+    g = await Gateway().start()
+    p = await spawn(g, SLOW_N, 3 + HB * 1.5, SLOW)
+    await logins(g, SLOW_N)
+    await asyncio.sleep(0.2)
+    slow = [s for s in g.devs.values() if s.auth < "bot%04d" % SLOW]
+    big = "x" * 200
+    hi = 0
+    for k in range(FLOOD):
+        g.fanout(9, k, big)
+        await asyncio.sleep(0)
+        if k % 50 == 0:
+            await asyncio.sleep(0.002)
+        hi = max([hi] + [s.qn + s.tr.get_write_buffer_size() for s in slow])
+    drop = g.stats["wdrop"]
+    await asyncio.sleep(HB * 1.5 + 1.2)
+    left = sum(1 for s in g.devs.values() if s.auth < "bot%04d" % SLOW)
+    await result(p)
+    g.close()
+    return hi, g.wmax, drop, left
+
+
+async def run(sizes):
+    print("%6s %-6s %6s %8s %8s %9s %8s %8s %7s %6s %6s %7s" % (
+        "台數", "寫入", "連線s", "B/連線", "上限B", "轉送 us", "回覆中ms", "回覆大ms", "write", "CPU%", "遙測", "ping ms"))
+    for n in sizes:
+        for batch in (False, True):
+            r = await scale(n, batch)
+            print("%6d %-6s %6.2f %8d %8d %9.0f %8.1f %8.1f %7d %6.0f %6d %7d%s" % (
+                r["up"], "合併" if batch else "逐封包", r["conn_s"], r["mem"], r["budget"], r["call_us"],
+                r["lat50"], r["latmax"], r["writes"], r["cpu"] * 100, r["tele"], r["rtt"],
+                "  (%d 次未全部回覆)" % r["lost"] if r["lost"] else ""))
+    hi, wmax, drop, left = await stuck()
+    print("卡住的 %d/%d 台：轉送 %d 次 x 200B，卡住連線的最大佇列 %d B (wmax %d)，丟棄 %d 個封包，h-beat 逾時後剩 %d 台" % (
+        SLOW, SLOW_N, FLOOD, hi, wmax, drop, left))
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    asyncio.run(run([n for n in SIZES if n < top] + [top]))
+
+
+if __name__ == "__main__":
+    main()
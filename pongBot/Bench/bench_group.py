@@ -0,0 +1,108 @@
+"""
+多台發球機同時跑多球訓練的發球時間差 (虛擬時間，Sim/cloud.py 的記憶體內 Blynk 雲端)
+每台到雲端的單程延遲不同 (LATS，另加平均 JIT_MS 的指數分布抖動)，各自以 TICK 週期執行主迴圈
+  App 分別觸發 - App 同時對每台送 V6 (沒有領隊)
+  領隊不補償   - App 只觸發第一台 (領隊)，領隊經 bridge 轉送，每台都等 GRP_LEAD_MS 後開始
+  領隊補償     - 同上，但領隊由 ping 估計每台的時鐘差，送對方時鐘上的開始時間 (轉送途中的抖動不影響)
+每顆球的時間差 = 該顆球在各台實際發出時間的最大 - 最小
+另印出領隊估計的單程延遲 (與設定值比較) 與時鐘差：模擬中各台共用同一個時鐘，實際時鐘差為 0，估計值即為誤差
+用法: python bench_group.py
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import group
+from cloud import Cloud
+
+LATS = (20, 35, 80, 150)
+JIT_MS = 8
+WARM_MS = 12000
+DRILL = 1
+
+
+def setup(mode):
+    sim.virtual(1000000)
+    cloud = Cloud(seed=3)
+    bots = []
+    for i, lat in enumerate(LATS):
+        m = rig.app if i == 0 else rig.load("bot%d" % i)
+        b = cloud.device("bot%d" % i, lat, JIT_MS, heartbeat=m.HB)
+        rig.boot(period=0, blynk=b, m=m)
+        fires = []
+        fire = m.dr.fire
+
+        def rec(v, fire=fire, fires=fires):
+            if v:
+                fires.append(sim.ticks_ms())
+            fire(v)
+        m.dr.fire = rec
+        m.fires = fires
+        bots.append(m)
+    if mode:
+        lead = bots[0]
+        peers = [(30 + i, "bot%d" % i) for i in range(1, len(bots))]
+        lead.grp = group.Lead(lead.blynk, peers, lead.GRP_V, lead.run_drill, lead.GRP_LEAD_MS, lead.GRP_PING,
+                              comp=mode == 2)
+        for m in bots[1:]:
+            m.grp = group.Peer(m.blynk, m.GRP_CH, "bot0", m.GRP_V, m.run_drill)
+    return cloud, bots
+
+
+def run(bots, ms):
+    """每台在自己的下一圈時間執行一圈；等待時間比照 step() 依多球的下一事件縮短"""
+    nxt = [sim.ticks_ms() + i * 3 for i in range(len(bots))]
+    end = sim.ticks_ms() + ms
+    while sim.ticks_ms() < end:
+        now = min(nxt)
+        sim.set_us(now * 1000)
+        for i, m in enumerate(bots):
+            if nxt[i] != now:
+                continue
+            rig.tick(m)
+            w = m.TICK
+            if m.dr.on:
+                w = max(1, min(w, m.dr.due(now)))
+            nxt[i] = now + w
+
+
+def scenario(mode):
+    cloud, bots = setup(mode)
+    run(bots, WARM_MS)
+    if mode:
+        cloud.app(6, DRILL, devs=[cloud.devs["bot0"]])
+    else:
+        cloud.app(6, DRILL)
+    n = len(bots[0].DRILLS[DRILL - 1]) // 4 * bots[0].DRILL_REPS
+    run(bots, n * 2000 + 3000)
+    fires = [m.fires for m in bots]
+    skew = [max(f[j] for f in fires) - min(f[j] for f in fires) for j in range(min(len(f) for f in fires))]
+    owd = (list(bots[0].grp.owd), list(bots[0].grp.off)) if mode else None
+    for m in bots:
+        m.halt()
+        m.es.stop()
+        m.grp = None
+    sim.virtual(None)
+    return skew, [len(f) for f in fires], owd
+
+
+def main():
+    print("單程延遲 %s ms (+~%d ms 抖動)，領隊提前 %d ms" % (LATS, JIT_MS, rig.app.GRP_LEAD_MS))
+    print("%-12s %8s %12s %12s" % ("方式", "發球數", "平均時間差ms", "最大時間差ms"))
+    owd = None
+    for name, mode in (("App 分別觸發", 0), ("領隊不補償", 1), ("領隊補償", 2)):
+        skew, shots, o = scenario(mode)
+        owd = o or owd
+        print("%-12s %8s %12.1f %12d" % (name, "/".join(map(str, shots)),
+                                         sum(skew) / max(1, len(skew)), max(skew) if skew else -1))
+    print("領隊估計單程延遲 (ms)：%s，設定值 (領隊上行+隊員下行)：%s；估計時鐘差 (ms)：%s" % (
+        owd[0], [LATS[0] + lat for lat in LATS[1:]], owd[1]))
+
+
+if __name__ == "__main__":
+    main()
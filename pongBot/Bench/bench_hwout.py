@@ -0,0 +1,132 @@
+"""
+硬體輸出層：一次典型練習的周邊寫入次數與 Pin/PWM 物件建立次數
+比較 目前版本的 HwOut(cache=False) (每次寫入都直接寫出，等同加入 hwout 之前的寫入次數) 與 HwOut()，
+另可指定 git-ref 一併量測該版本的 mainLike_optimized (由 git 取出)，都跑同一段操作：
+  開伺服、切換等級、拖動兩個滑桿、開馬達並等漸變完成、運轉中再拖滑桿、
+  長按 V10/V12 發球 10 次 (儲存/匯入)、套用設定、關馬達與伺服
+用法: python bench_hwout.py [git-ref]   例如加入 hwout 前的 commit；未指定時只比較目前版本的兩種模式
+"""
+
+import os
+import subprocess
+import sys
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import machine
+import estop
+import presetdb
+import ramp
+from blynksim import SimBlynk
+
+BASE = sys.argv[1] if len(sys.argv) > 1 else None
+SHOTS = 10
+
+
+def load_base(ref):
+    src = subprocess.run(["git", "show", ref + ":mainLike_optimized.py"], cwd=rig.sim.ROOT,
+                         capture_output=True, check=True).stdout
+    m = types.ModuleType("mainLike_base")
+    m.__file__ = "mainLike_base.py"
+    exec(compile(src, m.__file__, "exec"), m.__dict__)
+    return m
+
+
+def boot(m, cache=True):
+    machine.reset_state()
+    m.LONG_T = m.HOLD_T = 20
+    m.rp = ramp.Ramp(m.RAMP_T, m.RAMP_P, m.RAMP_STAG)
+    if hasattr(m, "hw"):
+        m.hw = m.hwout.HwOut(cache)
+    m.dm = m.DualMotor(m.MA1, m.MA2, m.MAPWM, m.MB1, m.MB2, m.MBPWM)
+    if hasattr(m, "hw"):
+        m.ball = m.hw.pin(m.BALL_PIN, 0)
+    m.init_servo()
+    m.db = presetdb.PresetDB(slots=m.PDB_SLOTS)
+    m.blynk = SimBlynk()
+    m.es = estop.EStop(lambda: m.blynk.lastRecv, 60000, period=0, wdt_ms=0)
+    m.es.add(m.halt)
+    if hasattr(m, "cmdbus"):
+        m.cb = m.cmdbus.Bus(m.cmd_apply, m.cmd_echo)
+        m.es.add(m.cb.clear)
+    m.setup()
+
+
+def session(m):
+    def tick(n=1):
+        for _ in range(n):
+            m.blynk.run()
+            if hasattr(m, "cmdbus"):
+                m.cmd_run()
+            m.rp.step()
+            m.proc_all()
+            time.sleep(0.001)
+
+    def ui(pin, v):
+        m.blynk.hw(pin, v)
+        tick()
+
+    ui(0, 1)
+    for l in (1, 2, 3, 4, 5, 3, 2, 4, 1, 3):
+        ui(1, l)
+    for pin in (3, 4):
+        for v in list(range(20, 81, 2)) + list(range(80, 49, -2)):
+            ui(pin, v)
+    ui(2, 1)
+    tick(80)
+    for pin in (3, 4):
+        for v in list(range(50, 91, 2)) + list(range(90, 59, -2)):
+            ui(pin, v)
+    tick(80)
+    for k in range(SHOTS):
+        pin = 10 if k % 2 == 0 else 12
+        ui(pin, 1)
+        while not getattr(m, "it%d" % pin):
+            tick()
+        ui(pin, 0)
+        while getattr(m, "it%d" % pin):
+            tick()
+    for p in ((3, 70, 40), (4, 70, 40), (2, 55, 65)):
+        m.apply_preset(*p)
+        tick(40)
+    ui(2, 0)
+    ui(0, 0)
+
+
+def measure(m, cache=True):
+    boot(m, cache)
+    boot_stats = dict(machine.stats)
+    kinds = {"v": 0, "duty": 0}
+    machine.on_write = lambda pin, kind, value: kinds.__setitem__(kind, kinds[kind] + 1)
+    session(m)
+    machine.on_write = None
+    s = machine.stats
+    return {"gpio": kinds["v"], "duty": kinds["duty"], "boot_pin": boot_stats["pins"], "boot_pwm": boot_stats["pwms"],
+            "pin": s["pins"] - boot_stats["pins"], "pwm": s["pwms"] - boot_stats["pwms"],
+            "skips": m.hw.skips if hasattr(m, "hw") else 0}
+
+
+def main():
+    rig.flash()
+    rows = []
+    if BASE:
+        try:
+            rows.append((BASE, measure(load_base(BASE))))
+        except (subprocess.CalledProcessError, OSError) as e:
+            print("無法取得版本 %s：%s" % (BASE, e))
+    rows.append(("目前版本 cache=False", measure(rig.app, False)))
+    rows.append(("目前版本", measure(rig.app)))
+    print("典型練習：發球 %d 次" % SHOTS)
+    print("%-22s %12s %12s %12s %10s %10s %10s" % (
+        "", "開機 Pin/PWM", "練習中 Pin", "練習中 PWM", "GPIO 寫入", "duty 寫入", "略過寫入"))
+    for name, r in rows:
+        print("%-22s %8d/%-3d %12d %12d %10d %10d %10d" % (
+            name, r["boot_pin"], r["boot_pwm"], r["pin"], r["pwm"], r["gpio"], r["duty"], r["skips"]))
+
+
+if __name__ == "__main__":
+    main()
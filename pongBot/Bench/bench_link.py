@@ -0,0 +1,117 @@
+"""
+WiFi 斷線期間的主迴圈：
+  舊版  - 開機連上後沒有人監督 WLAN，斷線後 Blynk 也不會重新登入
+  阻塞  - 每圈檢查 isconnected()，斷線就在迴圈內 while not conn_wifi(): sleep(5)，連上後重連 Blynk
+  Link  - wifi.Link 監督，每圈 tick() 只讀 status()，連上時通知 Blynk/MQTT 立即重連
+虛擬時間執行 (模擬 WLAN 參數見 Sim/network.py)；MQTT 連到本機 broker 替身
+重連本身是阻塞的：Blynk connect() 阻塞 BLYNK_MS、MQTT connect() 阻塞 MQTT_MS (DNS + TCP (+ CONNACK)，同 bench_boot)，
+Link 連上時先重連 Blynk，MQTT 延後 MQTT_DEFER ms 到之後的一圈
+基地台消失 OUTAGES ms 後恢復 (Sim/network.py 的 down)，WLAN 斷線期間 Blynk 與 broker 都連不到
+量測：
+  恢復 - 基地台恢復到 WLAN 取得 IP / MQTT 重連 / Blynk 重新登入的時間
+  卡頓 - 斷線到全部恢復期間主迴圈單圈最長時間 (正常一圈約 TICK ms，重連的那一圈含阻塞的 connect)、
+         超過 100 ms 的圈數，以及這段時間跑了幾圈
+註：真的 ESP8266 晶片會自動重新關聯，但舊版迴圈仍不會重連 Blynk，結果相同
+用法: python bench_link.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import sim
+import network
+import wifi
+from umqtt import simple
+from broker import Broker
+
+app = rig.app
+
+SHEP = dict(network.aps[0])
+OUTAGES = (3000, 15000)
+LIMIT = 60000
+MQTT_MS = 600
+BLYNK_MS = 300
+
+
+def run(mode, out_ms, broker):
+    rig.flash()
+    network.aps[:] = [SHEP]
+    w = network.WLAN()
+    w._init()
+    sim.virtual(0)
+    app.conn_wifi()
+    rig.boot(period=0)
+    app.pc = None
+    app.tl = None
+    rig.mqtt(broker)
+    app.blynk.connect_ms = BLYNK_MS
+    if mode == "Link":
+        app.wl = wifi.Link(w, app.WIFI, app.WIFI_DB, app.link_up, app.link_down, app.LINK_CHK)
+
+    def step():
+        up = w.isconnected()
+        if mode == "阻塞" and not up:
+            while not app.conn_wifi():
+                time.sleep(5)
+            up = True
+        app.blynk.up = up
+        if broker.up != up:
+            broker.set_up(up)
+        if mode == "阻塞" and up and not app.blynk.state:
+            app.blynk.connect()
+        app.step()
+
+    got = {}
+    worst = loops = slow = 0
+    checks = (("wifi", w.isconnected),
+              ("mqtt", lambda: app.mqtt.up),
+              ("blynk", lambda: app.blynk.state == 2))
+    end = sim.ticks_ms() + 2000
+    while sim.ticks_ms() < end:
+        step()
+    t_out = sim.ticks_ms()
+    t_back = t_out + out_ms
+    network.down = (t_out, t_back)
+    while sim.ticks_ms() - t_back < LIMIT and len(got) < len(checks):
+        t0 = sim.ticks_ms()
+        step()
+        loops += 1
+        worst = max(worst, sim.ticks_ms() - t0)
+        slow += sim.ticks_ms() - t0 > 100
+        if sim.ticks_ms() < t_back:
+            continue
+        for k, ok in checks:
+            if k not in got and ok():
+                got[k] = sim.ticks_ms() - t_back
+    network.down = None
+    stats = (app.wl.drops, app.wl.tries) if app.wl else None
+    app.wl = None
+    rig.shutdown()
+    sim.virtual(None)
+    return got, worst, loops, slow, stats
+
+
+def main():
+    broker = Broker().start()
+    simple.connect_ms = MQTT_MS
+    print("WLAN 關聯 %d ms (指定 bssid) / %d ms (晶片掃描)；Blynk 連線 %d ms、MQTT 連線 %d ms (阻塞)；主迴圈 TICK %d ms" % (
+        network.assoc_ms, network.scan_ms + network.assoc_ms, BLYNK_MS, MQTT_MS, app.TICK))
+    print("%-8s %-6s %10s %10s %10s %12s %8s %8s" % (
+        "斷線ms", "方式", "WLAN ms", "MQTT ms", "Blynk ms", "最長一圈 ms", ">100ms", "圈數"))
+    for out_ms in OUTAGES:
+        for i, mode in enumerate(("舊版", "阻塞", "Link")):
+            got, worst, loops, slow, stats = run(mode, out_ms, broker)
+            print("%-8s %-6s %10s %10s %10s %12d %8d %8d%s" % (
+                out_ms if i == 0 else "", mode,
+                got.get("wifi", "未恢復"), got.get("mqtt", "未恢復"), got.get("blynk", "未恢復"),
+                worst, slow, loops, "  (斷線 %d 次, 嘗試關聯 %d 次)" % stats if stats else ""))
+    simple.connect_ms = 0
+    broker.close()
+
+
+if __name__ == "__main__":
+    main()
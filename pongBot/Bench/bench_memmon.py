@@ -0,0 +1,112 @@
+"""
+長時間操作下的 heap 與回收時機：不監控 (只靠 heap 滿時的自動回收) vs memmon 在空檔回收
+虛擬時間執行真正的 step()，heap 以 sim.heap() 模型 (tracemalloc，見 Sim/sim.py) 模擬，
+回收依 heap 大小推進虛擬時鐘 (ESP8266 約 US_PER_KB us/KB)
+情境 (每種方式相同)：全程滑桿風暴 (每 STORM_MS 一組 V3/V4)，
+  第 1 分鐘起每 PRESS_MS 長按一次 V10，第 2 分鐘起跑多球訓練 DRILLS[0]
+量測：自動回收次數 (其中在長按發球中的次數)、長按發球延遲最大值、多球發球延遲最大值、
+  最低可用量，以及 memmon 的各子系統每分鐘配置量
+用法: python bench_memmon.py [分鐘數]
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import memmon
+import telemetry
+
+MINUTES = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+HEAP = 36000
+US_PER_KB = 120
+STORM_MS = 50
+PRESS_MS = 8000
+
+
+def run(mon):
+    sim.virtual(1000000)
+    app = rig.boot(period=0)
+    app.blynk.run()
+    app.tl = telemetry.Telemetry(app.tele_fill, app.tele_send, app.TELE_T, app.TELE_BUDGET)
+    reps = []
+    if mon:
+        app.mm = memmon.Mem(app.MM_SEC, app.MM_BUDGET, app.MM_LOW, app.MM_GAP, app.MM_PROBE, app.MM_T,
+                            lambda m: reps.append(m.report()))
+    hits = []
+    h = sim.heap(HEAP, us_per_kb=US_PER_KB,
+                 on_auto=lambda: hits.append(app.ip10 or app.it10 or (app.dr.on and app.dr.pulsing)))
+    t0 = sim.ticks_ms()
+    end = t0 + MINUTES * 60000
+    next_storm = t0
+    next_press = t0 + 60000
+    release = None
+    pressed = None
+    fire_late = 0
+    drill = False
+    free_min = HEAP
+    ball = 0
+    app.blynk.hw(2, 1)
+    i = 0
+    while sim.ticks_ms() < end:
+        now = sim.ticks_ms()
+        if now >= next_storm:
+            i += 1
+            app.blynk.hw(3, 40 + i % 50)
+            app.blynk.hw(4, 30 + i * 7 % 50)
+            next_storm += STORM_MS
+        if now >= next_press and not drill:
+            app.blynk.hw(10, 1)
+            pressed = now
+            release = now + app.LONG_T + 500
+            next_press += PRESS_MS
+        if release and now >= release:
+            app.blynk.hw(10, 0)
+            release = None
+        if not drill and now - t0 >= 120000:
+            drill = True
+            app.run_drill(1)
+        app.step()
+        del app.blynk.tx[:]
+        b = app.ball.value()
+        if b and not ball and pressed is not None:
+            fire_late = max(fire_late, sim.ticks_ms() - pressed - app.LONG_T)
+            pressed = None
+        ball = b
+        free_min = min(free_min, HEAP - h.used)
+        if drill and not app.dr.on:
+            app.run_drill(1)
+    out = {"auto": h.auto, "auto_shot": sum(hits), "collects": h.collects, "fire_late": fire_late,
+           "drill_late": app.dr.jit_max, "free_min": free_min, "reps": reps}
+    if mon:
+        out["mm"] = app.mm
+    app.halt()
+    rig.shutdown()
+    sim.heap(None)
+    sim.virtual(None)
+    return out
+
+
+def main():
+    print("模擬 heap %d bytes，回收 %d us/KB (約 %.1f ms)，%d 分鐘" % (
+        HEAP, US_PER_KB, US_PER_KB * HEAP / 1024 / 1000, MINUTES))
+    print("%-8s %6s %10s %8s %12s %12s %10s" % ("方式", "自動", "發球中自動", "總回收", "長按延遲ms", "多球延遲ms", "最低可用"))
+    res = []
+    for name, mon in (("不監控", False), ("memmon", True)):
+        r = run(mon)
+        res.append(r)
+        print("%-8s %6d %10d %8d %12d %12d %10d" % (name, r["auto"], r["auto_shot"], r["collects"],
+                                                   r["fire_late"], r["drill_late"], r["free_min"]))
+    m = res[1]["mm"]
+    print("memmon：空檔回收 %d 次 (強制 %d)，平均 %.1f ms、最長 %.1f ms，最大連續區塊 %s" % (
+        m.collects, m.forced, m.gc_us / 1000, m.gc_max / 1000, m.block))
+    print("各子系統每分鐘配置 (bytes，模擬為 CPython 物件大小)：")
+    for k, rep in enumerate(res[1]["reps"]):
+        print("  第 %d 分鐘  %s" % (k + 1, rep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+MQTT 故障注入測試：舊版單次連線 vs mqttlink.MqttLink
+對本機 broker 替身注入斷線 (kill) 與停機 (拒絕連線)，量測：
+  - 存檔訊息送達率 (bot -> broker)
+  - 離線期間 broker 發出之 QoS 1 回覆的送達率 (持久 session)
+  - 每次故障後的恢復時間 (重新連線且 outbox 清空)
+用法: python bench_mqttlink.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+sys.path.insert(0, os.path.join(HERE, "..", "Host"))
+
+import sim
+
+sim.install()
+
+import mqttlink
+import preset
+from broker import Broker
+from umqtt.simple import MQTTClient
+
+DURATION = 12.0
+SAVE_EVERY = 0.15
+REPLY_EVERY = 0.5
+# (開始秒數, 種類, 持續秒數)
+FAULTS = [(2.0, "kill", 0), (4.0, "down", 2.0), (8.0, "kill", 0), (9.0, "down", 1.5)]
+
+
+class Old:
+    """原本 mainLike_optimized 的用法：連一次，錯誤全部吞掉"""
+
+    def __init__(self, port, cb):
+        self.c = MQTTClient("pongBot", "127.0.0.1", port)
+        self.c.set_callback(cb)
+        self.c.connect()
+        self.c.subscribe(b"pongBot/save/successful")
+        self.up = True
+
+    def poll(self):
+        try:
+            self.c.check_msg()
+        except Exception:
+            pass
+        return self.up
+
+    def publish(self, topic, msg, keep=False):
+        try:
+            self.c.publish(topic, msg)
+        except Exception:
+            pass
+
+    def close(self):
+        try:
+            self.c.disconnect()
+        except Exception:
+            pass
+
+
+def run(kind):
+    broker = Broker().start()
+    got = set()
+    replies = []
+    broker.on_publish = lambda t, m, cid: got.add(bytes(m)) if t == b"pongBot/preset/save" else None
+    cb = lambda t, m: replies.append(m)
+    tmp = tempfile.mkdtemp()
+    if kind == "old":
+        bot = Old(broker.port, cb)
+    else:
+        bot = mqttlink.MqttLink("pongBot", "127.0.0.1", cb, keepalive=2, port=broker.port,
+                                outbox=os.path.join(tmp, "outbox.bin"), cap=64,
+                                backoff=100, backoff_max=800)
+        bot.sub(b"pongBot/save/successful")
+    t0 = time.monotonic()
+    sent = 0
+    n_reply = 0
+    next_save = next_reply = 0.0
+    faults = list(FAULTS)
+    pending = []  # 故障結束時間，等待恢復
+    recov = []
+    while True:
+        t = time.monotonic() - t0
+        if t >= DURATION:
+            break
+        if faults and t >= faults[0][0]:
+            _, what, dur = faults.pop(0)
+            if what == "kill":
+                broker.kill()
+                pending.append(t)
+            else:
+                broker.set_up(False)
+                faults.insert(0, (t + dur, "up", 0))
+                faults.sort()
+        if faults and faults[0][1] == "up" and t >= faults[0][0]:
+            faults.pop(0)
+            broker.set_up(True)
+            pending.append(t)
+        bot.poll()
+        if pending and kind == "new" and bot.up and not bot.box.n and time.monotonic() - t0 > pending[0] + 0.001:
+            if bot.t_up is not None and (bot.t_up / 1000 + sim._t0 - t0) >= pending[0]:
+                recov.append((time.monotonic() - t0 - pending.pop(0)) * 1000)
+        if t >= next_save:
+            sent += 1
+            bot.publish(b"pongBot/preset/save", bytes(preset.pack(1 + sent // 100, 1 + sent % 100, 1)), True)
+            next_save += SAVE_EVERY
+        if t >= next_reply:
+            n_reply += 1
+            broker.publish(b"pongBot/save/successful", b"TRUE", qos=1)
+            next_reply += REPLY_EVERY
+        time.sleep(0.005)
+    end = time.monotonic() + 3
+    while kind == "new" and (bot.box.n or not bot.up) and time.monotonic() < end:
+        bot.poll()
+        time.sleep(0.005)
+    time.sleep(0.2)
+    bot.poll()
+    bot.close()
+    broker.close()
+    return sent, len(got), n_reply, len(replies), recov, bot
+
+
+def main():
+    print("故障注入: %s，每 %.0f ms 存檔一次，共 %.0f s" % (
+        ", ".join("%s@%.1fs" % (f[1], f[0]) for f in FAULTS), SAVE_EVERY * 1000, DURATION))
+    for kind in ("old", "new"):
+        sent, got, n_reply, replies, recov, bot = run(kind)
+        print("[%s] 存檔送達 %d/%d = %.1f%%   broker 回覆送達 %d/%d = %.1f%%" % (
+            kind, got, sent, got * 100 / sent, min(replies, n_reply), n_reply, min(replies, n_reply) * 100 / n_reply))
+        if kind == "new":
+            print("      恢復時間 (ms): %s   重連 %d 次，失敗 %d 次，outbox 丟棄 %d" % (
+                ", ".join("%.0f" % r for r in recov), bot.connects, bot.fails, bot.box.dropped))
+
+
+if __name__ == "__main__":
+    main()
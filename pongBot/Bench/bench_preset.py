@@ -0,0 +1,76 @@
+"""
+發球設定匯入解析效能：舊版文字解析 vs preset 模組
+量測每次解析的時間與堆積峰值 (tracemalloc)，以及存檔時送出的 MQTT 位元組數
+用法: python bench_preset.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import sim
+
+sim.install()
+
+import preset
+
+N = 20000
+LEGACY = b'{"servo_level": 3, "motor_top": 64, "motor_bottom": 48}'
+BINARY = bytes(preset.pack(3, 64, 48))
+
+
+def old_parse(msg):
+    """原本 mqtt_callback 內的解析流程 (不含寫入硬體)"""
+    out = [0, 0, 0]
+    payload = msg.decode().strip().strip('"').strip('{}')
+    for pair in payload.split(','):
+        if ':' in pair:
+            k, v = pair.split(':', 1)
+            k, v = k.strip().strip('"'), int(v.strip().strip('"'))
+            if k == 'servo_level' and 1 <= v <= 5:
+                out[0] = v
+            elif k == 'motor_top' and 1 <= v <= 100:
+                out[1] = v
+            elif k == 'motor_bottom' and 1 <= v <= 100:
+                out[2] = v
+    return out
+
+
+def timed(f, msg):
+    t = time.perf_counter()
+    for _ in range(N):
+        f(msg)
+    return (time.perf_counter() - t) / N * 1e6
+
+
+def peak(f, msg):
+    f(msg)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    f(msg)
+    p = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return p
+
+
+def main():
+    assert list(old_parse(LEGACY)) == list(preset.parse(LEGACY)) == list(preset.parse(BINARY))
+    print("%-24s %10s %10s" % ("解析器", "us/次", "堆積峰值 B"))
+    for name, f, msg in (("舊版文字解析", old_parse, LEGACY),
+                         ("preset 舊格式", preset.parse, LEGACY),
+                         ("preset 二進位 v1", preset.parse, BINARY)):
+        print("%-24s %10.2f %10d" % (name, timed(f, msg), peak(f, msg)))
+    old = sum(len(t) + len(m) + 4 for t, m in ((b"pongBot/servo/level", b"3"),
+                                               (b"pongBot/motor/top", b"64"),
+                                               (b"pongBot/motor/bottom", b"48")))
+    new = len(b"pongBot/preset/save") + preset.SIZE + 4
+    print("存檔 MQTT 位元組：舊版 3 則 %d B，v1 1 則 %d B" % (old, new))
+    print("匯入 MQTT 酬載：舊格式 %d B，v1 %d B" % (len(LEGACY), len(BINARY)))
+
+
+if __name__ == "__main__":
+    main()
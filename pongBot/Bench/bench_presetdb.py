@@ -0,0 +1,81 @@
+"""
+匯入設定延遲：裝置端快取命中 vs 走 MQTT broker 往返
+V12 長按觸發 imp() 起算，到馬達速度套用為止
+情境：
+  local   - 本機 broker 替身，responder 立即回覆
+  remote  - 模擬公用 broker：responder 延遲 RTT + 服務時間
+  offline - broker 停機
+用法: python bench_presetdb.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import preset
+from broker import Broker
+
+TRIALS = 10
+TARGET = (4, 72, 36)
+SCENARIOS = (("local", 0.0, True), ("remote", 0.35, True), ("offline", 0.0, False))
+TIMEOUT_MS = 3000
+
+
+def responder(broker, delay):
+    def on_pub(topic, msg, cid):
+        if topic == b"pongBot/importing":
+            reply = lambda: broker.publish(b"pongBot/importing/data", bytes(preset.pack(*TARGET)), qos=1)
+            threading.Timer(delay, reply).start() if delay else reply()
+    broker.on_publish = on_pub
+
+
+def trial(cached, delay, up):
+    rig.flash()
+    app = rig.boot()
+    broker = Broker().start()
+    responder(broker, delay)
+    rig.mqtt(broker)
+    rig.loop(50, until=lambda: app.mqtt.up)
+    if cached:
+        app.db.put(*TARGET)
+    broker.set_up(up)
+    app.dm.ma.set_speed(10)
+    applied = []
+    apply = app.cb.apply
+
+    def hook(k, i, v):
+        apply(k, i, v)
+        applied.append(time.perf_counter())
+
+    app.cb.apply = hook
+    t0 = time.perf_counter()
+    app.imp()
+    rig.loop(TIMEOUT_MS, dt=0.001, until=lambda: applied)
+    app.cb.apply = apply
+    rig.shutdown()
+    broker.close()
+    return (applied[0] - t0) * 1000 if applied else None
+
+
+def fmt(xs):
+    ok = [x for x in xs if x is not None]
+    if not ok:
+        return "逾時 (%d ms 內未套用)" % TIMEOUT_MS
+    ok.sort()
+    return "中位 %8.3f  最大 %8.3f ms  成功 %d/%d" % (ok[len(ok) // 2], ok[-1], len(ok), len(xs))
+
+
+def main():
+    print("匯入延遲 (%d 次)" % TRIALS)
+    for name, delay, up in SCENARIOS:
+        for cached in (False, True):
+            xs = [trial(cached, delay, up) for _ in range(TRIALS if up else 2)]
+            print("%-8s %-6s %s" % (name, "快取" if cached else "無快取", fmt(xs)))
+
+
+if __name__ == "__main__":
+    main()
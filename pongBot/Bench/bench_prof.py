@@ -0,0 +1,100 @@
+"""
+處理函式計時 (prof.py) 本身的成本
+在 mainLike_optimized 的 Blynk 與 MQTT 分派路徑上，比較停用與啟用時每次分派的 CPU 微秒 (兩種狀態交錯量測，各取最小)：
+  blynk - V3 滑桿封包 (process 解碼 + 分派到 v3)
+  mqtt  - pongBot/importing/data 預設值 (mqtt_callback 分派到 m_data)
+停用時分派表中的函式應與原函式是同一個物件 (等同未登記)；另量測空函式經包裝的成本，最後印出 dump()
+用法: python bench_prof.py
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import preset
+import prof
+from blynksim import frame
+from BlynkLib import MSG_HW
+
+N = 500
+REPEAT = 15
+
+app = rig.app
+
+
+def per_call(fn, n=N):
+    t = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t) * 1e6 / n
+
+
+def wrapper():
+    """空函式直接呼叫 vs 經計時包裝，每次 us (交錯量測取最小)"""
+    pf = prof.Prof()
+    box = {"f": lambda v: None}
+
+    def put(g):
+        box["f"] = g
+    pf.add("noop", box["f"], put)
+    r = [None, None]
+    for _ in range(REPEAT):
+        for on in (False, True):
+            pf.enable(on)
+            f = box["f"]
+
+            def go():
+                for _ in range(10000):
+                    f(1)
+            us = per_call(go, 10000)
+            r[on] = us if r[on] is None else min(r[on], us)
+    return r
+
+
+def main():
+    rig.direct(rig.boot(period=0))
+    app.blynk.run()
+    data = b"".join(frame(MSG_HW, 1 + i, "vw", 3, 20 + i % 80) for i in range(N))
+    msgs = [preset.pack(1 + i % 5, 20 + i % 80, 60) for i in range(N)]
+
+    def blynk():
+        app.blynk.process(data)
+        del app.blynk.tx[:]
+
+    def mqtt():
+        for m in msgs:
+            app.mqtt_callback(b"pongBot/importing/data", m)
+        del app.blynk.tx[:]
+
+    orig = (dict(app.blynk._cbks), {t: list(h) for t, h in app.mq.exact.items()})
+    pf = prof.Prof()
+    pf.blynk(app.blynk)
+    pf.router(app.mq)
+    same = app.blynk._cbks == orig[0] and {t: list(h) for t, h in app.mq.exact.items()} == orig[1]
+    r = {}
+    for _ in range(REPEAT):
+        for on in (False, True):
+            pf.enable(on)
+            for k, fn in (("blynk", blynk), ("mqtt", mqtt)):
+                us = per_call(fn)
+                r[on, k] = min(r.get((on, k), us), us)
+    pf.enable(False)
+    back = app.blynk._cbks == orig[0]
+    rows = [("停用", r[False, "blynk"], r[False, "mqtt"]), ("啟用", r[True, "blynk"], r[True, "mqtt"])]
+    rig.shutdown()
+    w = wrapper()
+
+    print("登記 %d 個處理函式；停用時分派表與原本相同：%s，啟用後再停用還原：%s" % (len(pf.names), same, back))
+    print("%-8s %12s %12s" % ("狀態", "blynk us", "mqtt us"))
+    for name, b, m in rows:
+        print("%-8s %12.2f %12.2f" % (name, b, m))
+    print("啟用比停用多：blynk %+.2f us、mqtt %+.2f us / 次" % (rows[1][1] - rows[0][1], rows[1][2] - rows[0][2]))
+    print("空函式：直接呼叫 %.3f us，經計時包裝 %.3f us" % tuple(w))
+    print("dump：", pf.dump())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+馬達漸變曲線：到達目標轉速的時間、消耗的主迴圈圈數、電池最低電壓
+以虛擬時間執行 (主迴圈每 TICK ms 一圈，物理模型每 1 ms 積分)
+流程：V3/V4 設 100，接著 V2 開啟兩顆馬達 (經 Blynk 處理函式，走 DCMotor.out -> ramp)
+模型：
+  馬達 - 反電動勢 E 一階追隨施加電壓 (機械時間常數 TAU)，電流 I = (V - E) / R
+  電池 - 3.7 V、內阻 R_BAT；低於 BROWNOUT 視為 ESP8266 重開機
+用法: python bench_ramp.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import machine
+import ramp
+
+V_BAT = 3.7
+R_BAT = 0.45
+R_MOT = 2.2
+TAU = 0.15
+BROWNOUT = 3.0
+TICK = 10
+END_MS = 1500
+
+PROFILES = (
+    ("直接跳到目標", None),
+    ("線性", (ramp.LINEAR, 0)),
+    ("S 曲線", (ramp.SCURVE, 0)),
+    ("線性+錯開", (ramp.LINEAR, 150)),
+    ("S 曲線+錯開", (ramp.SCURVE, 150)),
+)
+
+
+def run(cfg, ms):
+    app = rig.direct(rig.boot())
+    app.rp = ramp.Ramp(ms, *cfg) if cfg else None
+    app.blynk.hw(3, 100)
+    app.blynk.hw(4, 100)
+    app.blynk.run()
+    app.cmd_run()
+    app.blynk.hw(2, 1)
+    app.blynk.run()
+    app.cmd_run()
+    pins = (app.MAPWM, app.MBPWM)
+    goal = [int(m.s * 1023 / 100) / 1023 * V_BAT for m in (app.dm.ma, app.dm.mb)]
+    e = [0.0, 0.0]
+    vmin = V_BAT
+    i_peak = 0
+    t_done = None
+    ticks = 0
+    cpu = 0
+    for now in range(END_MS):
+        if now % TICK == 0 and app.rp:
+            t = time.perf_counter()
+            if app.rp.step(now):
+                ticks += 1
+            cpu += time.perf_counter() - t
+        i_tot = 0
+        for k, p in enumerate(pins):
+            v = machine.duties.get(p, 0) / 1023 * V_BAT
+            i = (v - e[k]) / R_MOT
+            e[k] += (v - e[k]) * 0.001 / TAU
+            i_tot += i
+        i_peak = max(i_peak, i_tot)
+        vmin = min(vmin, V_BAT - i_tot * R_BAT)
+        if t_done is None and e[0] >= 0.95 * goal[0] and e[1] >= 0.95 * goal[1]:
+            t_done = now
+    rig.shutdown()
+    return t_done, ticks, cpu * 1e6 / max(ticks, 1), i_peak, vmin
+
+
+def main():
+    print("電池 %.1f V 內阻 %.2f Ω，馬達 %.1f Ω，τ=%d ms，低於 %.1f V 視為重開機" % (
+        V_BAT, R_BAT, R_MOT, TAU * 1000, BROWNOUT))
+    print("%-14s %6s %10s %8s %10s %10s %9s %6s" % (
+        "曲線", "漸變ms", "達95%ms", "迴圈數", "每圈 us", "峰值電流", "最低電壓", "重開機"))
+    for name, cfg in PROFILES:
+        for ms in ((0,) if cfg is None else (200, 400, 800)):
+            t_done, ticks, us, i_peak, vmin = run(cfg, ms)
+            print("%-14s %6d %10s %8d %10.1f %8.2f A %7.2f V %6s" % (
+                name, ms, t_done if t_done is not None else "-", ticks, us, i_peak, vmin,
+                "是" if vmin < BROWNOUT else "否"))
+
+
+if __name__ == "__main__":
+    main()
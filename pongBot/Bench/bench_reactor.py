@@ -0,0 +1,102 @@
+"""
+主迴圈 I/O：各自輪詢 (blynk.run + mqtt.check_msg + sleep) vs reactor 單一 poll
+連到本機 Blynk 伺服器替身與 MQTT broker 替身，量測：
+  - 閒置時每秒的 socket/poll/sleep 呼叫次數 (sys.setprofile 統計)
+  - MQTT 匯入延遲：broker 發出 pongBot/importing/data 到指令匯流排套用完成
+用法: python bench_reactor.py
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import preset
+import reactor
+from blynkd import BlynkServer
+from blynksim import TcpBlynk
+from broker import Broker
+
+IDLE_S = 2.0
+SAMPLES = 30
+CALLS = {"recv", "recv_into", "send", "sendall", "poll", "sleep", "select", "setblocking", "settimeout"}
+
+
+def count_calls(fn):
+    n = [0]
+
+    def prof(frame, event, arg):
+        if event == "c_call" and getattr(arg, "__name__", "") in CALLS:
+            n[0] += 1
+
+    sys.setprofile(prof)
+    try:
+        fn()
+    finally:
+        sys.setprofile(None)
+    return n[0]
+
+
+def run(use_reactor):
+    broker = Broker().start()
+    srv = BlynkServer().start()
+    app = rig.app
+    blynk = TcpBlynk("sim", server=srv.host, port=srv.port, insecure=True, heartbeat=app.HB)
+    rig.boot(blynk=blynk)
+    rig.mqtt(broker)
+    app.rx = reactor.Reactor() if use_reactor else None
+    end = time.monotonic() + 2
+    while not (app.mqtt.up and blynk.state == 2) and time.monotonic() < end:
+        app.step()
+
+    def idle():
+        end = time.monotonic() + IDLE_S
+        while time.monotonic() < end:
+            app.step()
+
+    calls = count_calls(idle) / IDLE_S
+
+    lat = []
+    applied = []
+    apply = app.cb.apply
+
+    def hook(k, i, v):
+        apply(k, i, v)
+        applied.append(time.perf_counter())
+
+    app.cb.apply = hook
+    for i in range(SAMPLES):
+        sent = []
+        p = (1 + i % 5, 10 + i, 20 + i)
+        t = threading.Timer(random.uniform(0.005, 0.03), lambda: (
+            sent.append(time.perf_counter()),
+            broker.publish(b"pongBot/importing/data", bytes(preset.pack(*p)), qos=1)))
+        t.start()
+        del applied[:]
+        end = time.monotonic() + 1
+        while not applied and time.monotonic() < end:
+            app.step()
+        if applied and sent:
+            lat.append((applied[0] - sent[0]) * 1000)
+    app.cb.apply = apply
+    rig.shutdown()
+    blynk.conn.close()
+    srv.close()
+    broker.close()
+    lat.sort()
+    return calls, lat
+
+
+def main():
+    print("%-8s %14s %14s %14s" % ("", "呼叫/閒置秒", "匯入延遲中位", "匯入延遲最大"))
+    for name, use in (("輪詢", False), ("reactor", True)):
+        calls, lat = run(use)
+        print("%-8s %14.0f %11.2f ms %11.2f ms" % (name, calls, lat[len(lat) // 2], lat[-1]))
+
+
+if __name__ == "__main__":
+    main()
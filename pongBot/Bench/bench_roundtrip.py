@@ -0,0 +1,158 @@
+"""
+儲存/匯入往返：本機 broker 替身 + 參考 responder，不需連外網
+量測對象為 mainLike_optimized 本身 (rig 模擬)：
+  儲存 - save() 起算到 V14 寫入 "True" (pongBot/save/successful)
+  匯入 - imp() 起算 (清掉本機快取) 到 V15 寫入 "True" 且設定已套用
+另有 N-1 台負載機器人，每台每秒 RATE 次請求 (儲存、匯入交替)，統計 responder 吞吐量
+慢速 responder 時也記錄主迴圈單圈最長時間，確認等待回覆不會卡住發球機
+注意：主題沒有區分機器人，responder 只存一份設定；多台同時使用時會收到別台的回覆，
+      匯入也可能拿到別台剛存的設定 (表中「錯置」)
+用法: python bench_roundtrip.py
+"""
+
+import os
+import select
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import preset
+from broker import Broker
+from responder import Responder
+from umqtt.simple import MQTTClient
+
+SAMPLES = 20
+TIMEOUT_S = 3.0
+RATE = 5
+# (機器人數, responder 服務時間 s, 舊格式儲存)
+SCENARIOS = ((1, 0.0, False), (1, 0.0, True), (1, 0.05, False), (1, 0.2, False),
+             (8, 0.0, False), (32, 0.0, False), (8, 0.02, False), (8, 0.05, False))
+
+
+class LoadBot(threading.Thread):
+    """以 umqtt 模擬另一台發球機：固定速率交替送出儲存與匯入，回覆只計數"""
+
+    def __init__(self, broker, n):
+        threading.Thread.__init__(self, daemon=True)
+        self.c = MQTTClient("pongBot-load-%d" % n, broker.host, broker.port)
+        self.c.set_callback(self.on)
+        self.c.connect()
+        self.c.subscribe(b"pongBot/save/successful", 1)
+        self.c.subscribe(b"pongBot/importing/successful", 1)
+        self.n = n
+        self.acks = 0
+        self.run_ = True
+
+    def on(self, topic, msg):
+        self.acks += 1
+
+    def run(self):
+        i = 0
+        nxt = time.monotonic()
+        while self.run_:
+            try:
+                if time.monotonic() >= nxt:
+                    i += 1
+                    nxt += 1.0 / RATE
+                    if i & 1:
+                        self.c.publish(b"pongBot/preset/save", bytes(preset.pack(1 + i % 5, 10 + self.n, i % 100)), qos=1)
+                    else:
+                        self.c.publish(b"pongBot/importing", preset.REQ, qos=1)
+                if select.select([self.c.sock], [], [], 0.01)[0]:
+                    self.c.wait_msg()
+            except OSError:
+                pass
+
+    def stop(self):
+        self.run_ = False
+        self.join()
+        self.c.sock.close()
+
+
+def measure(app, start, done):
+    """執行主迴圈直到 done()；回傳 (往返 ms 或 None, 單圈最長 ms)"""
+    t0 = time.perf_counter()
+    start()
+    worst = 0
+    while time.perf_counter() - t0 < TIMEOUT_S:
+        t = time.perf_counter()
+        rig.tick()
+        worst = max(worst, time.perf_counter() - t)
+        if done():
+            return (time.perf_counter() - t0) * 1000, worst * 1000
+        time.sleep(0.0005)
+    return None, worst * 1000
+
+
+def run(bots, delay, legacy):
+    broker = Broker().start()
+    resp = Responder(broker.host, broker.port, delay=delay).start()
+    rig.flash()
+    app = rig.boot()
+    app.LEGACY_SAVE = legacy
+    rig.mqtt(broker)
+    rig.loop(1000, dt=0.001, until=lambda: app.mqtt.up)
+    load = [LoadBot(broker, n) for n in range(1, bots)]
+    for b in load:
+        b.start()
+
+    writes = []
+    vw = app.blynk.virtual_write
+
+    def hook(pin, *v):
+        writes.append((pin, v))
+        return vw(pin, *v)
+
+    app.blynk.virtual_write = hook
+    save, imp, worst, wrong = [], [], 0, 0
+    for i in range(SAMPLES):
+        p = (1 + i % 5, 20 + i, 60 - i)
+        app.apply_preset(*p)
+        del writes[:]
+        ms, w = measure(app, app.save, lambda: (14, ("True",)) in writes)
+        save.append(ms)
+        worst = max(worst, w)
+        app.apply_preset(1, 1, 1)
+        app.db = None
+        del writes[:]
+        ms, w = measure(app, app.imp, lambda: (15, ("True",)) in writes and app.cur_preset() != (1, 1, 1))
+        imp.append(ms)
+        wrong += ms is not None and app.cur_preset() != p
+        worst = max(worst, w)
+    app.blynk.virtual_write = vw
+    t0 = time.monotonic()
+    n0 = resp.stats["saves"] + resp.stats["imports"]
+    time.sleep(1.0)
+    rate = (resp.stats["saves"] + resp.stats["imports"] - n0) / (time.monotonic() - t0)
+    for b in load:
+        b.run_ = False
+    for b in load:
+        b.stop()
+    rig.shutdown()
+    resp.close()
+    broker.close()
+    return save, imp, worst, rate, resp.stats["queue_max"], wrong
+
+
+def fmt(xs):
+    ok = sorted(x for x in xs if x is not None)
+    if not ok:
+        return "%22s" % "全部逾時"
+    return "%6.1f /%7.1f ms %2d/%-2d" % (ok[len(ok) // 2], ok[-1], len(ok), len(xs))
+
+
+def main():
+    print("每情境 %d 次；往返欄位為 中位/最大 與 成功數" % SAMPLES)
+    print("%-4s %-7s %-5s %-22s %-22s %9s %9s %6s %4s" % (
+        "台數", "服務ms", "格式", "儲存往返", "匯入往返", "單圈最長", "請求/秒", "佇列", "錯置"))
+    for bots, delay, legacy in SCENARIOS:
+        save, imp, worst, rate, qmax, wrong = run(bots, delay, legacy)
+        print("%-6d %-8d %-7s %s %s %7.2f ms %9.0f %6d %4d" % (
+            bots, delay * 1000, "舊" if legacy else "二進位", fmt(save), fmt(imp), worst, rate, qmax, wrong))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+發球輪轉速：開迴路 (duty 直接對應速度) vs tach + PID 閉迴路
+虛擬時間執行，馬達模型見 Sim/motor.py (電池電壓、輪子磨損 load、發球時轉速下降 25%)
+量測：
+  起轉   - V2 開馬達到兩輪都進入目標 ±3% 的時間
+  穩態   - 穩定後平均轉速相對目標的誤差 (電池電壓/磨損造成的漂移)
+  恢復   - 每次發球後回到目標 ±3% (連續 60 ms) 的時間；閉迴路另列 ready 訊號的時間
+用法: python bench_rpm.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import sim
+from motor import Motor
+
+SPEED = 80          # V3/V4 面板值 -> 40% duty
+SHOTS = 5
+SHOT_GAP = 1500
+CASES = ((3.7, 0.0), (4.1, 0.0), (3.5, 0.0), (3.7, 0.1))
+
+
+def run(closed, v_bat, load):
+    sim.virtual(0)
+    rig.app.TACH_A, rig.app.TACH_B = rig.TACH
+    app = rig.direct(rig.boot(period=0))
+    app.pc = None
+    ms = [Motor(app.MAPWM, app.TACH_A, v_bat=v_bat, load=load),
+          Motor(app.MBPWM, app.TACH_B, v_bat=v_bat, load=load)]
+    if closed:
+        app.init_rpm()
+    goal = int(SPEED / 2 * 1023 / 100) * app.RPM_MAX // 1023
+    band = goal * 3 // 100
+
+    def within():
+        return all(abs(m.rpm - goal) <= band for m in ms)
+
+    app.blynk.hw(3, SPEED)
+    app.blynk.hw(4, SPEED)
+    app.blynk.hw(2, 1)
+    app.blynk.run()
+    app.cmd_run()
+
+    now = [0]
+    ok_run = [0]
+
+    def advance(ms_):
+        for _ in range(ms_):
+            t0 = sim.ticks_us()
+            for m in ms:
+                m.step(1000, t0)
+            now[0] += 1
+            if now[0] % app.TICK == 0:
+                if app.pc:
+                    app.pc.step(now[0])
+                else:
+                    app.rp.step(now[0])
+            ok_run[0] = ok_run[0] + 1 if within() else 0
+
+    def settle(limit):
+        """回傳 (穩定 60 ms 的起點, ready 訊號時間) 相對現在的 ms"""
+        t0 = now[0]
+        t_ok = t_ready = None
+        while now[0] - t0 < limit and (t_ok is None or (app.pc and t_ready is None)):
+            advance(1)
+            if t_ok is None and ok_run[0] >= 60:
+                t_ok = now[0] - 60 - t0
+            if app.pc and t_ready is None and app.pc.ready:
+                t_ready = now[0] - t0
+        return t_ok, t_ready
+
+    spin, _ = settle(3000)
+    advance(500)
+    steady = sum(m.rpm for m in ms) / len(ms)
+    rec, rdy = [], []
+    for _ in range(SHOTS):
+        for m in ms:
+            m.shot()
+        if app.pc:
+            app.pc.kick()
+        t_ok, t_ready = settle(SHOT_GAP)
+        rec.append(t_ok)
+        rdy.append(t_ready)
+        advance(max(0, SHOT_GAP - (now[0] % SHOT_GAP)))
+    app.halt()
+    rig.shutdown()
+    sim.virtual(None)
+    return spin, (steady - goal) * 100 / goal, rec, rdy
+
+
+def isr_cost():
+    sim.virtual(None)
+    rig.app.TACH_A, rig.app.TACH_B = rig.TACH
+    app = rig.boot(period=0)
+    app.init_rpm()
+    t = app.dm.ma.pc.tach
+    n = 100000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        t._isr(None)
+    us = (time.perf_counter() - t0) / n * 1e6
+    app.pc = None
+    rig.shutdown()
+    return us
+
+
+def fmt(xs):
+    ok = [x for x in xs if x is not None]
+    if not ok:
+        return "%16s" % "未恢復"
+    return "%6.0f /%5.0f ms" % (sum(ok) / len(ok), max(ok))
+
+
+def main():
+    print("目標 %d%% duty；每組 %d 次發球，每次兩輪轉速各降 25%%" % (SPEED // 2, SHOTS))
+    print("%-8s %6s %6s %10s %10s %18s %18s" % ("控制", "電池V", "磨損", "起轉ms", "穩態誤差", "發球恢復 平均/最大", "ready 平均/最大"))
+    for v_bat, load in CASES:
+        for closed in (False, True):
+            spin, err, rec, rdy = run(closed, v_bat, load)
+            print("%-8s %6.1f %5.0f%% %10s %9.1f%% %18s %18s" % (
+                "閉迴路" if closed else "開迴路", v_bat, load * 100,
+                spin if spin is not None else "-", err, fmt(rec), fmt(rdy) if closed else "-"))
+    print("tach ISR 每次 %.2f us (CPython)" % isr_cost())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+發球事件 log (shotlog.py) 的寫入成本與可靠度，在主機檔案系統上 (flash 的實際寫入時間需在裝置上量)
+  1. 每筆 add() 的 CPU 微秒與 flush 次數/最長 flush：頁緩衝 (PAGE bytes) vs 每筆直接寫入 (page = 1 筆)
+  2. 輪替：寫入 EVENTS 筆到 N 個 SIZE bytes 的檔案，主機端讀取器 (Host/shotlog_read.py) 依序號串流，檢查只保留最新的且無缺口
+  3. 斷電：緩衝中未寫入的紀錄遺失、檔尾留下半筆；重新開啟後換檔接續，序號接在最後一筆完整紀錄之後
+  4. mainLike_optimized 長按 V10 發球 (虛擬時間) 寫入的 SHOT 紀錄內容
+用法: python bench_shotlog.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+sys.path.insert(0, os.path.join(HERE, "..", "Host"))
+
+import rig
+import sim
+import shotlog
+import shotlog_read
+
+EVENTS = 5000
+N = 4
+SIZE = 16384
+PAGE = 512
+
+
+def fresh():
+    d = tempfile.mkdtemp(prefix="shotlog-")
+    return os.path.join(d, "shots")
+
+
+def fill(log, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        log.add(shotlog.SHOT, 60, 40 + i % 20, 3, i % 7, i, now=i * 10)
+        log.tick(i * 10)
+    log.flush()
+    return (time.perf_counter() - t0) * 1e6 / n
+
+
+def cost():
+    rows = []
+    for name, page in (("頁緩衝 %d B" % PAGE, PAGE), ("每筆直接寫", shotlog.REC)):
+        log = shotlog.Log(fresh(), N, SIZE, page, flush_ms=1 << 30)
+        us = fill(log, EVENTS)
+        rows.append((name, us, log.writes, log.w_max / 1000, log.w_us / max(1, log.writes) / 1000))
+    return rows
+
+
+def rotation():
+    p = fresh()
+    log = shotlog.Log(p, N, SIZE, PAGE)
+    fill(log, EVENTS)
+    seqs = [r[0] for r in shotlog_read.events(shotlog_read.files([os.path.dirname(p)], "shots"))]
+    keep = SIZE // shotlog.REC
+    return len(seqs), seqs[0], seqs[-1], all(b == a + 1 for a, b in zip(seqs, seqs[1:])), keep
+
+
+def power_loss():
+    p = fresh()
+    log = shotlog.Log(p, N, SIZE, PAGE)
+    fill(log, 100)
+    for i in range(10):
+        log.add(shotlog.SHOT, 1, 1, 1, 0, i)  # 還在緩衝，斷電遺失
+    with open(shotlog.name(p, log.i), "ab") as f:
+        f.write(b"\x01\x02\x03")  # 寫入一半的紀錄
+    log = shotlog.Log(p, N, SIZE, PAGE)
+    i, seq = log.i, log.seq
+    log.add(shotlog.BOOT)
+    log.flush()
+    seqs = [r[0] for r in shotlog_read.events(shotlog_read.files([os.path.dirname(p)], "shots"))]
+    return i, seq, len(seqs), seqs[-1]
+
+
+def app_shot():
+    sim.virtual(1000000)
+    app = rig.boot(period=0)
+    app.blynk.run()
+    app.sl = shotlog.Log(os.path.join(rig.fs, "shots"), N, SIZE, PAGE)
+    app.apply_preset(4, 70, 50)
+    app.blynk.hw(10, 1)
+    for _ in range(app.LONG_T // app.TICK + 20):
+        rig.tick()
+        sim.advance(app.TICK * 1000)
+    app.blynk.hw(10, 0)
+    rig.tick()
+    app.sl.flush()
+    recs = list(shotlog_read.events(shotlog_read.files([rig.fs], "shots")))
+    app.sl = None
+    rig.shutdown()
+    sim.virtual(None)
+    return recs
+
+
+def main():
+    print("紀錄 %d bytes，%d 個檔案 x %d bytes" % (shotlog.REC, N, SIZE))
+    print("%-14s %10s %10s %14s %14s" % ("方式", "add() us", "寫入次數", "最長寫入 ms", "平均寫入 ms"))
+    for name, us, w, wmax, wavg in cost():
+        print("%-14s %10.2f %10d %14.3f %14.3f" % (name, us, w, wmax, wavg))
+    n, s0, s1, ok, keep = rotation()
+    print("輪替：寫入 %d 筆，讀回 %d 筆 (序號 %d-%d，%s)，每檔 %d 筆" % (
+        EVENTS, n, s0, s1, "連續" if ok else "有缺口", keep))
+    i, seq, n, s1 = power_loss()
+    print("斷電：重開後改寫檔案 %d，下一序號 %d；讀回 %d 筆，最後序號 %d" % (i, seq, n, s1))
+    for r in app_shot():
+        print("app 紀錄：%s 上 %d 下 %d 等級 %d 延遲 %d ms 附註 %d 時間 %d (%s)" % (
+            shotlog_read.EVENTS[r[2] & ~shotlog.UNSYNC], r[3], r[4], r[5], r[6], r[7], r[1],
+            "開機後秒數" if r[2] & shotlog.UNSYNC else "RTC"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+滑桿輸入合併 (coalesce.py)：拖動 V3 滑桿一次的處理次數與硬體寫入 (虛擬時間)
+馬達運轉中，App 每 SEND_MS 送一個 V3 值 (20 -> 90 -> 40，觸控約 120 Hz)，同時在拖動中按放 V10 PRESS 次
+兩種到達方式：
+  平順 - 每個封包延遲 LAT_MS 後各自送達
+  成串 - WiFi 省電每 BURST_MS 才收一次，期間的封包一起送達
+比較 不合併 / 每圈合併 (win=0) / 合併視窗 50 (CO_WIN 預設)、100 ms，每次拖動：
+  V3 處理次數、set_speed 寫入 ramp 目標次數、PWM duty 寫入、送出的 Blynk 封包 (reset_labels 回寫)、
+  主迴圈 CPU ms、最後一個封包送達到轉速設成最後值的延遲、
+  落後：拖動期間 PWM duty 與已送達的最新滑桿值相差的平均 (滿刻度 %；ramp 每次收到新的升速目標都重新起步，
+  目標更新越頻繁越追不上)、V10 處理次數 (應與按放次數相同)
+用法: python bench_slider.py
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import machine
+import coalesce
+from blynksim import frame
+from BlynkLib import MSG_HW
+
+SEND_MS = 8
+LAT_MS = 20
+BURST_MS = 50
+PRESS = 2
+DRAG = list(range(20, 91)) + list(range(90, 39, -1))
+
+app = rig.app
+
+
+def arrivals(bunched):
+    """[(送達 ms, pin, 值)]：V3 拖動，中間穿插 V10 按下/放開"""
+    ev = [(i * SEND_MS, 3, v) for i, v in enumerate(DRAG)]
+    span = len(DRAG) * SEND_MS
+    for k in range(PRESS):
+        t = span * (2 * k + 1) // (2 * PRESS + 1)
+        ev += [(t + 1, 10, 1), (t + 1 + span // (2 * PRESS + 1), 10, 0)]
+    out = []
+    for t, pin, v in sorted(ev):
+        t += LAT_MS
+        if bunched:
+            t = -(-t // BURST_MS) * BURST_MS
+        out.append((t, pin, v))
+    return out
+
+
+def drag(win, bunched):
+    sim.virtual(1000000)
+    a = rig.direct(rig.boot(period=0))
+    a.co = None if win is None else coalesce.Co(a.blynk, a.CO_PINS, win)
+    a.blynk.hw(2, 1)
+    t0 = sim.ticks_ms()
+    while sim.ticks_ms() - t0 < 1000:
+        rig.tick()
+        sim.advance(a.TICK * 1000)
+    n = {"v3": 0, "v10": 0, "to": 0, "duty": 0}
+    for p in ("V3", "V10"):
+        f = a.blynk._cbks[p]
+
+        def h(v, f=f, k=p.lower()):
+            n[k] += 1
+            f(v)
+        a.blynk._cbks[p] = h
+    to = a.rp.to
+
+    def rto(pw, d):
+        n["to"] += 1
+        to(pw, d)
+    a.rp.to = rto
+    machine.on_write = lambda pin, kind, value: n.__setitem__("duty", n["duty"] + (kind == "duty"))
+    del a.blynk.tx[:]
+    t0 = sim.ticks_ms()
+    arr = [(t0 + t, pin, v) for t, pin, v in arrivals(bunched)]
+    ev = [(t, frame(MSG_HW, 1 + i, "vw", pin, v)) for i, (t, pin, v) in enumerate(arr)]
+    a.blynk.pend += ev
+    v3 = [(t, v) for t, pin, v in arr if pin == 3]
+    want = DRAG[-1] * 0.5
+    last = ev[-1][0]
+    done = None
+    cpu = 0.0
+    err = []
+    while sim.ticks_ms() < last + 500:
+        c = time.perf_counter()
+        rig.tick()
+        cpu += time.perf_counter() - c
+        now = sim.ticks_ms()
+        if done is None and now >= last and a.dm.ma.s == want:
+            done = now - last
+        if now <= last:
+            v = [v for t, v in v3 if t <= now]
+            if v:
+                err.append(abs(a.dm.ma.pw.duty() - int(v[-1] * 0.5 * 1023 / 100)))
+        w = a.TICK
+        if a.co and a.co.v:
+            w = min(w, a.co.due(now))
+        sim.advance(max(1, w) * 1000)
+    machine.on_write = None
+    n["tx"] = len(a.blynk.tx)
+    n["cpu"] = cpu * 1000
+    n["lag"] = done if done is not None else -1
+    n["err"] = sum(err) / len(err) * 100 / 1023
+    a.halt()
+    a.es.stop()
+    a.co = None
+    sim.virtual(None)
+    return n
+
+
+def main():
+    print("拖動 %d 個 V3 值 (每 %d ms)，期間按放 V10 %d 次" % (len(DRAG), SEND_MS, PRESS))
+    print("%-6s %-12s %6s %8s %8s %8s %8s %8s %8s %6s" % (
+        "到達", "方式", "V3", "轉速設定", "duty", "送出封包", "CPU ms", "延遲 ms", "落後 %", "V10"))
+    for bunched in (False, True):
+        for name, win in (("不合併", None), ("每圈合併", 0), ("視窗 50ms", 50), ("視窗 100ms", 100)):
+            n = drag(win, bunched)
+            print("%-6s %-12s %6d %8d %8d %8d %8.2f %8d %8.1f %6d" % (
+                "成串" if bunched else "平順", name, n["v3"], n["to"], n["duty"], n["tx"], n["cpu"], n["lag"],
+                n["err"], n["v10"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+遙測串流：位元組預算與解碼正確性
+以虛擬時間模擬 30 分鐘練習 (滑桿調整、發球、堆積變化)，5% 訊息遺失
+比較 差分編碼 vs 每次送完整 JSON，並驗證主機端解碼器還原的數值
+用法: python bench_telemetry.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+sys.path.insert(0, os.path.join(HERE, "..", "Host"))
+
+import sim
+
+sim.install()
+
+import telemetry
+from telemetry_dump import NAMES, SCALE, Decoder
+
+MINUTES = 30
+INTERVAL = 5000
+LOSS = 0.05
+
+
+class Session:
+    """簡化的練習過程：偶爾調整速度、固定節奏發球"""
+
+    def __init__(self, seed):
+        self.r = random.Random(seed)
+        self.ma = self.mb = 50
+        self.level = 3
+        self.shots = 0
+        self.heap = 21000
+        self.t = 0
+
+    def step(self, ms):
+        self.t += ms
+        if self.r.random() < 0.02:
+            self.ma = self.r.randint(20, 100)
+        if self.r.random() < 0.02:
+            self.mb = self.r.randint(20, 100)
+        if self.r.random() < 0.005:
+            self.level = self.r.randint(1, 5)
+        if self.r.random() < 0.08:
+            self.shots += 1
+        self.heap += self.r.randint(-40, 40)
+
+    def fill(self, v):
+        v[0], v[1], v[2], v[3] = self.ma, self.mb, 3 | 4, self.level
+        v[4], v[7], v[8] = self.shots, self.heap, self.t // 1000
+
+
+def run(budget):
+    s = Session(1)
+    dec = Decoder()
+    lossr = random.Random(2)
+    out = {"bytes": 0, "json": 0, "ok": 0, "bad": 0, "lost": 0, "msgs": 0}
+    tl = None
+
+    def send(mv):
+        out["bytes"] += len(mv)
+        out["msgs"] += 1
+        out["json"] += len(json.dumps(dict(zip(NAMES, tl.cur))))
+        if lossr.random() < LOSS:
+            out["lost"] += 1
+            return
+        r = dec.feed(bytes(mv))
+        if r is None:
+            return
+        if [r[k] / SCALE.get(i, 1) for i, k in enumerate(NAMES)] == list(tl.cur):
+            out["ok"] += 1
+        else:
+            out["bad"] += 1
+
+    tl = telemetry.Telemetry(s.fill, send, INTERVAL, budget)
+    now = 0
+    while now < MINUTES * 60000:
+        s.step(100)
+        for _ in range(10):
+            tl.loop(10000 + s.r.randint(0, 800) + (4000 if s.r.random() < 0.01 else 0))
+        tl.tick(now)
+        now += 100
+    out["skipped"] = tl.skipped
+    return out
+
+
+def cost():
+    tl = telemetry.Telemetry(lambda v: None, lambda mv: None, 0, 10 ** 9)
+    for i in range(telemetry.N):
+        tl.cur[i] = 1000 + i
+    tl.tick(0)
+    n = 20000
+    t = time.perf_counter()
+    for k in range(n):
+        tl.cur[4] = k
+        tl.tick(k)
+    us = (time.perf_counter() - t) / n * 1e6
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tl.tick(n + 1)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return us, peak
+
+
+def main():
+    print("模擬 %d 分鐘，每 %d ms 一份報告，遺失率 %.0f%%" % (MINUTES, INTERVAL, LOSS * 100))
+    print("%-10s %10s %10s %8s %8s %8s %10s" % ("預算B/分", "差分B/分", "JSON B/分", "送出", "略過", "遺失", "解碼正確"))
+    for budget in (1200, 300, 120):
+        o = run(budget)
+        print("%-10d %10.1f %10.1f %8d %8d %8d %6d/%-4d" % (
+            budget, o["bytes"] / MINUTES, o["json"] / MINUTES, o["msgs"], o["skipped"], o["lost"],
+            o["ok"], o["ok"] + o["bad"]))
+    us, peak = cost()
+    print("每份報告取樣+編碼 %.1f us，堆積峰值 %d B" % (us, peak))
+
+
+if __name__ == "__main__":
+    main()
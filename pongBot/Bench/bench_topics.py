@@ -0,0 +1,77 @@
+"""
+MQTT 分派成本：if/elif 字串比對鏈 vs topics.Router
+訂閱 3 個與 50 個 topic 時，量測命中最後一個 topic、以及 wildcard topic 的每次分派時間
+用法: python bench_topics.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import sim
+
+sim.install()
+
+import topics
+
+N = 100000
+
+
+def names(n):
+    base = [b"pongBot/save/successful", b"pongBot/importing/successful", b"pongBot/importing/data"]
+    return (base + [b"pongBot/drill/%d/cmd" % i for i in range(n)])[:n]
+
+
+def chain(ts):
+    """產生與原本 mqtt_callback 相同形式的 if/elif 鏈 (每個分支都解碼)"""
+    src = ["def cb(topic, msg):"]
+    for i, t in enumerate(ts):
+        src.append("    %s topic == %r:" % ("if" if i == 0 else "elif", t))
+        src.append("        payload = msg.decode().strip()")
+        src.append("        return %d" % i)
+    ns = {}
+    exec("\n".join(src), ns)
+    return ns["cb"]
+
+
+def router(ts, wild):
+    r = topics.Router()
+    for i, t in enumerate(ts):
+        r.on(t, lambda t, m: None)
+    if wild:
+        r.on(b"pongBot/fleet/+/fire", lambda t, m: None)
+        r.on(b"pongBot/telemetry/#", lambda t, m: None)
+    return r
+
+
+def timed(f, topic):
+    msg = b"TRUE"
+    t = time.perf_counter()
+    for _ in range(N):
+        f(topic, msg)
+    return (time.perf_counter() - t) / N * 1e9
+
+
+def main():
+    print("%-28s %10s %10s" % ("ns/次 分派", "3 topics", "50 topics"))
+    rows = {}
+    for n in (3, 50):
+        ts = names(n)
+        last = ts[-1]
+        cb = chain(ts)
+        r = router(ts, False)
+        rw = router(ts, True)
+        for k, f, t in (("if/elif 鏈 (最後一個)", cb, last),
+                        ("if/elif 鏈 (未訂閱)", cb, b"pongBot/other"),
+                        ("Router 精確", r.dispatch, last),
+                        ("Router 精確 (含 wildcard)", rw.dispatch, last),
+                        ("Router wildcard 命中", rw.dispatch, b"pongBot/fleet/7/fire")):
+            rows.setdefault(k, []).append(timed(f, t))
+    for k, v in rows.items():
+        print("%-28s %10.0f %10.0f" % (k, v[0], v[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+開機到取得 IP 的時間：舊版 conn_wifi (依序嘗試、每 1 s 檢查、每個最多 20 s) vs wifi.join
+虛擬時間執行，模擬 WLAN 參數見 Sim/network.py (晶片掃描 scan_ms、關聯+DHCP assoc_ms)
+wifi.join 分冷開機 (flash 無快取) 與熱開機 (上次成功的 bssid 已存在 flash)
+用法: python bench_wifi.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Sim"))
+
+import rig
+import sim
+import network
+import wifi
+
+app = rig.app
+
+SHEP = {"ssid": "shepherd", "password": "Good@11255", "bssid": b"\x02\0\0\0\0\x01", "channel": 6, "rssi": -60}
+ARON = {"ssid": "aron", "password": "00000000", "bssid": b"\x02\0\0\0\0\x02", "channel": 11, "rssi": -55}
+SHEP_WEAK = dict(SHEP, bssid=b"\x02\0\0\0\0\x03", rssi=-80)
+
+SCENARIOS = (
+    ("只有第二個網路 aron", [ARON], None),
+    ("兩個都在，aron 較強", [SHEP, ARON], None),
+    ("兩個都在，shepherd 較強", [dict(SHEP, rssi=-45), ARON], None),
+    ("同名兩台，快取的較弱", [SHEP_WEAK, SHEP], SHEP_WEAK),
+    ("快取的基地台已消失", [ARON], SHEP),
+)
+
+
+def legacy_conn_wifi():
+    """加入 wifi.join 之前的 conn_wifi (原樣保留作為對照)"""
+    w = network.WLAN(network.STA_IF)
+    w.active(True)
+    if not w.isconnected():
+        for wifi_ in app.WIFI:
+            w.connect(wifi_['ssid'], wifi_['password'])
+            t = 20
+            while not w.isconnected() and t > 0:
+                sim._vsleep(1)
+                t -= 1
+            if w.isconnected():
+                return True
+        return False
+    return True
+
+
+def boot(aps, cache, fn):
+    network.aps[:] = aps
+    network.WLAN()._init()
+    if cache:
+        wifi.save(app.WIFI_DB, cache["ssid"], cache["bssid"], cache["channel"])
+    sim.virtual(0)
+    ok = fn()
+    ms = sim.ticks_ms()
+    sim.virtual(None)
+    w = network.WLAN()
+    return ms if ok else None, w._ap["ssid"] if ok and w._ap else "-", w._ap["rssi"] if ok and w._ap else 0
+
+
+def main():
+    print("晶片掃描 %d ms、關聯+DHCP %d ms；舊版每 1 s 檢查一次" % (network.scan_ms, network.assoc_ms))
+    print("%-26s %-10s %10s %12s %6s" % ("情境", "方式", "取得IP ms", "連上", "RSSI"))
+    for name, aps, cache in SCENARIOS:
+        rows = []
+        rig.flash()
+        rows.append(("舊版", boot(aps, None, legacy_conn_wifi)))
+        rig.flash()
+        rows.append(("join 冷", boot(aps, cache, app.conn_wifi)))
+        if cache is None:
+            rows.append(("join 熱", boot(aps, None, app.conn_wifi)))
+        for i, (how, (ms, ssid, rssi)) in enumerate(rows):
+            print("%-26s %-10s %10s %12s %6s" % (
+                name if i == 0 else "", how, ms if ms is not None else "失敗", ssid, rssi or ""))
+
+
+if __name__ == "__main__":
+    main()
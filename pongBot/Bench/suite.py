@@ -0,0 +1,293 @@
+"""
+主機端基準測試套件：取代 pongBot/Test 下只能在實機手動執行的測試腳本
+在 Linux 上以模擬硬體 (Sim/) 與本機 Blynk/MQTT 替身 (Host/) 執行 mainLike_optimized，涵蓋：
+  proto     - Blynk 封包編碼/解碼 (blynkTest.py)
+  dispatch  - Vpin 指令分派到處理函式 (blynkDataCTRL.py)
+  longpress - V10/V12 長按發球到復歸的完整週期 (blynkDataCTRL.py)
+  preset    - 儲存/匯入經本機 broker 與 responder 的往返 (mqtt_test.py)
+  motor     - V2/V3/V4 馬達指令到 PWM 輸出、V1 伺服 (shootBall.py、servo360.py)
+指標名稱以單位結尾 (_us CPU 微秒、_ms 毫秒、_n 次數)，數值都是越小越好；計時類取 REPEAT 次中最好的一次
+整個套件重跑 --runs 次 (預設 RUNS)：_us 取最好的一次，其他指標取最差的一次 (偶發的漏發/錯誤不會被蓋掉)
+結果寫成 JSON (--out)，與提交的 baseline.json 比較：比基準差超過 --threshold (預設 50%)
+且超過該單位的最小差距 (MIN_DELTA) 即列為退步，以結束碼 1 失敗；--update 以這次結果覆寫基準
+用法: python suite.py [--only proto,motor] [--runs 3] [--out results.json] [--threshold 0.5] [--update]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import rig
+import sim
+import machine
+from blynksim import SimBlynk, frame
+from BlynkLib import MSG_HW
+from broker import Broker
+from responder import Responder
+
+BASELINE = os.path.join(HERE, "baseline.json")
+REPEAT = 20
+RUNS = 3
+REF_CAL = 0.0007  # 參考機器上 cal() 的秒數
+MIN_DELTA = {"us": 1.0, "ms": 2, "n": 0}
+
+app = rig.app
+
+
+def cal():
+    """校正迴圈：固定的純 Python 工作 (整數、字串、dict)，回傳 CPU 秒數"""
+    t0 = time.perf_counter()
+    d = {}
+    for i in range(2000):
+        k = "V%d" % (i & 31)
+        d[k] = d.get(k, 0) + (i * 7 >> 2)
+    return time.perf_counter() - t0
+
+
+def best(fn, n, repeat=REPEAT):
+    """fn() 執行 n 次工作；每次都緊接著跑校正迴圈，回傳最好一次的每次 CPU 微秒
+    (以 fn 與校正迴圈的時間比換算成 REF_CAL 速度的機器，抵消 CPU 降頻/換核心造成的整體快慢)"""
+    r = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        t = time.perf_counter() - t0
+        us = t / cal() * REF_CAL * 1e6 / n
+        r = us if r is None else min(r, us)
+    return r
+
+
+def vw(pins, n):
+    return b"".join(frame(MSG_HW, 1 + i % 0xFFFF, "vw", pins[i % len(pins)][0], pins[i % len(pins)][1])
+                    for i in range(n))
+
+
+def virtual_run(ms, until=None):
+    """虛擬時間下以 TICK 為一圈執行主迴圈；until() 成立時回傳經過的 ms"""
+    t0 = sim.ticks_ms()
+    while sim.ticks_ms() - t0 < ms:
+        rig.tick()
+        if until and until():
+            return sim.ticks_ms() - t0
+        sim.advance(app.TICK * 1000)
+    return None
+
+
+def case_proto():
+    n = 500
+    b = SimBlynk()
+    b.run()
+    data = vw(((3, 50), (4, 70), (1, 3)), n)
+    out = {"decode_us": best(lambda: b.process(data), n)}
+
+    def enc():
+        for i in range(n):
+            b.virtual_write(11, i)
+        del b.tx[:]
+
+    out["encode_us"] = best(enc, n)
+    return out
+
+
+def case_dispatch():
+    n = 300
+    rig.direct(rig.boot(period=0))
+    app.blynk.run()
+    data = vw(((1, 2), (3, 60), (4, 40), (1, 4), (3, 80), (4, 20)), n)
+
+    def go():
+        app.blynk.process(data)
+        app.cmd_run()
+        del app.blynk.tx[:]
+
+    out = {"dispatch_us": best(go, n)}
+    rig.shutdown()
+    return out
+
+
+def case_longpress():
+    cycles = 3
+    sim.virtual(1000000)  # 按下時間 ps=0 會被當成未按下
+    rig.boot(period=0)
+    app.blynk.run()
+    fire, reset, cpu = [], [], []
+    shots = app.shots
+    for pin in (10, 12) * cycles:
+        t = time.perf_counter()
+        app.blynk.hw(pin, 1)
+        fire.append(virtual_run(app.LONG_T * 2, lambda: app.ball.value()))
+        app.blynk.hw(pin, 0)
+        reset.append(virtual_run(app.HOLD_T * 2, lambda: not app.ball.value()))
+        cpu.append((time.perf_counter() - t) / cal() * REF_CAL * 1000)
+        virtual_run(100)
+    shots = app.shots - shots
+    rig.shutdown()
+    sim.virtual(None)
+    late = [f - app.LONG_T for f in fire if f is not None]
+    return {"fire_late_ms": max(late) if len(late) == len(fire) else 1e9,
+            "hold_late_ms": max(abs(r - app.HOLD_T) for r in reset if r is not None) if None not in reset else 1e9,
+            "missed_n": abs(2 * cycles - shots),
+            "cycle_cpu_ms": min(cpu)}
+
+
+def case_preset():
+    samples = 10
+    broker = Broker().start()
+    resp = Responder(broker.host, broker.port).start()
+    rig.flash()
+    rig.boot()
+    rig.mqtt(broker)
+    rig.loop(1000, dt=0.001, until=lambda: app.mqtt.up)
+    writes = []
+    vw_ = app.blynk.virtual_write
+
+    def hook(pin, *v):
+        writes.append((pin, v))
+        return vw_(pin, *v)
+
+    def rtt(start, done):
+        del writes[:]
+        t0 = time.perf_counter()
+        start()
+        if rig.loop(3000, dt=0.0005, until=done):
+            return (time.perf_counter() - t0) * 1000
+        return 1e9
+
+    app.blynk.virtual_write = hook
+    save, imp, wrong = [], [], 0
+    for i in range(samples):
+        p = (1 + i % 5, 20 + i, 60 - i)
+        app.apply_preset(*p)
+        save.append(rtt(app.save, lambda: (14, ("True",)) in writes))
+        app.apply_preset(1, 1, 1)
+        db, app.db = app.db, None
+        imp.append(rtt(app.imp, lambda: (15, ("True",)) in writes and app.cur_preset() != (1, 1, 1)))
+        app.db = db
+        wrong += app.cur_preset() != p
+    app.blynk.virtual_write = vw_
+    rig.shutdown()
+    resp.close()
+    broker.close()
+    save.sort()
+    imp.sort()
+    return {"save_ms": save[len(save) // 2], "import_ms": imp[len(imp) // 2], "wrong_n": wrong}
+
+
+def case_motor():
+    n = 200
+    sim.virtual(0)
+    rig.direct(rig.boot(period=0))
+    app.blynk.run()
+    app.blynk.hw(3, 80)
+    app.blynk.hw(4, 60)
+    app.blynk.hw(2, 1)
+    goal = (int(40 * 1023 / 100), int(30 * 1023 / 100))
+    ramp = virtual_run(3000, lambda: (machine.duties.get(app.MAPWM), machine.duties.get(app.MBPWM)) == goal)
+    msgs = [vw(((3, 70 + i % 2 * 10),), 1) for i in range(n)]
+
+    def cmd():
+        for m in msgs:
+            app.blynk.process(m)
+            app.cmd_run()
+            app.rp.step()
+        del app.blynk.tx[:]
+
+    out = {"ramp_ms": 1e9 if ramp is None else ramp, "cmd_us": best(cmd, n)}
+    app.blynk.hw(0, 1)
+    app.blynk.run()
+    data = vw(((1, 2), (1, 5)), n)
+
+    def servo():
+        app.blynk.process(data)
+        app.cmd_run()
+        del app.blynk.tx[:]
+
+    out["servo_us"] = best(servo, n)
+    app.halt()
+    rig.shutdown()
+    sim.virtual(None)
+    return out
+
+
+CASES = (("proto", case_proto), ("dispatch", case_dispatch), ("longpress", case_longpress),
+         ("preset", case_preset), ("motor", case_motor))
+
+
+def compare(cur, base, threshold):
+    """回傳 [(指標, 基準, 這次, 變化比例)] 退步清單"""
+    bad = []
+    for k, b in sorted(base.items()):
+        c = cur.get(k)
+        if c is None:
+            continue
+        unit = k.rsplit("_", 1)[-1]
+        if c - b > MIN_DELTA.get(unit, 0) and c > b * (1 + threshold):
+            bad.append((k, b, c, (c - b) / b if b else float("inf")))
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", default="")
+    ap.add_argument("--out", default=os.path.join(HERE, "results.json"))
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--threshold", type=float, default=0.5)
+    ap.add_argument("--runs", type=int, default=RUNS)
+    ap.add_argument("--update", action="store_true")
+    a = ap.parse_args()
+    only = set(a.only.split(",")) if a.only else None
+    out = os.path.abspath(a.out)
+    cwd = os.getcwd()
+
+    metrics = {}
+    for name, fn in CASES:
+        if only and name not in only:
+            continue
+        t0 = time.perf_counter()
+        for _ in range(max(1, a.runs)):
+            for k, v in fn().items():
+                k = "%s.%s" % (name, k)
+                v = round(v, 3)
+                if k in metrics:
+                    v = min(v, metrics[k]) if k.endswith("_us") else max(v, metrics[k])
+                metrics[k] = v
+        print("%-10s %6.2f s" % (name, time.perf_counter() - t0))
+    os.chdir(cwd)
+    doc = {"python": platform.python_version(), "machine": platform.machine(),
+           "time": time.strftime("%Y-%m-%d %H:%M:%S"), "metrics": metrics}
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=1, sort_keys=True)
+
+    try:
+        with open(a.baseline) as f:
+            base = json.load(f)["metrics"]
+    except (OSError, ValueError, KeyError):
+        base = {}
+    print("%-26s %12s %12s %8s" % ("指標", "基準", "這次", "變化"))
+    for k in sorted(metrics):
+        b = base.get(k)
+        print("%-26s %12s %12.3f %8s" % (k, "-" if b is None else "%.3f" % b, metrics[k],
+                                         "" if not b else "%+.0f%%" % ((metrics[k] - b) * 100 / b)))
+    if a.update:
+        if only:
+            base.update(metrics)
+            doc["metrics"] = base
+        with open(a.baseline, "w") as f:
+            json.dump(doc, f, indent=1, sort_keys=True)
+        print("基準已更新：%s" % a.baseline)
+        return 0
+    bad = compare(metrics, base, a.threshold)
+    for k, b, c, r in bad:
+        print("退步 %s: %.3f -> %.3f (%+.0f%%)" % (k, b, c, r * 100))
+    print("結果：%s，%d 項退步 (門檻 %.0f%%)" % (out, len(bad), a.threshold * 100))
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+本機 Blynk 伺服器替身 (TCP，與 BlynkLib.BlynkProtocol 相同的 5-byte 封包格式)
+- 回應登入 (token 不符回 STA_INVALID_TOKEN) 與 ping
+- 記錄裝置送上來的 vw，並可由主機端對裝置送出 vw (模擬 App 操作)
+- bridge：裝置以 "通道\0i\0auth" 綁定通道，"通道\0vw\0pin\0值" 轉送給該 auth 的裝置
+用法: python blynkd.py [port]
+"""
+
+import socket
+import struct
+import sys
+import threading
+import time
+
+MSG_RSP = 0
+MSG_PING = 6
+MSG_BRIDGE = 15
+MSG_INTERNAL = 17
+MSG_HW = 20
+MSG_HW_LOGIN = 29
+STA_SUCCESS = 200
+STA_INVALID_TOKEN = 9
+
+
+def frame(cmd, mid, *args):
+    data = ("\0".join(map(str, args))).encode("utf8")
+    return struct.pack("!BHH", cmd, mid, len(data)) + data
+
+
+class Device:
+    def __init__(self, conn, auth):
+        self.conn = conn
+        self.auth = auth
+        self.mid = 0
+        self.vw = []  # (時間, pin, [值...])
+        self.binds = {}  # bridge 通道 -> 目標 auth
+        self.wlock = threading.Lock()
+
+    def send(self, cmd, *args):
+        with self.wlock:
+            self.mid = self.mid % 0xFFFF + 1
+            self.conn.sendall(frame(cmd, self.mid, *args))
+
+
+class BlynkServer:
+    def __init__(self, host="127.0.0.1", port=0, token=None):
+        self.token = token
+        self.devices = []
+        self.on_vw = None  # on_vw(dev, pin, vals)
+        self.stats = {"logins": 0, "pings": 0, "vw": 0, "bridge": 0}
+        self.srv = socket.socket()
+        self.srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.srv.bind((host, port))
+        self.srv.listen(1024)
+        self.host = host
+        self.port = self.srv.getsockname()[1]
+        self._run = False
+
+    def start(self):
+        self._run = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def close(self):
+        self._run = False
+        self.kill()
+        try:
+            self.srv.close()
+        except OSError:
+            pass
+
+    def kill(self):
+        for d in list(self.devices):
+            try:
+                d.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            d.conn.close()
+        self.devices = []
+
+    def vw(self, pin, *vals, dev=None):
+        """對裝置 (預設全部) 送出 vw，等同 App 操作 Vpin"""
+        for d in ([dev] if dev else list(self.devices)):
+            try:
+                d.send(MSG_HW, "vw", pin, *vals)
+            except OSError:
+                pass
+
+    def wait_devices(self, n=1, timeout=5):
+        end = time.monotonic() + timeout
+        while len(self.devices) < n and time.monotonic() < end:
+            time.sleep(0.005)
+        return len(self.devices) >= n
+
+    def _accept(self):
+        while self._run:
+            try:
+                c, _ = self.srv.accept()
+            except OSError:
+                return
+            c.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._client, args=(c,), daemon=True).start()
+
+    @staticmethod
+    def _read(c, n):
+        buf = b""
+        while len(buf) < n:
+            d = c.recv(n - len(buf))
+            if not d:
+                raise EOFError
+            buf += d
+        return buf
+
+    def _client(self, c):
+        dev = None
+        try:
+            while True:
+                cmd, mid, dlen = struct.unpack("!BHH", self._read(c, 5))
+                if cmd == MSG_RSP:
+                    continue
+                data = self._read(c, dlen) if dlen else b""
+                if cmd == MSG_HW_LOGIN:
+                    auth = data.decode()
+                    if self.token and auth != self.token:
+                        c.sendall(struct.pack("!BHH", MSG_RSP, mid, STA_INVALID_TOKEN))
+                        return
+                    dev = Device(c, auth)
+                    with dev.wlock:
+                        c.sendall(struct.pack("!BHH", MSG_RSP, mid, STA_SUCCESS))
+                    self.devices.append(dev)
+                    self.stats["logins"] += 1
+                elif cmd == MSG_PING:
+                    self.stats["pings"] += 1
+                    lock = dev.wlock if dev else threading.Lock()
+                    with lock:
+                        c.sendall(struct.pack("!BHH", MSG_RSP, mid, STA_SUCCESS))
+                elif cmd == MSG_BRIDGE and dev:
+                    a = data.decode().split("\0")
+                    if len(a) > 2 and a[1] == "i":
+                        dev.binds[a[0]] = a[2]
+                    elif len(a) > 2 and a[1] == "vw":
+                        self.stats["bridge"] += 1
+                        for d in list(self.devices):
+                            if d.auth == dev.binds.get(a[0]):
+                                try:
+                                    d.send(MSG_HW, *a[1:])
+                                except OSError:
+                                    pass
+                elif cmd == MSG_HW and dev:
+                    a = data.decode().split("\0")
+                    if a[0] == "vw":
+                        self.stats["vw"] += 1
+                        dev.vw.append((time.monotonic(), a[1], a[2:]))
+                        if self.on_vw:
+                            self.on_vw(dev, a[1], a[2:])
+        except (OSError, EOFError, struct.error, UnicodeError):
+            pass
+        finally:
+            c.close()
+            if dev in self.devices:
+                self.devices.remove(dev)
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    s = BlynkServer("0.0.0.0", port).start()
+    s.on_vw = lambda d, pin, vals: print(d.auth[:6], "V%s" % pin, vals)
+    print("Blynk 伺服器替身執行中，port", s.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        s.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+本機 MQTT broker 替身 (MQTT 3.1.1 子集，QoS 0/1)
+取代 broker.hivemq.com 供模擬與效能測試使用：
+- clean_session=False 的持久 session：保留訂閱，離線期間的 QoS 1 訊息於重連後補送
+- 萬用字元訂閱 (+ / #)
+- 故障注入：kill() 切斷連線、set_up(False) 拒絕新連線
+用法: python broker.py [port]
+"""
+
+import socket
+import struct
+import sys
+import threading
+import time
+
+
+def match(flt, topic):
+    f = flt.split("/")
+    t = topic.split("/")
+    for i, p in enumerate(f):
+        if p == "#":
+            return True
+        if i >= len(t) or (p != "+" and p != t[i]):
+            return False
+    return len(f) == len(t)
+
+
+def _varlen(n):
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+def _str(b):
+    return struct.pack("!H", len(b)) + b
+
+
+class Session:
+    def __init__(self, cid):
+        self.cid = cid
+        self.subs = {}
+        self.queue = []
+        self.conn = None
+        self.clean = True
+        self.pid = 0
+        self.wlock = threading.Lock()
+
+
+class Broker:
+    def __init__(self, host="127.0.0.1", port=0, queue_max=1000):
+        self.sessions = {}
+        self.lock = threading.RLock()
+        self.up = True
+        self.queue_max = queue_max
+        self.on_publish = None  # on_publish(topic, msg, cid)，topic/msg 為 bytes
+        self.stats = {"connects": 0, "refused": 0, "in": 0, "out": 0, "queued": 0}
+        self.srv = socket.socket()
+        self.srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.srv.bind((host, port))
+        self.srv.listen(128)
+        self.host = host
+        self.port = self.srv.getsockname()[1]
+        self._run = False
+
+    def start(self):
+        self._run = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def close(self):
+        self._run = False
+        self.kill()
+        try:
+            self.srv.close()
+        except OSError:
+            pass
+
+    def _accept(self):
+        while self._run:
+            try:
+                c, _ = self.srv.accept()
+            except OSError:
+                return
+            if not self.up:
+                self.stats["refused"] += 1
+                c.close()
+                continue
+            c.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._client, args=(c,), daemon=True).start()
+
+    # ---------- 故障注入 ----------
+    def kill(self, cid=None):
+        """切斷 (指定或全部) 用戶端連線，session 保留"""
+        with self.lock:
+            for s in list(self.sessions.values()):
+                if s.conn and (cid is None or s.cid == cid):
+                    try:
+                        s.conn.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    s.conn.close()
+                    s.conn = None
+
+    def set_up(self, up):
+        self.up = up
+        if not up:
+            self.kill()
+
+    # ---------- 封包 ----------
+    @staticmethod
+    def _read(c, n):
+        buf = b""
+        while len(buf) < n:
+            d = c.recv(n - len(buf))
+            if not d:
+                raise EOFError
+            buf += d
+        return buf
+
+    def _packet(self, c):
+        hdr = self._read(c, 1)[0]
+        n = sh = 0
+        while True:
+            b = self._read(c, 1)[0]
+            n |= (b & 0x7F) << sh
+            sh += 7
+            if not b & 0x80:
+                break
+        return hdr, self._read(c, n) if n else b""
+
+    def _write(self, s, data):
+        with s.wlock:
+            if s.conn:
+                s.conn.sendall(data)
+
+    def _deliver(self, s, topic, msg, qos):
+        if s.conn is None:
+            if qos and not s.clean and len(s.queue) < self.queue_max:
+                s.queue.append((topic, msg))
+                self.stats["queued"] += 1
+            return
+        if qos:
+            s.pid = s.pid % 0xFFFF + 1
+            body = _str(topic) + struct.pack("!H", s.pid) + msg
+            pkt = bytes([0x32]) + _varlen(len(body)) + body
+        else:
+            body = _str(topic) + msg
+            pkt = bytes([0x30]) + _varlen(len(body)) + body
+        try:
+            self._write(s, pkt)
+            self.stats["out"] += 1
+        except OSError:
+            pass
+
+    def publish(self, topic, msg, qos=0, cid=None):
+        """由 broker 端 (或 responder) 發布訊息"""
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        ts = topic.decode()
+        with self.lock:
+            targets = []
+            for s in self.sessions.values():
+                best = -1
+                for f, q in s.subs.items():
+                    if q > best and match(f, ts):
+                        best = q
+                if best >= 0:
+                    targets.append((s, min(best, qos)))
+        for s, q in targets:
+            self._deliver(s, topic, msg, q)
+        if self.on_publish:
+            self.on_publish(topic, msg, cid)
+
+    def _client(self, c):
+        s = None
+        try:
+            hdr, body = self._packet(c)
+            if hdr >> 4 != 1:
+                return
+            i = 2 + struct.unpack("!H", body[:2])[0]
+            flags = body[i + 1]
+            keepalive = struct.unpack("!H", body[i + 2:i + 4])[0]
+            i += 4
+            n = struct.unpack("!H", body[i:i + 2])[0]
+            cid = body[i + 2:i + 2 + n].decode()
+            clean = bool(flags & 2)
+            with self.lock:
+                s = self.sessions.get(cid)
+                if s and s.conn:
+                    try:
+                        s.conn.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    s.conn = None
+                present = bool(s) and not clean
+                if not s or clean:
+                    s = Session(cid)
+                    self.sessions[cid] = s
+                s.clean = clean
+                s.conn = c
+                queued, s.queue = s.queue, []
+                self.stats["connects"] += 1
+            if keepalive:
+                c.settimeout(keepalive * 1.5)
+            self._write(s, bytes([0x20, 2, 1 if present else 0, 0]))
+            for t, m in queued:
+                self._deliver(s, t, m, 1)
+            while True:
+                hdr, body = self._packet(c)
+                typ = hdr >> 4
+                if typ == 3:
+                    qos = (hdr >> 1) & 3
+                    n = struct.unpack("!H", body[:2])[0]
+                    topic = body[2:2 + n]
+                    j = 2 + n
+                    if qos:
+                        pid = body[j:j + 2]
+                        j += 2
+                        self._write(s, b"\x40\x02" + pid)
+                    self.stats["in"] += 1
+                    self.publish(topic, body[j:], qos, cid)
+                elif typ == 8:
+                    pid = body[:2]
+                    j = 2
+                    codes = bytearray()
+                    while j < len(body):
+                        n = struct.unpack("!H", body[j:j + 2])[0]
+                        f = body[j + 2:j + 2 + n].decode()
+                        q = min(body[j + 2 + n], 1)
+                        with self.lock:
+                            s.subs[f] = q
+                        codes.append(q)
+                        j += 3 + n
+                    self._write(s, bytes([0x90, 2 + len(codes)]) + pid + bytes(codes))
+                elif typ == 10:
+                    pid = body[:2]
+                    j = 2
+                    while j < len(body):
+                        n = struct.unpack("!H", body[j:j + 2])[0]
+                        with self.lock:
+                            s.subs.pop(body[j + 2:j + 2 + n].decode(), None)
+                        j += 2 + n
+                    self._write(s, b"\xb0\x02" + pid)
+                elif typ == 12:
+                    self._write(s, b"\xd0\x00")
+                elif typ == 14:
+                    break
+        except (OSError, EOFError, IndexError, struct.error, UnicodeError):
+            pass
+        finally:
+            c.close()
+            if s:
+                with self.lock:
+                    if s.conn is c:
+                        s.conn = None
+                    if s.clean and s.conn is None and self.sessions.get(s.cid) is s:
+                        del self.sessions[s.cid]
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1883
+    b = Broker("0.0.0.0", port).start()
+    b.on_publish = lambda t, m, cid: print(cid, t.decode(), m)
+    print("MQTT broker 替身執行中，port", b.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        b.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+把 mainLike_optimized 與它用到的裝置模組以 mpy-cross 預先編譯成 .mpy，輸出要上傳到 flash 的檔案
+ESP8266 在裝置上編譯 .py 時整份原始碼與剖析樹都要放進 heap (約 36 KB)，模組多了開機就 MemoryError；
+.mpy 直接載入 bytecode，不需要在裝置上編譯
+模組由 import 敘述遞迴找出 (只收 repo 根目錄下的 .py)；只在函式內 import 的模組 (tach、group、charz、prof)
+標為「選用」，對應功能預設關閉時不會載入，不需要上傳
+輸出目錄另外寫入：
+  main.py      - 只有一行 import mainLike_optimized，開機由它載入編譯好的主程式
+  manifest.py  - 凍結進韌體用：把這些模組編進 ESP8266 韌體 (放在 flash 直接執行，不佔 heap)，
+                 建置 ports/esp8266 時以 make FROZEN_MANIFEST=<輸出目錄>/manifest.py 指定
+mpy-cross 的版本要與裝置上 MicroPython 的 .mpy 版本一致 (pip install mpy-cross==<韌體版本>)
+上傳例: mpremote cp build/*.mpy build/main.py :
+用法: python build.py [-o build] [--mpy-cross mpy-cross] [--all] [--dry-run]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.normpath(os.path.join(HERE, "..", ".."))
+MAIN = "mainLike_optimized"
+
+IMPORT = re.compile(r"^(\s*)(?:import\s+([\w, ]+)|from\s+(\w+)\s+import)", re.M)
+
+
+def imports(name):
+    """回傳 {模組: 是否只在縮排區塊內 import}，只收 repo 根目錄下有 .py 的模組"""
+    with open(os.path.join(ROOT, name + ".py"), encoding="utf-8") as f:
+        src = f.read()
+    out = {}
+    for ind, many, one in IMPORT.findall(src):
+        for m in (many.split(",") if many else [one]):
+            m = m.strip().split(" ")[0]
+            if os.path.isfile(os.path.join(ROOT, m + ".py")):
+                out[m] = out.get(m, True) and bool(ind)
+    return out
+
+
+def modules():
+    """回傳 {模組: 是否選用}；主程式頂層直接 import 的 (以及它們再 import 的) 為必要"""
+    need = {MAIN: False}
+    todo = [MAIN]
+    while todo:
+        n = todo.pop()
+        for m, lazy in imports(n).items():
+            lazy = lazy or need[n]
+            if m not in need or need[m] and not lazy:
+                need[m] = lazy
+                todo.append(m)
+    return need
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-o", "--out", default="build")
+    ap.add_argument("--mpy-cross", default="mpy-cross")
+    ap.add_argument("--all", action="store_true", help="選用模組也編譯")
+    ap.add_argument("--dry-run", action="store_true", help="只列出模組與大小")
+    a = ap.parse_args()
+    mods = modules()
+    mc = shutil.which(a.mpy_cross)
+    if not a.dry_run and not mc:
+        sys.exit("找不到 %s (pip install mpy-cross)；--dry-run 只列出模組" % a.mpy_cross)
+    if not a.dry_run:
+        os.makedirs(a.out, exist_ok=True)
+    print("%-20s %6s %8s %8s" % ("模組", "", ".py", ".mpy"))
+    tot = [0, 0]
+    for m in sorted(mods, key=lambda m: (mods[m], m)):
+        src = os.path.join(ROOT, m + ".py")
+        py = os.path.getsize(src)
+        mpy = None
+        if not a.dry_run and (a.all or not mods[m]):
+            dst = os.path.join(a.out, m + ".mpy")
+            subprocess.run([mc, "-o", dst, src], check=True)
+            mpy = os.path.getsize(dst)
+        if not mods[m]:
+            tot[0] += py
+            tot[1] += mpy or 0
+        print("%-20s %6s %8d %8s" % (m, "選用" if mods[m] else "", py, "-" if mpy is None else mpy))
+    print("%-20s %6s %8d %8s" % ("必要模組合計", "", tot[0], tot[1] if tot[1] else "-"))
+    if a.dry_run:
+        return
+    with open(os.path.join(a.out, "main.py"), "w") as f:
+        f.write("import %s\n" % MAIN)
+    with open(os.path.join(a.out, "manifest.py"), "w") as f:
+        f.write('include("$(PORT_DIR)/boards/manifest.py")\n')
+        for m in sorted(mods):
+            if a.all or not mods[m]:
+                f.write('module("%s.py", base_path="%s")\n' % (m, ROOT.replace("\\", "/")))
+    print("輸出於 %s：.mpy 與 main.py 上傳到 flash；或以 manifest.py 凍結進韌體" % a.out)
+
+
+if __name__ == "__main__":
+    main()
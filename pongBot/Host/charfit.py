@@ -0,0 +1,124 @@
+"""
+由特性量測 log (charz.Sweep，格式見 charz.py) 擬合每個通道的 duty -> 讀值 曲線，
+輸出 mainLike_optimized 開機時載入的校正檔 (CAL_DB，預設 motor.cal)
+  馬達 - 讀值為 tach RPM，每個 duty 取樣本中位數
+  伺服 - 讀值為回授電位器 ADC 角度 (每圈回繞)，由相鄰樣本展開後算出轉速 (counts/s) 再取中位數
+曲線強制單調 (沿 duty 方向取累積最大值)，負值視為 0；另印出線性擬合 (斜率、起轉 duty) 與最大殘差
+log 以固定大小區塊讀取，不整份載入記憶體
+用法: python charfit.py charz.bin [motor.cal] [--rate servo]
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+
+from charz import FMT, REC
+
+CHUNK = 4096
+
+
+def read(path):
+    """逐筆產生 (通道名稱, duty, 讀值, ms)"""
+    with open(path, "rb") as f:
+        names = f.readline().decode().strip().split(",")
+        rest = b""
+        while True:
+            b = f.read(CHUNK)
+            if not b:
+                break
+            b = rest + b
+            n = len(b) // REC * REC
+            for c, d, v, t in struct.iter_unpack(FMT, b[:n]):
+                yield names[c], d, v, t
+            rest = b[n:]
+
+
+def median(xs):
+    xs = sorted(xs)
+    n = len(xs)
+    return xs[n // 2] if n & 1 else (xs[n // 2 - 1] + xs[n // 2]) / 2
+
+
+def collect(path, rate=()):
+    """回傳 {通道: {duty: [值...]}}；rate 中的通道值換成相鄰樣本的 counts/s"""
+    out = {}
+    last = {}
+    for name, d, v, t in read(path):
+        g = out.setdefault(name, {})
+        if name in rate:
+            p = last.get(name)
+            last[name] = (d, v, t)
+            if not p or p[0] != d or t <= p[2]:
+                continue
+            dv = (v - p[1] + 512) % 1024 - 512
+            v = dv * 1000 / (t - p[2])
+        g.setdefault(d, []).append(v)
+    return out
+
+
+def monotone(pts):
+    """pts 依 duty 排序；讀值沿 duty 遞增或遞減 (依兩端判斷) 的累積最大值"""
+    vs = [max(0, v) for _, v in pts]
+    if vs and vs[0] > vs[-1]:
+        vs = vs[::-1]
+        for i in range(1, len(vs)):
+            vs[i] = max(vs[i], vs[i - 1])
+        vs = vs[::-1]
+    else:
+        for i in range(1, len(vs)):
+            vs[i] = max(vs[i], vs[i - 1])
+    return [(d, int(round(v))) for (d, _), v in zip(pts, vs)]
+
+
+def linfit(pts):
+    """只用讀值 > 0 的點做最小平方直線；回傳 (斜率, 讀值為 0 的 duty, 最大殘差)"""
+    p = [(d, v) for d, v in pts if v > 0]
+    if len(p) < 2:
+        return 0.0, 0.0, 0.0
+    n = len(p)
+    sx = sum(d for d, _ in p)
+    sy = sum(v for _, v in p)
+    sxx = sum(d * d for d, _ in p)
+    sxy = sum(d * v for d, v in p)
+    k = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    b = (sy - k * sx) / n
+    res = max(abs(v - (k * d + b)) for d, v in p)
+    return k, -b / k if k else 0.0, res
+
+
+def fit(path, rate=("servo",)):
+    """回傳 {通道: [(duty, 讀值)...]} 單調校正表"""
+    cal = {}
+    for name, g in collect(path, rate).items():
+        pts = sorted((d, median(vs)) for d, vs in g.items())
+        cal[name] = monotone(pts)
+    return cal
+
+
+def write(path, cal):
+    with open(path, "w") as f:
+        for name in sorted(cal):
+            f.write("%s %s\n" % (name, " ".join("%d:%d" % p for p in cal[name])))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("log")
+    ap.add_argument("out", nargs="?", default="motor.cal")
+    ap.add_argument("--rate", default="servo")
+    a = ap.parse_args()
+    cal = fit(a.log, tuple(a.rate.split(",")) if a.rate else ())
+    write(a.out, cal)
+    for name in sorted(cal):
+        k, d0, res = linfit(cal[name])
+        print("%-6s %2d 點  最大 %6d  斜率 %8.2f/duty  起轉 duty %6.1f  線性殘差 %6.1f" % (
+            name, len(cal[name]), max(v for _, v in cal[name]), k, d0, res))
+    print("校正檔：%s" % a.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+場館用的多機閘道 (asyncio，與 BlynkLib.BlynkProtocol 相同的 5-byte 封包格式)
+每台 PongBot 把 Blynk 伺服器位址指向閘道，手機/主控只需連一條控制連線，不必每支手機各開一個雲端 session
+- 裝置以 MSG_HW_LOGIN 登入 (auth 為裝置名稱；tokens 不為 None 時只接受其中的 auth)，同名重登會關掉舊連線
+- 控制端以 ctrl token 登入：送出的 vw 轉送給全部裝置；bridge ("通道\0i\0auth" 綁定) 可指定單台，
+  並每 agg_ms 收到有更新的遙測 pin 彙總：vw pin 台數 平均 最小 最大
+- 轉送 fanout(pin, *值)：內容只編碼一次，每個連線只補 5-byte 標頭；同一輪事件迴圈內累積的封包
+  合併成一次 write (batch=False 則每個封包各自 write，供比較)
+- 遙測：每台保留每個 pin 的最新值 (原始 bytes)，agg(pin) 彙總所有裝置的數值
+- 每個連線的記憶體上限 (budget())：接收緩衝 ≤ 5+buffin (超過即斷線，同 BlynkProtocol 的 Cmd too big)、
+  送出佇列加 transport 緩衝 ≤ wmax (超過丟棄並計數)、kernel 送出緩衝 SO_SNDBUF = sndbuf
+  (Linux 預設可自動長到數 MB，卡住的連線會把轉送的封包都堆在 kernel)、遙測 ≤ pins 個 pin 且每個值 ≤ tv bytes
+- 逾時：h-beat (登入後 MSG_INTERNAL 回報) 的 1.5 倍沒有收到任何封包即斷線 (abort，不等卡住的緩衝送完)，未回報用 idle_ms
+- 預設只聽 127.0.0.1；--host 綁定其他位址時必須以 --ctrl 與 --tokens 指定控制 token 與裝置名單
+  (未指定 --ctrl 時每次啟動隨機產生並印出)
+用法: python gateway.py [port] [--host 位址] [--ctrl token] [--tokens 名稱,名稱...]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import struct
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+
+from BlynkLib import (MSG_BRIDGE, MSG_HW, MSG_HW_LOGIN, MSG_INTERNAL, MSG_PING, MSG_RSP,
+                      STA_INVALID_TOKEN, STA_SUCCESS)
+
+HDR = struct.Struct("!BHH")
+
+
+def body(*args):
+    return ("\0".join(map(str, args))).encode("utf8")
+
+
+class Session(asyncio.Protocol):
+    __slots__ = ("gw", "tr", "auth", "ctrl", "mid", "rb", "q", "qn", "tele", "binds", "hb", "t_rx")
+
+    def __init__(self, gw):
+        self.gw = gw
+        self.tr = None
+        self.auth = None
+        self.ctrl = False
+        self.mid = 0
+        self.rb = bytearray()
+        self.q = []
+        self.qn = 0
+        self.tele = {}  # pin (bytes) -> 最新值 (bytes，以 \0 分隔)
+        self.binds = None  # bridge 通道 -> 目標 auth
+        self.hb = 0
+        self.t_rx = time.monotonic()
+
+    def connection_made(self, tr):
+        self.tr = tr
+        if self.gw.sndbuf:
+            tr.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.gw.sndbuf)
+        self.gw.sess.add(self)
+        self.gw.stats["conns"] += 1
+
+    def connection_lost(self, exc):
+        g = self.gw
+        g.sess.discard(self)
+        if self.ctrl:
+            g.ctrls.discard(self)
+        elif self.auth is not None and g.devs.get(self.auth) is self:
+            del g.devs[self.auth]
+        self.q = []
+        self.qn = 0
+
+    def data_received(self, data):
+        g = self.gw
+        b = self.rb
+        b += data
+        self.t_rx = time.monotonic()
+        n = len(b)
+        i = 0
+        while n - i >= 5:
+            cmd, mid, dlen = HDR.unpack_from(b, i)
+            if cmd == MSG_RSP:
+                i += 5
+                continue
+            if dlen > g.buffin:
+                return self.drop("big")
+            if n - i < 5 + dlen:
+                break
+            d = bytes(b[i + 5:i + 5 + dlen])
+            i += 5 + dlen
+            g.stats["rx"] += 1
+            if not g._frame(self, cmd, mid, d):
+                return
+        del b[:i]
+
+    def drop(self, why):
+        self.gw.stats[why] += 1
+        self.rb = bytearray()
+        self.tr.abort()
+
+
+class Gateway:
+    def __init__(self, ctrl="ctrl", tokens=None, buffin=1024, wmax=4096, sndbuf=16384, pins=16, tv=64,
+                 idle_ms=10000, agg_ms=1000, batch=True):
+        self.ctrl = ctrl
+        self.tokens = tokens
+        self.buffin = buffin
+        self.wmax = wmax
+        self.sndbuf = sndbuf
+        self.pins = pins
+        self.tv = tv
+        self.idle_ms = idle_ms
+        self.agg_ms = agg_ms
+        self.batch = batch
+        self.sess = set()
+        self.devs = {}
+        self.ctrls = set()
+        self.dirty = []
+        self.changed = set()
+        self.sched = False
+        self.on_vw = None  # on_vw(session, pin, vals)，pin/vals 為 str
+        self.stats = {"conns": 0, "logins": 0, "refused": 0, "rx": 0, "tx": 0, "writes": 0, "vw": 0,
+                      "fanout": 0, "bridge": 0, "wdrop": 0, "tdrop": 0, "big": 0, "bad": 0, "idle": 0}
+        self.srv = None
+        self._task = None
+
+    def budget(self):
+        """每個連線的緩衝上限 (bytes，不含 Python 物件本身與 kernel 的接收緩衝；Linux 實際配置 2 倍 SO_SNDBUF)"""
+        return 5 + self.buffin + self.wmax + self.pins * self.tv + 2 * self.sndbuf
+
+    async def start(self, host="127.0.0.1", port=0, backlog=2048):
+        self.srv = await asyncio.get_running_loop().create_server(lambda: Session(self), host, port,
+                                                                  backlog=backlog)
+        self.host = host
+        self.port = self.srv.sockets[0].getsockname()[1]
+        self._task = asyncio.ensure_future(self._tick())
+        return self
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+        if self.srv:
+            self.srv.close()
+        for s in list(self.sess):
+            s.tr.close()
+
+    # ---------- 送出 ----------
+    def _put(self, s, hdr, d=b""):
+        n = len(hdr) + len(d)
+        if s.tr.is_closing() or s.qn + n + s.tr.get_write_buffer_size() > self.wmax:
+            self.stats["wdrop"] += 1
+            return False
+        self.stats["tx"] += 1
+        if not self.batch:
+            s.tr.write(hdr + d)
+            self.stats["writes"] += 1
+            return True
+        if not s.qn:
+            self.dirty.append(s)
+            if not self.sched:
+                self.sched = True
+                asyncio.get_running_loop().call_soon(self._flush)
+        s.q.append(hdr)
+        if d:
+            s.q.append(d)
+        s.qn += n
+        return True
+
+    def _flush(self):
+        self.sched = False
+        d, self.dirty = self.dirty, []
+        for s in d:
+            if s.qn and not s.tr.is_closing():
+                s.tr.write(b"".join(s.q))
+                self.stats["writes"] += 1
+            s.q = []
+            s.qn = 0
+
+    def send(self, s, cmd, d):
+        s.mid = s.mid % 0xFFFF + 1
+        return self._put(s, HDR.pack(cmd, s.mid, len(d)), d)
+
+    def fanout(self, pin, *vals, devs=None):
+        """對裝置 (預設全部) 送出 vw，回傳排入的台數"""
+        self.stats["fanout"] += 1
+        d = body("vw", pin, *vals)
+        n = 0
+        for s in (self.devs.values() if devs is None else devs):
+            n += self.send(s, MSG_HW, d)
+        return n
+
+    # ---------- 遙測 ----------
+    def agg(self, pin):
+        """(台數, 平均, 最小, 最大)：各裝置 pin 最新值的第一個欄位中可轉成數字者"""
+        k = str(pin).encode()
+        n, tot, lo, hi = 0, 0.0, None, None
+        for s in self.devs.values():
+            v = s.tele.get(k)
+            if v is None:
+                continue
+            try:
+                x = float(v.split(b"\0", 1)[0])
+            except ValueError:
+                continue
+            n += 1
+            tot += x
+            lo = x if lo is None or x < lo else lo
+            hi = x if hi is None or x > hi else hi
+        return n, (tot / n if n else 0), lo, hi
+
+    def _tele(self, s, pin, v):
+        t = s.tele
+        if len(v) > self.tv or (pin not in t and len(t) >= self.pins):
+            self.stats["tdrop"] += 1
+            return
+        t[pin] = v
+        if self.ctrls:
+            self.changed.add(pin)
+
+    async def _tick(self):
+        t_agg = time.monotonic()
+        while True:
+            await asyncio.sleep(min(self.agg_ms, 1000) / 1000)
+            now = time.monotonic()
+            for s in list(self.sess):
+                if (now - s.t_rx) * 1000 > (s.hb * 1500 if s.hb else self.idle_ms):
+                    self.stats["idle"] += 1
+                    s.tr.abort()
+            if self.ctrls and self.changed and (now - t_agg) * 1000 >= self.agg_ms:
+                t_agg = now
+                c, self.changed = self.changed, set()
+                for pin in c:
+                    n, avg, lo, hi = self.agg(pin.decode())
+                    if n:
+                        d = body("vw", pin.decode(), n, "%g" % avg, "%g" % lo, "%g" % hi)
+                        for s in list(self.ctrls):
+                            self.send(s, MSG_HW, d)
+
+    # ---------- 接收 ----------
+    def _frame(self, s, cmd, mid, d):
+        """處理一個封包；連線已關閉回傳 False"""
+        if cmd == MSG_HW_LOGIN:
+            auth = d.decode("utf8", "replace")
+            if auth == self.ctrl:
+                s.ctrl = True
+                self.ctrls.add(s)
+            elif self.tokens is not None and auth not in self.tokens:
+                self.stats["refused"] += 1
+                s.tr.write(HDR.pack(MSG_RSP, mid, STA_INVALID_TOKEN))
+                s.tr.close()
+                return False
+            else:
+                old = self.devs.get(auth)
+                if old is not None and old is not s:
+                    old.tr.abort()
+                self.devs[auth] = s
+            s.auth = auth
+            self.stats["logins"] += 1
+            self._put(s, HDR.pack(MSG_RSP, mid, STA_SUCCESS))
+            return True
+        if s.auth is None:
+            s.drop("bad")
+            return False
+        if cmd == MSG_PING:
+            self._put(s, HDR.pack(MSG_RSP, mid, STA_SUCCESS))
+        elif cmd == MSG_HW:
+            a = d.split(b"\0", 2)
+            if len(a) < 3 or a[0] != b"vw":
+                return True
+            self.stats["vw"] += 1
+            if s.ctrl:
+                self.fanout(a[1].decode(), a[2].decode())
+                return True
+            self._tele(s, a[1], a[2])
+            if self.on_vw:
+                self.on_vw(s, a[1].decode(), a[2].decode().split("\0"))
+        elif cmd == MSG_BRIDGE:
+            a = d.split(b"\0", 2)
+            if len(a) < 3:
+                return True
+            if a[1] == b"i":
+                if s.binds is None:
+                    s.binds = {}
+                if a[0] in s.binds or len(s.binds) < self.pins:
+                    s.binds[a[0]] = a[2].decode()
+            elif a[1] == b"vw":
+                t = self.devs.get((s.binds or {}).get(a[0]))
+                if t is not None:
+                    self.stats["bridge"] += 1
+                    self.send(t, MSG_HW, d[len(a[0]) + 1:])
+        elif cmd == MSG_INTERNAL:
+            a = d.split(b"\0")
+            for j in range(0, len(a) - 1, 2):
+                if a[j] == b"h-beat":
+                    try:
+                        s.hb = int(a[j + 1])
+                    except ValueError:
+                        pass
+        return True
+
+
+async def serve(host, port, ctrl, tokens):
+    g = await Gateway(ctrl=ctrl, tokens=tokens).start(host, port)
+    g.on_vw = lambda s, pin, vals: print(s.auth[:6], "V%s" % pin, vals)
+    print("PongBot 閘道執行中，%s port %d，控制 token %s，裝置 %s" % (
+        host, g.port, ctrl, "不限" if tokens is None else ",".join(sorted(tokens))))
+    try:
+        while True:
+            await asyncio.sleep(10)
+            st = g.stats
+            print("裝置 %d 控制端 %d | rx %d tx %d write %d 丟棄 %d" % (
+                len(g.devs), len(g.ctrls), st["rx"], st["tx"], st["writes"], st["wdrop"]))
+    finally:
+        g.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("port", nargs="?", type=int, default=8080)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--ctrl")
+    ap.add_argument("--tokens")
+    a = ap.parse_args()
+    if a.host not in ("127.0.0.1", "localhost", "::1") and (a.ctrl is None or a.tokens is None):
+        ap.error("綁定 %s 時必須指定 --ctrl 與 --tokens" % a.host)
+    tokens = set(t for t in a.tokens.split(",") if t) if a.tokens is not None else None
+    try:
+        asyncio.run(serve(a.host, a.port, a.ctrl or secrets.token_hex(8), tokens))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+模擬大量 PongBot 連線的負載產生器 (asyncio)，供 gateway.py 的擴充性量測
+每台模擬機器都是真正的 BlynkLib.BlynkProtocol (登入、h-beat ping、封包解碼都走裝置端程式碼)，只把
+_write 換成 asyncio transport：
+- 收到的 vw 原樣回寫同一個 pin (如同 mainLike_optimized 回報狀態)，閘道可藉此量測轉送到全部回覆的時間
+- 每 tele_ms 在 TELE_PIN 送一個數值遙測 (各台錯開)
+- 前 slow 台登入後停止讀取 (接收緩衝縮小) 也不再送出，模擬卡住的機器
+執行 secs 秒後印出一行 JSON 摘要：連上台數、連線時間、各台 Stats 的 h-beat ping 往返 (ms)
+用法: python loadgen.py [host] [port] [台數] [--secs 10] [--tele 1000] [--hb 2] [--slow 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+
+import BlynkLib
+
+TELE_PIN = 21
+TICK_MS = 100
+BATCH = 100
+
+
+class Bot(BlynkLib.BlynkProtocol, asyncio.Protocol):
+    def __init__(self, auth, hb, slow=False):
+        self.name = auth
+        self.hb = hb
+        self.slow = slow
+        self.tr = None
+        self.t_tele = 0
+        self.up = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, tr):
+        self.tr = tr
+        BlynkLib.BlynkProtocol.__init__(self, self.name, heartbeat=self.hb, stats=BlynkLib.Stats())
+        self.on("connected", self._up)
+        self.on("V*", self._vw)
+
+    def _up(self, ping=0):
+        if self.slow:
+            self.tr.pause_reading()
+        if not self.up.done():
+            self.up.set_result(ping)
+
+    def _vw(self, pin, vals):
+        self.virtual_write(pin, *vals)
+
+    def _write(self, data):
+        if self.tr and not self.tr.is_closing():
+            self.tr.write(data)
+
+    def data_received(self, data):
+        self.process(data)
+
+    def connection_lost(self, exc):
+        self.disconnect()
+
+
+async def connect(loop, b, host, port):
+    if not b.slow:
+        return await loop.create_connection(lambda: b, host, port)
+    c = socket.socket()
+    c.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    c.setblocking(False)
+    await loop.sock_connect(c, (host, port))
+    return await loop.create_connection(lambda: b, sock=c)
+
+
+async def run(host, port, n, secs=10, tele=1000, hb=2, slow=0, seed=1):
+    loop = asyncio.get_running_loop()
+    rnd = random.Random(seed)
+    bots = []
+    t0 = time.monotonic()
+    for j in range(0, n, BATCH):
+        grp = [Bot("bot%04d" % i, hb, i < slow) for i in range(j, min(n, j + BATCH))]
+        r = await asyncio.gather(*[connect(loop, b, host, port) for b in grp], return_exceptions=True)
+        bots += [b for b, x in zip(grp, r) if not isinstance(x, BaseException)]
+    await asyncio.wait([b.up for b in bots], timeout=10)
+    t_conn = time.monotonic() - t0
+    now = BlynkLib.gettime()
+    for b in bots:
+        b.t_tele = now + rnd.randrange(tele)
+    end = time.monotonic() + secs
+    while time.monotonic() < end:
+        await asyncio.sleep(TICK_MS / 1000)
+        now = BlynkLib.gettime()
+        for b in bots:
+            if b.state != BlynkLib.CONNECTED or b.slow:
+                continue
+            b.process()
+            if tele and now >= b.t_tele:
+                b.t_tele += tele
+                b.virtual_write(TELE_PIN, rnd.randrange(1000, 3000))
+    rtt = sorted(b.stats.srtt for b in bots if b.stats.n)
+    up = sum(b.state == BlynkLib.CONNECTED for b in bots)
+    for b in bots:
+        b.tr.close()
+    return {"n": n, "up": up, "conn_s": round(t_conn, 3),
+            "rtt_p50": rtt[len(rtt) // 2] if rtt else -1, "rtt_max": rtt[-1] if rtt else -1,
+            "lost": sum(b.stats.lost for b in bots)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("host", nargs="?", default="127.0.0.1")
+    ap.add_argument("port", nargs="?", type=int, default=8080)
+    ap.add_argument("n", nargs="?", type=int, default=100)
+    ap.add_argument("--secs", type=float, default=10)
+    ap.add_argument("--tele", type=int, default=1000)
+    ap.add_argument("--hb", type=int, default=2)
+    ap.add_argument("--slow", type=int, default=0)
+    a = ap.parse_args()
+    r = asyncio.run(run(a.host, a.port, a.n, a.secs, a.tele, a.hb, a.slow))
+    print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+參考 responder 服務：代替外部服務保存設定並回覆儲存/匯入流程
+儲存：
+  pongBot/preset/save (二進位) 或 pongBot/servo/level + motor/top + motor/bottom (舊格式)
+  -> pongBot/save/successful "TRUE"
+匯入：
+  pongBot/importing (preset.REQ 回二進位，其他回舊 JSON 格式)
+  -> pongBot/importing/data + pongBot/importing/successful "T" (無資料時 "F")
+請求依序處理，delay 模擬服務時間 (慢速 responder 會排隊)
+用法: python responder.py [broker] [port] [presets.json] [delay_ms]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+
+import preset
+from umqtt.simple import MQTTClient
+
+T_SAVE = b"pongBot/preset/save"
+T_LEVEL = b"pongBot/servo/level"
+T_TOP = b"pongBot/motor/top"
+T_BOTTOM = b"pongBot/motor/bottom"
+T_IMPORT = b"pongBot/importing"
+LEGACY = {T_LEVEL: 0, T_TOP: 1, T_BOTTOM: 2}
+
+
+class Responder:
+    def __init__(self, host="127.0.0.1", port=1883, path=None, delay=0.0, client_id="pongBot-responder"):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.delay = delay
+        self.client_id = client_id
+        self.preset = None
+        self.pending = [0, 0, 0]
+        self.queue = []
+        self.cv = threading.Condition()
+        self.c = None
+        self.out = None
+        self._run = False
+        self.stats = {"saves": 0, "imports": 0, "bad": 0, "queue_max": 0}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                d = json.load(f)
+            self.preset = (d["servo_level"], d["motor_top"], d["motor_bottom"])
+
+    def start(self):
+        # 收發分成兩條連線：接收執行緒阻塞在 wait_msg 時，工作執行緒仍能等待自己的 PUBACK
+        self.c = MQTTClient(self.client_id, self.host, self.port)
+        self.c.set_callback(self._on)
+        self.c.connect()
+        self.out = MQTTClient(self.client_id + "-out", self.host, self.port)
+        self.out.connect()
+        for t in (T_SAVE, T_LEVEL, T_TOP, T_BOTTOM, T_IMPORT):
+            self.c.subscribe(t, 1)
+        self._run = True
+        threading.Thread(target=self._recv, daemon=True).start()
+        threading.Thread(target=self._work, daemon=True).start()
+        return self
+
+    def close(self):
+        self._run = False
+        with self.cv:
+            self.cv.notify()
+        for c in (self.c, self.out):
+            try:
+                c.sock.close()
+            except OSError:
+                pass
+
+    def _on(self, topic, msg):
+        with self.cv:
+            self.queue.append((topic, msg))
+            if len(self.queue) > self.stats["queue_max"]:
+                self.stats["queue_max"] = len(self.queue)
+            self.cv.notify()
+
+    def _recv(self):
+        while self._run:
+            try:
+                self.c.wait_msg()
+            except (OSError, IndexError, TypeError):
+                return
+
+    def _work(self):
+        while True:
+            with self.cv:
+                while self._run and not self.queue:
+                    self.cv.wait()
+                if not self._run:
+                    return
+                topic, msg = self.queue.pop(0)
+            if self.delay:
+                time.sleep(self.delay)
+            try:
+                self.handle(topic, msg)
+            except OSError:
+                return
+
+    def handle(self, topic, msg):
+        if topic == T_SAVE:
+            p = preset.unpack(msg)
+            if not p:
+                self.stats["bad"] += 1
+                self._pub(b"pongBot/save/successful", b"FALSE")
+                return
+            self.store(p)
+        elif topic in LEGACY:
+            try:
+                self.pending[LEGACY[topic]] = int(msg)
+            except ValueError:
+                self.stats["bad"] += 1
+                return
+            if topic != T_BOTTOM:
+                return
+            self.store(tuple(self.pending))
+        elif topic == T_IMPORT:
+            self.stats["imports"] += 1
+            p = self.preset
+            if not p:
+                self._pub(b"pongBot/importing/successful", b"F")
+                return
+            data = bytes(preset.pack(*p)) if msg == preset.REQ else preset.legacy(*p)
+            self._pub(b"pongBot/importing/data", data)
+            self._pub(b"pongBot/importing/successful", b"T")
+
+    def store(self, p):
+        self.preset = p
+        self.stats["saves"] += 1
+        if self.path:
+            with open(self.path, "w") as f:
+                json.dump({"servo_level": p[0], "motor_top": p[1], "motor_bottom": p[2]}, f)
+        self._pub(b"pongBot/save/successful", b"TRUE")
+
+    def _pub(self, topic, msg):
+        self.out.publish(topic, msg, qos=1)
+
+
+def main():
+    host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 1883
+    path = sys.argv[3] if len(sys.argv) > 3 else "presets.json"
+    delay = int(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0.0
+    r = Responder(host, port, path, delay).start()
+    print("responder 執行中", host, port, "目前設定", r.preset)
+    try:
+        while True:
+            time.sleep(5)
+            print(r.stats)
+    except KeyboardInterrupt:
+        r.close()
+
+
+if __name__ == "__main__":
+    main()
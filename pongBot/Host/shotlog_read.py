@@ -0,0 +1,114 @@
+"""
+讀取發球事件 log (shotlog.Log 寫在 flash 上的 shots0.bin ... ，格式見 shotlog.py)
+各檔案依第一筆序號排序後逐筆讀取，每次只讀 CHUNK bytes，不整份載入記憶體；檔尾不完整的紀錄略過
+預設印出摘要：事件數、依 上/下馬達/伺服等級 分組的發球數與觸發延遲；--csv 逐筆輸出
+--since 只看某時間 (裝置 time.time()，秒) 之後的事件；RTC 未校正 (UNSYNC) 的紀錄只有開機後秒數，無法比較而略過
+摘要另列出未校正的紀錄數；--csv 的 synced 欄為 0 時 time 為開機後秒數
+用法: python shotlog_read.py 目錄或檔案... [--prefix shots] [--csv] [--since 秒]
+"""
+
+import argparse
+import glob
+import os
+import struct
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+
+import shotlog
+from shotlog import FMT, REC
+
+CHUNK = 4096
+EVENTS = {shotlog.BOOT: "boot", shotlog.SHOT: "shot", shotlog.DRILL: "drill", shotlog.STOP: "stop"}
+
+
+def first(path):
+    with open(path, "rb") as f:
+        b = f.read(REC)
+    return struct.unpack(FMT, b)[0] if len(b) == REC else None
+
+
+def order(paths):
+    """有紀錄的檔案，依第一筆序號由舊到新"""
+    seqs = [(first(p), p) for p in paths]
+    return [p for s, p in sorted(x for x in seqs if x[0] is not None)]
+
+
+def read(path):
+    """逐筆產生 (序號, 時間, 事件, 上馬達, 下馬達, 伺服等級, 延遲 ms, 附註)"""
+    with open(path, "rb") as f:
+        rest = b""
+        while True:
+            b = f.read(CHUNK)
+            if not b:
+                break
+            b = rest + b
+            n = len(b) // REC * REC
+            yield from struct.iter_unpack(FMT, b[:n])
+            rest = b[n:]
+
+
+def events(paths, since=0):
+    for p in order(paths):
+        for r in read(p):
+            if not since or (not r[2] & shotlog.UNSYNC and r[1] >= since):
+                yield r
+
+
+def files(args, prefix):
+    out = []
+    for a in args:
+        if os.path.isdir(a):
+            out += glob.glob(os.path.join(a, prefix + "*.bin"))
+        else:
+            out.append(a)
+    return out
+
+
+def summary(recs):
+    """回傳 (各事件數, {(上, 下, 等級): [發球數, 延遲總和, 最大延遲]}, 序號缺口數, 時間未校正的紀錄數)"""
+    cnt = {}
+    by = {}
+    gaps = 0
+    uns = 0
+    last = None
+    for seq, t, ev, ma, mb, lv, lat, x in recs:
+        uns += bool(ev & shotlog.UNSYNC)
+        ev &= ~shotlog.UNSYNC
+        cnt[ev] = cnt.get(ev, 0) + 1
+        if last is not None and seq != last + 1:
+            gaps += 1
+        last = seq
+        if ev in (shotlog.SHOT, shotlog.DRILL):
+            g = by.setdefault((ma, mb, lv), [0, 0, 0])
+            g[0] += 1
+            g[1] += lat
+            g[2] = max(g[2], lat)
+    return cnt, by, gaps, uns
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--prefix", default="shots")
+    ap.add_argument("--csv", action="store_true")
+    ap.add_argument("--since", type=int, default=0)
+    a = ap.parse_args()
+    recs = events(files(a.paths, a.prefix), a.since)
+    if a.csv:
+        print("seq,time,event,motor_a,motor_b,servo_level,latency_ms,note,synced")
+        for r in recs:
+            ev = r[2] & ~shotlog.UNSYNC
+            print("%d,%d,%s,%d,%d,%d,%d,%d,%d" % (r[0], r[1], EVENTS.get(ev, ev), *r[3:], not r[2] & shotlog.UNSYNC))
+        return
+    cnt, by, gaps, uns = summary(recs)
+    print("  ".join("%s %d" % (EVENTS.get(k, k), v) for k, v in sorted(cnt.items())), " 序號缺口 %d" % gaps,
+          " 時間未校正 %d" % uns)
+    print("%-6s %-6s %-6s %8s %12s %12s" % ("上", "下", "等級", "發球", "平均延遲ms", "最大延遲ms"))
+    for (ma, mb, lv), (n, s, m) in sorted(by.items()):
+        print("%-6d %-6d %-6d %8d %12.1f %12d" % (ma, mb, lv, n, s / n, m))
+
+
+if __name__ == "__main__":
+    main()
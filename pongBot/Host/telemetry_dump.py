@@ -0,0 +1,101 @@
+"""
+主機端遙測解碼器 (pongBot/telemetry，格式見 telemetry.py)
+Decoder.feed(msg) 還原每份報告的完整欄位；遺失差分報告後會等下一個關鍵幀再輸出
+用法: python telemetry_dump.py [broker] [port]   以 CSV 印出收到的遙測
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+
+import telemetry
+from telemetry import KEY, N, VER
+
+NAMES = ("motor_a", "motor_b", "run", "servo_level", "shots", "loop_ms", "loop_max_ms", "heap_free", "uptime_s")
+SCALE = {telemetry.F_LOOP: 0.1, telemetry.F_LOOPMAX: 0.1}
+
+
+def unzigzag(z):
+    return (z >> 1) ^ -(z & 1)
+
+
+class Decoder:
+    def __init__(self):
+        self.v = [0] * N
+        self.seq = None
+        self.synced = False
+        self.lost = 0
+        self.reports = 0
+
+    def feed(self, msg):
+        """回傳欄位 dict；格式不符或尚未同步時回傳 None"""
+        if len(msg) < 6 or msg[0] != VER:
+            return None
+        key = msg[1] & KEY
+        seq = msg[2] << 8 | msg[3]
+        mask = msg[4] << 8 | msg[5]
+        if self.seq is not None and seq != (self.seq + 1) & 0xFFFF:
+            self.lost += (seq - self.seq - 1) & 0xFFFF
+            self.synced = False
+        self.seq = seq
+        vals = []
+        j = 6
+        for i in range(N):
+            if not mask & (1 << i):
+                continue
+            z = sh = 0
+            while True:
+                c = msg[j]
+                j += 1
+                z |= (c & 0x7F) << sh
+                sh += 7
+                if not c & 0x80:
+                    break
+            vals.append((i, unzigzag(z)))
+        if key:
+            self.v = [0] * N
+            for i, d in vals:
+                self.v[i] = d
+            self.synced = True
+        elif self.synced:
+            for i, d in vals:
+                self.v[i] += d
+        if not self.synced:
+            return None
+        self.reports += 1
+        return self.fields()
+
+    def fields(self):
+        return {NAMES[i]: self.v[i] * SCALE.get(i, 1) for i in range(N)}
+
+
+def main():
+    sys.path.insert(0, os.path.join(HERE, "..", "Sim"))
+    from umqtt.simple import MQTTClient
+
+    host = sys.argv[1] if len(sys.argv) > 1 else "broker.hivemq.com"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 1883
+    dec = Decoder()
+
+    def cb(topic, msg):
+        r = dec.feed(msg)
+        if r:
+            print(time.strftime("%H:%M:%S") + "," + ",".join("%g" % r[k] for k in NAMES))
+
+    c = MQTTClient("pongBot-telemetry-%d" % os.getpid(), host, port)
+    c.set_callback(cb)
+    c.connect()
+    c.subscribe(b"pongBot/telemetry")
+    print("time," + ",".join(NAMES))
+    try:
+        while True:
+            c.wait_msg()
+    except KeyboardInterrupt:
+        c.disconnect()
+
+
+if __name__ == "__main__":
+    main()
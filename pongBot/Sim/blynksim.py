@@ -0,0 +1,119 @@
+"""
+Blynk 連線模擬
+SimBlynk: 記憶體內連線，自己扮演 Blynk 伺服器回應登入與 ping
+TcpBlynk: 走真實 TCP 連到本機 Blynk 伺服器替身 (pongBot/Host/blynkd.py)
+"""
+
+import socket
+import struct
+import time
+
+import BlynkLib
+from BlynkLib import MSG_HW, MSG_LOGIN, MSG_HW_LOGIN, MSG_PING, MSG_RSP, STA_SUCCESS
+
+
+def frame(cmd, mid, *args):
+    data = ("\0".join(map(str, args))).encode("utf8")
+    return struct.pack("!BHH", cmd, mid, len(data)) + data
+
+
+class SimBlynk(BlynkLib.BlynkProtocol):
+    """
+    up=False 模擬網路中斷 (伺服器不再回應)
+    stall_ms>0 模擬 run() 卡在阻塞的 socket 呼叫
+    connect_ms 模擬 connect() 阻塞的 DNS + TCP 建線時間，rtt_ms 為伺服器回應 (登入/ping) 的往返延遲
+    """
+
+    def __init__(self, auth="sim", connect_ms=0, rtt_ms=0, **kwargs):
+        self.rx = bytearray()
+        self.tx = []
+        self.pend = []
+        self.up = True
+        self.stall_ms = 0
+        self.connect_ms = connect_ms
+        self.rtt_ms = rtt_ms
+        self.reads = 0
+        self._sid = 1
+        BlynkLib.BlynkProtocol.__init__(self, auth, **kwargs)
+
+    def connect(self):
+        if self.state == BlynkLib.DISCONNECTED and self.connect_ms:
+            time.sleep(self.connect_ms / 1000)
+        BlynkLib.BlynkProtocol.connect(self)
+
+    def _write(self, data):
+        self.tx.append(bytes(data))
+        if not self.up:
+            return
+        cmd, mid, dlen = struct.unpack("!BHH", data[:5])
+        if cmd in (MSG_LOGIN, MSG_HW_LOGIN, MSG_PING):
+            rsp = struct.pack("!BHH", MSG_RSP, mid, STA_SUCCESS)
+            if self.rtt_ms:
+                self.pend.append((BlynkLib.gettime() + self.rtt_ms, rsp))
+            else:
+                self.rx += rsp
+
+    def hw(self, pin, *vals):
+        """伺服器送出 vw 指令 (App 操作)"""
+        self._sid = self._sid % 0xFFFF + 1
+        self.rx += frame(MSG_HW, self._sid, "vw", pin, *vals)
+
+    def sent(self, pin=None):
+        """回傳送出的 vw 值 [(pin, args), ...]"""
+        out = []
+        for m in self.tx:
+            if m[0] != MSG_HW:
+                continue
+            a = m[5:].decode().split("\0")
+            if a[0] == "vw" and (pin is None or a[1] == str(pin)):
+                out.append((a[1], a[2:]))
+        return out
+
+    def run(self):
+        self.reads += 1
+        if self.stall_ms:
+            time.sleep(self.stall_ms / 1000)
+        data = b""
+        if self.up:
+            now = BlynkLib.gettime()
+            while self.pend and self.pend[0][0] <= now:
+                self.rx += self.pend.pop(0)[1]
+            data = bytes(self.rx)
+            self.rx = bytearray()
+        self.process(data)
+
+
+class SockIO:
+    """讓 CPython socket 具有 MicroPython 的 read()/write() 介面"""
+
+    def __init__(self, s):
+        self.s = s
+
+    def read(self, n):
+        try:
+            return self.s.recv(n)
+        except BlockingIOError:
+            return None
+
+    def write(self, data):
+        self.s.sendall(data)
+        return len(data)
+
+    def settimeout(self, t):
+        self.s.settimeout(t)
+
+    def fileno(self):
+        return self.s.fileno()
+
+    def close(self):
+        self.s.close()
+
+
+class TcpBlynk(BlynkLib.Blynk):
+    def connect(self):
+        s = socket.socket()
+        s.connect((self.server, self.port))
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.settimeout(BlynkLib.SOCK_TIMEOUT)
+        self.conn = SockIO(s)
+        BlynkLib.BlynkProtocol.connect(self)
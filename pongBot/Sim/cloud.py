@@ -0,0 +1,70 @@
+"""
+記憶體內的 Blynk 雲端：多台 SimBlynk 以 auth 區分，模擬 bridge 轉送與 App 指令
+每台裝置到雲端有自己的單程延遲 lat_ms 加上指數分布抖動 jit_ms (平均)；
+登入/ping 回應經 2 段延遲，bridge 訊息經 送出端上行 + 目標下行，App 指令經目標下行
+同一台裝置收到的訊息維持送達順序 (TCP)
+"""
+
+import random
+import struct
+
+import BlynkLib
+from BlynkLib import MSG_BRIDGE, MSG_HW, MSG_HW_LOGIN, MSG_LOGIN, MSG_PING, MSG_RSP, STA_SUCCESS
+from blynksim import SimBlynk, frame
+
+
+class Cloud:
+    def __init__(self, seed=1):
+        self.devs = {}
+        self.rnd = random.Random(seed)
+        self.bridged = 0
+
+    def device(self, auth, lat_ms=20, jit_ms=0, **kwargs):
+        d = CloudBlynk(self, auth, lat_ms, jit_ms, **kwargs)
+        self.devs[auth] = d
+        return d
+
+    def delay(self, d):
+        return d.lat_ms + (self.rnd.expovariate(1 / d.jit_ms) if d.jit_ms else 0)
+
+    def app(self, pin, *vals, devs=None):
+        """App 對裝置 (預設全部) 送出 vw"""
+        now = BlynkLib.gettime()
+        for d in devs or list(self.devs.values()):
+            d._sid = d._sid % 0xFFFF + 1
+            d.push(now + self.delay(d), frame(MSG_HW, d._sid, "vw", pin, *vals))
+
+
+class CloudBlynk(SimBlynk):
+    def __init__(self, cloud, auth, lat_ms, jit_ms, **kwargs):
+        self.cloud = cloud
+        self.lat_ms = lat_ms
+        self.jit_ms = jit_ms
+        self.binds = {}
+        self.t_last = 0
+        SimBlynk.__init__(self, auth, **kwargs)
+
+    def push(self, t, data):
+        t = max(t, self.t_last)
+        self.t_last = t
+        self.pend.append((t, data))
+
+    def _write(self, data):
+        self.tx.append(bytes(data))
+        if not self.up:
+            return
+        c = self.cloud
+        now = BlynkLib.gettime()
+        cmd, mid, dlen = struct.unpack("!BHH", data[:5])
+        if cmd in (MSG_LOGIN, MSG_HW_LOGIN, MSG_PING):
+            self.push(now + c.delay(self) + c.delay(self), struct.pack("!BHH", MSG_RSP, mid, STA_SUCCESS))
+        elif cmd == MSG_BRIDGE:
+            a = data[5:5 + dlen].decode().split("\0")
+            if a[1] == "i":
+                self.binds[a[0]] = a[2]
+            elif a[1] == "vw":
+                d = c.devs.get(self.binds.get(a[0]))
+                if d and d.up:
+                    d._sid = d._sid % 0xFFFF + 1
+                    c.bridged += 1
+                    d.push(now + c.delay(self) + c.delay(d), frame(MSG_HW, d._sid, *a[1:]))
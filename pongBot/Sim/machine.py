@@ -0,0 +1,191 @@
+"""
+模擬 ESP8266 machine 模組 (Pin / PWM / ADC / Timer / WDT)
+所有輸出寫入都記錄在 levels / duties，並可透過 on_write 掛鉤觀察；ADC 讀值取自 adcs (由模型寫入)
+"""
+
+import threading
+import time
+
+levels = {}     # Pin 編號 -> 0/1
+irqs = {}       # Pin 編號 -> (handler, Pin)
+duties = {}     # Pin 編號 -> PWM duty
+adcs = {}       # ADC 通道 -> 0..1023
+stats = {"writes": 0, "pins": 0, "pwms": 0, "resets": 0}
+on_write = None  # on_write(pin, kind, value)
+
+
+def _ms():
+    return int(time.monotonic() * 1000)
+
+
+def _note(pin, kind, value):
+    stats["writes"] += 1
+    if on_write:
+        on_write(pin, kind, value)
+
+
+def reset_state():
+    """清除所有腳位狀態與統計"""
+    levels.clear()
+    duties.clear()
+    adcs.clear()
+    irqs.clear()
+    for k in stats:
+        stats[k] = 0
+
+
+def reset():
+    """模擬重新開機：所有輸出回到 0"""
+    stats["resets"] += 1
+    for p in list(levels):
+        levels[p] = 0
+        _note(p, "v", 0)
+    for p in list(duties):
+        duties[p] = 0
+        _note(p, "duty", 0)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._irq = None
+        stats["pins"] += 1
+        levels.setdefault(id, 0)
+        if value is not None:
+            self.value(value)
+
+    def value(self, v=None):
+        if v is None:
+            return levels.get(self.id, 0)
+        levels[self.id] = 1 if v else 0
+        _note(self.id, "v", levels[self.id])
+
+    __call__ = value
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def irq(self, handler=None, trigger=IRQ_RISING):
+        self._irq = handler
+        irqs[self.id] = (handler, self)
+        return self
+
+
+def pulse(id):
+    """在腳位 id 上產生一個上升緣，呼叫已註冊的中斷處理函式"""
+    h = irqs.get(id)
+    if h and h[0]:
+        h[0](h[1])
+
+
+class PWM:
+    def __init__(self, pin, freq=None, duty=None):
+        self.pin = pin
+        self.id = pin.id
+        self._freq = freq or 1000
+        stats["pwms"] += 1
+        duties.setdefault(self.id, 0)
+        if duty is not None:
+            self.duty(duty)
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        self._freq = f
+
+    def duty(self, d=None):
+        if d is None:
+            return duties.get(self.id, 0)
+        duties[self.id] = int(d)
+        _note(self.id, "duty", int(d))
+
+    def deinit(self):
+        duties[self.id] = 0
+
+
+class ADC:
+    def __init__(self, id=0):
+        self.id = id
+
+    def read(self):
+        return adcs.get(self.id, 0)
+
+    def read_u16(self):
+        return self.read() * 64
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1):
+        self.id = id
+        self._stop = None
+
+    def init(self, period=1000, mode=PERIODIC, callback=None):
+        self.deinit()
+        stop = self._stop = threading.Event()
+
+        def loop():
+            while not stop.wait(period / 1000):
+                callback(self)
+                if mode == Timer.ONE_SHOT:
+                    break
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def deinit(self):
+        if self._stop:
+            self._stop.set()
+            self._stop = None
+
+
+class WDT:
+    """逾時未 feed() 便呼叫 reset()；expired 記錄觸發時間 (ms)"""
+
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+        self.expired = None
+        self._fed = _ms()
+        self._stop = threading.Event()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        while not self._stop.wait(0.005):
+            if _ms() - self._fed > self.timeout:
+                self.expired = _ms()
+                reset()
+                self._fed = _ms()
+
+    def feed(self):
+        self._fed = _ms()
+
+    def deinit(self):
+        self._stop.set()
+
+
+def freq(f=None):
+    return 80000000
+
+
+def idle():
+    time.sleep(0.0005)
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
@@ -0,0 +1,15 @@
+"""
+模擬 micropython 模組
+"""
+
+
+def const(x):
+    return x
+
+
+def schedule(f, arg):
+    f(arg)
+
+
+def alloc_emergency_exception_buf(n):
+    pass
@@ -0,0 +1,82 @@
+"""
+模擬 DC 馬達 + 發球輪 + tach 感測器
+  - 施加電壓 = duty / 1023 * 電池電壓 (電池電壓可改，模擬電量下降)
+  - 轉速一階追隨 KV * (電壓 - v0) * (1 - load)，load 模擬輪子磨損/摩擦，v0 為克服靜摩擦的起轉電壓
+  - 每轉 ppr 個脈衝，在精確的虛擬時間點觸發 tach 腳位中斷 (需 sim.virtual())
+  - shot() 模擬球進入輪子時的轉速下降
+Servo: 連續旋轉伺服 + 回授電位器 (ADC)
+  - 脈寬 = duty / 51.2 ms，1.5 ms 停止；偏移在 dead 內不轉，之後轉速依 ((偏移-dead)/(span-dead))^curve 增加到 max_rps
+  - ADC 讀值 = 角度 / 360 * 1024 (每圈回繞)
+"""
+
+import machine
+import sim
+
+
+class Motor:
+    def __init__(self, pwm_pin, tach_pin, kv=1620, tau=0.12, ppr=2, v_bat=3.7, load=0.0, v0=0.0):
+        self.pwm_pin = pwm_pin
+        self.tach_pin = tach_pin
+        self.kv = kv
+        self.tau = tau
+        self.ppr = ppr
+        self.v_bat = v_bat
+        self.load = load
+        self.v0 = v0
+        self.rpm = 0.0
+        self.phase = 0.0
+        self.pulses = 0
+
+    def target(self):
+        v = machine.duties.get(self.pwm_pin, 0) / 1023 * self.v_bat
+        return self.kv * max(0.0, v - self.v0) * (1 - self.load)
+
+    def step(self, us, t0=None):
+        """推進 t0 (預設目前虛擬時間) 起的 us 微秒，途中產生 tach 脈衝，結束時虛擬時間為 t0 + us
+        多顆馬達模擬同一段時間時傳入相同的 t0"""
+        if t0 is None:
+            t0 = sim.ticks_us()
+        dt = us / 1e6
+        self.rpm += (self.target() - self.rpm) * min(1.0, dt / self.tau)
+        rate = self.rpm / 60 * self.ppr  # 每秒脈衝數
+        self.phase += rate * dt
+        if self.phase >= 1 and rate > 0:
+            n = int(self.phase)
+            self.phase -= n
+            # 剩下的相位即最後一個脈衝之後經過的時間，往回推出每個脈衝的時間點
+            for k in range(n):
+                at = t0 + us - int((self.phase + n - 1 - k) / rate * 1e6)
+                sim.set_us(max(t0, at))
+                machine.pulse(self.tach_pin)
+                self.pulses += 1
+        sim.set_us(t0 + us)
+
+    def shot(self, drop=0.25):
+        self.rpm *= 1 - drop
+
+
+class Servo:
+    def __init__(self, pwm_pin, adc=0, max_rps=1.2, dead=0.06, span=0.5, curve=0.6, tau=0.05):
+        self.pwm_pin = pwm_pin
+        self.adc = adc
+        self.max_rps = max_rps
+        self.dead = dead
+        self.span = span
+        self.curve = curve
+        self.tau = tau
+        self.rps = 0.0
+        self.angle = 0.0
+
+    def target(self):
+        off = 1.5 - machine.duties.get(self.pwm_pin, 0) / 51.2
+        x = (abs(off) - self.dead) / (self.span - self.dead)
+        if not machine.duties.get(self.pwm_pin, 0) or x <= 0:
+            return 0.0
+        r = self.max_rps * min(1.0, x) ** self.curve
+        return r if off > 0 else -r
+
+    def step(self, us):
+        dt = us / 1e6
+        self.rps += (self.target() - self.rps) * min(1.0, dt / self.tau)
+        self.angle = (self.angle + self.rps * 360 * dt) % 360
+        machine.adcs[self.adc] = int(self.angle / 360 * 1024) & 1023
@@ -0,0 +1,104 @@
+"""
+模擬 ESP8266 network 模組 (STA 介面)
+aps 描述可見的基地台
+connect() 未指定 bssid 時晶片先自行掃描 (scan_ms)，再花 assoc_ms 完成認證、關聯與 DHCP；
+指定 bssid 則略過掃描；找不到 SSID 時 scan_ms 後回報 STAT_NO_AP_FOUND
+scan() 阻塞 scan_ms；時間取自 time.ticks_ms，可配合 sim.virtual() 使用
+down = (t0, t1) 期間 (ms) 所有基地台消失，模擬 AP 重開機/停電
+"""
+
+import time
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = 2
+STAT_NO_AP_FOUND = 3
+STAT_CONNECT_FAIL = 4
+STAT_GOT_IP = 5
+
+aps = [{"ssid": "shepherd", "password": "Good@11255", "bssid": b"\x02\0\0\0\0\x01", "channel": 6, "rssi": -60}]
+scan_ms = 1200
+assoc_ms = 700
+down = None
+
+
+def _ms():
+    if hasattr(time, "ticks_ms"):
+        return time.ticks_ms()
+    return int(time.monotonic() * 1000)
+
+
+def _aps():
+    if down and down[0] <= _ms() < down[1]:
+        return []
+    return aps
+
+
+class WLAN:
+    _sta = None
+
+    def __new__(cls, iface=STA_IF):
+        if cls._sta is None:
+            cls._sta = object.__new__(cls)
+            cls._sta._init()
+        return cls._sta
+
+    def _init(self):
+        self._active = False
+        self._status = STAT_IDLE
+        self._ap = None
+        self._t_up = None
+        self._fail = None
+
+    def active(self, a=None):
+        if a is None:
+            return self._active
+        self._active = bool(a)
+        if not a:
+            self.disconnect()
+
+    def connect(self, ssid=None, password=None, bssid=None):
+        self._ap = None
+        self._status = STAT_CONNECTING
+        self._fail = None
+        self._t_up = _ms() + (assoc_ms if bssid else scan_ms + assoc_ms)
+        for ap in _aps():
+            if ap["ssid"] == ssid and (bssid is None or ap["bssid"] == bssid):
+                if ap["password"] != password:
+                    self._fail = STAT_WRONG_PASSWORD
+                self._ap = ap
+                return
+        self._fail = STAT_NO_AP_FOUND
+        self._t_up = _ms() + scan_ms
+
+    def disconnect(self):
+        self._ap = None
+        self._t_up = None
+        self._status = STAT_IDLE
+
+    def status(self, param=None):
+        if param == "rssi":
+            return self._ap["rssi"] if self._ap else 0
+        if self._status == STAT_CONNECTING and _ms() >= self._t_up:
+            self._status = self._fail or (STAT_GOT_IP if self._ap in _aps() else STAT_NO_AP_FOUND)
+        elif self._status == STAT_GOT_IP and self._ap not in _aps():
+            self._status = STAT_CONNECT_FAIL
+        return self._status
+
+    def isconnected(self):
+        return self.status() == STAT_GOT_IP
+
+    def scan(self):
+        time.sleep(scan_ms / 1000)
+        return [(ap["ssid"].encode(), ap["bssid"], ap["channel"], ap["rssi"], 3, 0) for ap in _aps()]
+
+    def ifconfig(self, *a):
+        return ("192.168.4.2", "255.255.255.0", "192.168.4.1", "8.8.8.8")
+
+    def config(self, *a, **kw):
+        if a and a[0] == "mac":
+            return b"\x5c\xcf\x7f\0\0\x01"
+        return None
@@ -0,0 +1,18 @@
+"""
+模擬 MicroPython ntptime 模組
+主機時鐘本來就是正確的，settime() 只模擬 UDP 往返 (rtt_ms，虛擬時間下只推進時鐘)；fail=True 模擬逾時
+"""
+
+import time
+
+host = "pool.ntp.org"
+timeout = 1
+rtt_ms = 40
+fail = False
+
+
+def settime():
+    if fail:
+        time.sleep(timeout)
+        raise OSError(110)
+    time.sleep(rtt_ms / 1000)
@@ -0,0 +1,114 @@
+"""
+模擬發球機：在主機上組裝 mainLike_optimized 的硬體與連線
+"""
+
+import os
+import sys
+import tempfile
+import time
+import types
+
+import sim
+
+sim.install()
+
+import machine
+import hwout
+import mainLike_optimized as app
+from blynksim import SimBlynk
+
+sys.path.insert(0, os.path.join(sim.HERE, "..", "Host"))
+
+fs = None
+# 模擬用的轉速計腳位 (實機預設未接，見 mainLike_optimized 的 TACH_A)
+TACH = (10, 9)
+
+
+def flash():
+    """以新的暫存目錄模擬 flash 檔案系統 (outbox.bin, presets.db ...)"""
+    global fs
+    fs = tempfile.mkdtemp(prefix="pongbot-")
+    os.chdir(fs)
+    return fs
+
+
+def load(name):
+    """另載入一份 mainLike_optimized (獨立的全域變數)，模擬同一環境中的多台發球機"""
+    m = types.ModuleType(name)
+    m.__file__ = app.__file__
+    with open(app.__file__) as f:
+        exec(compile(f.read(), app.__file__, "exec"), m.__dict__)
+    return m
+
+
+def boot(link_ms=app.LINK_T, period=100, wdt_ms=0, heartbeat=app.HB, blynk=None, m=None):
+    """以 app 的 b_hw/b_db/b_blynk 重建硬體、資料庫、Blynk 與急停 (與裝置開機相同)，回傳 app 模組；
+    blynk 可傳入已建立的連線，m 可傳入 load() 的另一台"""
+    a = m or app
+    if fs is None:
+        flash()
+    machine.reset_state()
+    a.halt()
+    a.hw = hwout.HwOut()
+    a.mqtt = None
+    a.rx = None
+    a.tl = None
+    a.wl = None
+    a.cz = None
+    a.pc = None
+    a.mm = None
+    a.grp = None
+    a.pf = None
+    a.ts = None
+    a.st_t = 0
+    a.st_p = False
+    a.b_hw()
+    a.b_db()
+    a.b_blynk(blynk or SimBlynk(heartbeat=heartbeat))
+    a.es.link_ms, a.es.period, a.es.wdt_ms = link_ms, period, wdt_ms
+    a.es.start()
+    tick(a)
+    return a
+
+
+def direct(m=None):
+    """拆掉滑桿合併 (co)，V3/V4 收到即呼叫處理函式；供不經主迴圈直接呼叫 blynk.run/process 的量測"""
+    a = m or app
+    if a.co:
+        a.blynk.emit = a.co.emit
+        a.co = None
+    return a
+
+
+def mqtt(broker):
+    """把 app 的 MQTT 連到本機 broker 替身"""
+    app.MQTT_BROKER = broker.host
+    app.MQTT_PORT = broker.port
+    app.conn_mqtt()
+    return app.mqtt
+
+
+def tick(m=None):
+    """主迴圈的一圈：直接執行 app.step()，不等待 (由呼叫端推進時鐘)；m 為 load() 的另一台"""
+    (m or app).step(0)
+
+
+def loop(ms, dt=0.01, until=None):
+    """執行主迴圈 ms 毫秒，或直到 until() 為真"""
+    end = time.monotonic() + ms / 1000
+    while time.monotonic() < end:
+        tick()
+        if until and until():
+            return True
+        time.sleep(dt)
+    return False
+
+
+def shutdown():
+    if app.mqtt:
+        app.mqtt.close()
+        app.mqtt = None
+    if app.es:
+        app.es.stop()
+        if app.es._wdt:
+            app.es._wdt.deinit()
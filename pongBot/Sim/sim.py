@@ -0,0 +1,153 @@
+"""
+PongBot 主機端模擬環境
+讓 MicroPython 程式 (mainLike_optimized.py 等) 在 Linux 的 CPython 上執行
+用法: import sim; sim.install()
+"""
+
+import builtins
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, "..", ".."))
+
+_t0 = time.monotonic()
+_vt = None  # 虛擬時間 (us)；None 表示跟隨真實時間
+_heap = None  # heap() 啟用的 MicroPython heap 模型
+
+
+def ticks_ms():
+    if _heap:
+        _heap.update()
+    if _vt is not None:
+        return _vt // 1000
+    return int((time.monotonic() - _t0) * 1000)
+
+
+def ticks_us():
+    if _heap:
+        _heap.update()
+    if _vt is not None:
+        return _vt
+    return int((time.monotonic() - _t0) * 1000000)
+
+
+_sleep = time.sleep
+
+
+def _vsleep(s):
+    advance(int(s * 1000000))
+
+
+def virtual(us=0):
+    """改用虛擬時間 (us=None 回到真實時間)，之後由 advance()/set_us() 推進
+    虛擬時間下 time.sleep/sleep_ms/sleep_us 只推進時鐘，不真的等待"""
+    global _vt
+    _vt = us
+    time.sleep = _sleep if us is None else _vsleep
+
+
+def set_us(us):
+    global _vt
+    _vt = us
+
+
+def advance(us):
+    global _vt
+    _vt += us
+    return _vt
+
+
+def install():
+    """把模擬模組 (machine, network, umqtt...) 與專案根目錄放進 sys.path"""
+    for p in (ROOT, HERE):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+    import gc
+    if not hasattr(gc, "mem_free"):
+        # ESP8266 開機後約 36 KB 可用 heap
+        gc.mem_free = lambda: 36000
+        gc.mem_alloc = lambda: 4000
+    builtins.const = lambda x: x
+
+
+class Heap:
+    """以 tracemalloc 模擬 MicroPython 的 heap：物件要到回收才釋放
+    已配置 = 上次回收時存活的量 + 之後每次檢查間的 tracemalloc 峰值增量
+    (CPython 以引用計數立即釋放，同一段內反覆配置/釋放只算到峰值，所以是下限；物件大小也與 MicroPython 不同)
+    每次讀時鐘 (ticks_ms/ticks_us) 檢查一次，超過 size 即自動回收 (計入 auto，on_auto() 可記錄當下狀態)
+    回收在虛擬時間下推進 us_per_kb x size 微秒 (ESP8266 標記+清除整個 heap)"""
+
+    def __init__(self, size, us_per_kb=120, on_auto=None):
+        self.size = size
+        self.us_per_kb = us_per_kb
+        self.on_auto = on_auto
+        self.collects = 0
+        self.auto = 0
+        tracemalloc.start()
+        self.base = self.last = tracemalloc.get_traced_memory()[0]
+        self.used = 0
+        self.noise = 1 << 30
+
+    def update(self):
+        cur, pk = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        d = pk - self.last
+        if d < self.noise:
+            self.noise = d  # 檢查本身 (tracemalloc 回傳的 tuple/int) 的配置：取最小增量，每次扣除
+        self.used += d - self.noise
+        self.last = cur
+        if self.used > self.size:
+            self.auto += 1
+            self.collect()
+            if self.on_auto:
+                self.on_auto()
+
+    def collect(self):
+        self.collects += 1
+        self.last = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.used = max(0, self.last - self.base)
+        if _vt is not None:
+            advance(self.us_per_kb * self.size // 1024)
+
+    def alloc(self):
+        self.update()
+        return self.used
+
+    def free(self):
+        self.update()
+        return max(0, self.size - self.used)
+
+
+_gc = {}
+
+
+def heap(size=36000, **kwargs):
+    """以 Heap 模型取代 gc.mem_alloc/mem_free/collect (size=None 還原)，回傳模型"""
+    global _heap
+    import gc
+    if not _gc:
+        _gc.update(mem_alloc=gc.mem_alloc, mem_free=gc.mem_free, collect=gc.collect)
+    if size is None:
+        if _heap:
+            tracemalloc.stop()
+        _heap = None
+        for k, v in _gc.items():
+            setattr(gc, k, v)
+        return None
+    if _heap:
+        tracemalloc.stop()
+    _heap = Heap(size, **kwargs)
+    gc.mem_alloc = _heap.alloc
+    gc.mem_free = _heap.free
+    gc.collect = _heap.collect
+    return _heap
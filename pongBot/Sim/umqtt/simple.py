@@ -0,0 +1,226 @@
+"""
+主機端 umqtt.simple 相容實作 (MQTT 3.1.1, QoS 0/1)
+介面與 micropython-lib 的 umqtt.simple 相同，走真實 TCP socket
+connect_ms 模擬 connect() 額外阻塞的 DNS + TCP + CONNACK 往返時間 (可配合 sim.virtual())
+"""
+
+import socket
+import struct
+import time
+
+connect_ms = 0
+
+
+class MQTTException(Exception):
+    pass
+
+
+class MQTTClient:
+    def __init__(self, client_id, server, port=0, user=None, password=None,
+                 keepalive=0, ssl=False, ssl_params={}):
+        if port == 0:
+            port = 8883 if ssl else 1883
+        self.client_id = client_id
+        self.sock = None
+        self.server = server
+        self.port = port
+        self.ssl = ssl
+        self.ssl_params = ssl_params
+        self.pid = 0
+        self.cb = None
+        self.user = user
+        self.pswd = password
+        self.keepalive = keepalive
+        self.lw_topic = None
+        self.lw_msg = None
+        self.lw_qos = 0
+        self.lw_retain = False
+
+    def _read(self, n):
+        buf = b""
+        while len(buf) < n:
+            try:
+                d = self.sock.recv(n - len(buf))
+            except BlockingIOError:
+                if not buf:
+                    return None
+                self.sock.setblocking(True)
+                continue
+            if not d:
+                raise OSError(-1)
+            buf += d
+        return buf
+
+    def _send_str(self, s):
+        self.sock.sendall(struct.pack("!H", len(s)) + s)
+
+    def _recv_len(self):
+        n = 0
+        sh = 0
+        while 1:
+            b = self._read(1)[0]
+            n |= (b & 0x7F) << sh
+            if not b & 0x80:
+                return n
+            sh += 7
+
+    def set_callback(self, f):
+        self.cb = f
+
+    def set_last_will(self, topic, msg, retain=False, qos=0):
+        assert 0 <= qos <= 2
+        assert topic
+        self.lw_topic = topic
+        self.lw_msg = msg
+        self.lw_qos = qos
+        self.lw_retain = retain
+
+    def connect(self, clean_session=True):
+        if connect_ms:
+            time.sleep(connect_ms / 1000)
+        self.sock = socket.socket()
+        self.sock.settimeout(5)
+        addr = socket.getaddrinfo(self.server, self.port)[0][-1]
+        self.sock.connect(addr)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(True)
+        premsg = bytearray(b"\x10\0\0\0\0\0")
+        msg = bytearray(b"\x04MQTT\x04\x02\0\0")
+
+        sz = 10 + 2 + len(self.client_id)
+        msg[6] = clean_session << 1
+        if self.user:
+            sz += 2 + len(self.user) + 2 + len(self.pswd)
+            msg[6] |= 0xC0
+        if self.keepalive:
+            assert self.keepalive < 65536
+            msg[7] |= self.keepalive >> 8
+            msg[8] |= self.keepalive & 0x00FF
+        if self.lw_topic:
+            sz += 2 + len(self.lw_topic) + 2 + len(self.lw_msg)
+            msg[6] |= 0x4 | (self.lw_qos & 0x1) << 3 | (self.lw_qos & 0x2) << 3
+            msg[6] |= self.lw_retain << 5
+
+        i = 1
+        while sz > 0x7F:
+            premsg[i] = (sz & 0x7F) | 0x80
+            sz >>= 7
+            i += 1
+        premsg[i] = sz
+
+        self.sock.sendall(bytes(premsg[:i + 2]) + bytes(msg))
+        self._send_str(_b(self.client_id))
+        if self.lw_topic:
+            self._send_str(_b(self.lw_topic))
+            self._send_str(_b(self.lw_msg))
+        if self.user:
+            self._send_str(_b(self.user))
+            self._send_str(_b(self.pswd))
+        resp = self._read(4)
+        assert resp[0] == 0x20 and resp[1] == 0x02
+        if resp[3] != 0:
+            raise MQTTException(resp[3])
+        return resp[2] & 1
+
+    def disconnect(self):
+        try:
+            self.sock.sendall(b"\xe0\0")
+        finally:
+            self.sock.close()
+
+    def ping(self):
+        self.sock.sendall(b"\xc0\0")
+
+    def publish(self, topic, msg, retain=False, qos=0):
+        topic = _b(topic)
+        msg = _b(msg)
+        pkt = bytearray(b"\x30\0\0\0")
+        pkt[0] |= qos << 1 | retain
+        sz = 2 + len(topic) + len(msg)
+        if qos > 0:
+            sz += 2
+        assert sz < 2097152
+        i = 1
+        while sz > 0x7F:
+            pkt[i] = (sz & 0x7F) | 0x80
+            sz >>= 7
+            i += 1
+        pkt[i] = sz
+        self.sock.sendall(bytes(pkt[:i + 1]))
+        self._send_str(topic)
+        if qos > 0:
+            self.pid += 1
+            pid = self.pid
+            self.sock.sendall(struct.pack("!H", pid))
+        self.sock.sendall(msg)
+        if qos == 1:
+            while 1:
+                op = self.wait_msg()
+                if op == 0x40:
+                    sz = self._read(1)
+                    assert sz == b"\x02"
+                    rcv_pid = self._read(2)
+                    rcv_pid = rcv_pid[0] << 8 | rcv_pid[1]
+                    if pid == rcv_pid:
+                        return
+        elif qos == 2:
+            assert 0
+
+    def subscribe(self, topic, qos=0):
+        assert self.cb is not None, "Subscribe callback is not set"
+        topic = _b(topic)
+        pkt = bytearray(b"\x82\0\0\0")
+        self.pid += 1
+        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic) + 1, self.pid)
+        self.sock.sendall(bytes(pkt))
+        self._send_str(topic)
+        self.sock.sendall(qos.to_bytes(1, "little"))
+        while 1:
+            op = self.wait_msg()
+            if op == 0x90:
+                resp = self._read(4)
+                assert resp[1] == pkt[2] and resp[2] == pkt[3]
+                if resp[3] == 0x80:
+                    raise MQTTException(resp[3])
+                return
+
+    def wait_msg(self):
+        res = self._read(1)
+        self.sock.setblocking(True)
+        if res is None:
+            return None
+        if res == b"":
+            raise OSError(-1)
+        if res == b"\xd0":  # PINGRESP
+            sz = self._read(1)[0]
+            assert sz == 0
+            return None
+        op = res[0]
+        if op & 0xF0 != 0x30:
+            return op
+        sz = self._recv_len()
+        topic_len = self._read(2)
+        topic_len = (topic_len[0] << 8) | topic_len[1]
+        topic = self._read(topic_len)
+        sz -= topic_len + 2
+        if op & 6:
+            pid = self._read(2)
+            pid = pid[0] << 8 | pid[1]
+            sz -= 2
+        msg = self._read(sz) if sz else b""
+        self.cb(topic, msg)
+        if op & 6 == 2:
+            pkt = bytearray(b"\x40\x02\0\0")
+            struct.pack_into("!H", pkt, 2, pid)
+            self.sock.sendall(bytes(pkt))
+        elif op & 6 == 4:
+            assert 0
+        return op
+
+    def check_msg(self):
+        self.sock.setblocking(False)
+        return self.wait_msg()
+
+
+def _b(s):
+    return s.encode() if isinstance(s, str) else bytes(s)
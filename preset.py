@@ -0,0 +1,82 @@
+# 發球設定 (preset) 的精簡二進位格式
+# 版本 1，共 6 bytes: ver, servo_level(1-5), motor_top(1-100), motor_bottom(1-100), fletcher16
+# 匯入時仍接受舊的 JSON 風格文字 {"servo_level":3,"motor_top":50,"motor_bottom":40}
+# 解析結果一律為 (servo_level, motor_top, motor_bottom)，缺少或超出範圍的欄位為 0
+
+import struct
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+VER = const(1)
+SIZE = const(6)
+FMT = "!BBBBH"
+REQ = b"P\x01"  # 匯入請求：要求回傳版本 1 二進位格式
+
+K_LEVEL = b"servo_level"
+K_TOP = b"motor_top"
+K_BOTTOM = b"motor_bottom"
+
+
+def fletcher16(b, n):
+    s1 = s2 = 0
+    for i in range(n):
+        s1 = (s1 + b[i]) % 255
+        s2 = (s2 + s1) % 255
+    return (s2 << 8) | s1
+
+
+def _check(l, t, b):
+    return (l if 1 <= l <= 5 else 0, t if 1 <= t <= 100 else 0, b if 1 <= b <= 100 else 0)
+
+
+def pack(l, t, b):
+    buf = bytearray(SIZE)
+    struct.pack_into(FMT, buf, 0, VER, l, t, b, 0)
+    struct.pack_into("!H", buf, 4, fletcher16(buf, 4))
+    return buf
+
+
+def unpack(msg):
+    if len(msg) != SIZE or msg[0] != VER:
+        return None
+    v, l, t, b, ck = struct.unpack(FMT, msg)
+    if ck != fletcher16(msg, 4):
+        return None
+    return _check(l, t, b)
+
+
+def _num(msg, key):
+    i = msg.find(key)
+    if i < 0:
+        return 0
+    i = msg.find(b":", i + len(key))
+    if i < 0:
+        return 0
+    n = 0
+    seen = False
+    for j in range(i + 1, min(len(msg), i + 8)):
+        c = msg[j]
+        if 48 <= c <= 57:
+            n = n * 10 + c - 48
+            seen = True
+        elif seen or c not in b' "':
+            break
+    return n
+
+
+def parse_legacy(msg):
+    return _check(_num(msg, K_LEVEL), _num(msg, K_TOP), _num(msg, K_BOTTOM))
+
+
+def parse(msg):
+    """二進位或舊格式；校驗失敗回傳 None"""
+    if msg and msg[0] == VER:
+        return unpack(msg)
+    return parse_legacy(msg)
+
+
+def legacy(l, t, b):
+    return ('{"servo_level":%d,"motor_top":%d,"motor_bottom":%d}' % (l, t, b)).encode()
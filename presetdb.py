@@ -0,0 +1,93 @@
+# 裝置端發球設定快取
+# flash 檔案內 slots 筆固定大小紀錄: key(u16) stamp(u32) preset(6 bytes, preset.pack 格式)
+# key 0 表示空位；RAM 只保留 key/stamp 索引，滿了以最久未使用 (LRU) 的位置替換
+
+import struct
+
+import preset
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+FMT = "!HI"
+REC = const(12)
+
+
+def key(l, t, b):
+    """依內容產生 key (1..50000)，同一組設定永遠對應同一筆"""
+    return (l - 1) * 10000 + (t - 1) * 100 + b if l and t and b else 0
+
+
+class PresetDB:
+    def __init__(self, path="presets.db", slots=8):
+        self.path = path
+        self.slots = slots
+        self.keys = [0] * slots
+        self.stamps = [0] * slots
+        self.clock = 0
+        self.buf = bytearray(REC)
+        try:
+            with open(path, "rb") as f:
+                for i in range(slots):
+                    if f.readinto(self.buf) != REC:
+                        break
+                    k, s = struct.unpack_from(FMT, self.buf)
+                    if k and preset.unpack(self.buf[6:]):
+                        self.keys[i] = k
+                        self.stamps[i] = s
+        except OSError:
+            with open(path, "wb") as f:
+                f.write(bytes(slots * REC))
+        self.clock = max(self.stamps)
+
+    def _find(self, k):
+        for i in range(self.slots):
+            if self.keys[i] == k:
+                return i
+        return -1
+
+    def _write(self, i, f, n):
+        f.seek(i * REC)
+        f.write(self.buf[:n])
+
+    def put(self, l, t, b, k=None):
+        """存入 (或更新) 一組設定，回傳 slot"""
+        k = k or key(l, t, b)
+        if not k:
+            return -1
+        i = self._find(k)
+        if i < 0:
+            i = self._find(0)
+        if i < 0:
+            i = self.stamps.index(min(self.stamps))
+        self.clock += 1
+        self.keys[i] = k
+        self.stamps[i] = self.clock
+        struct.pack_into(FMT, self.buf, 0, k, self.clock)
+        self.buf[6:] = preset.pack(l, t, b)
+        with open(self.path, "r+b") as f:
+            self._write(i, f, REC)
+        return i
+
+    def get(self, k=None):
+        """k=None 取最近使用的一筆；命中時更新 LRU 時間"""
+        if k is None:
+            s = max(self.stamps)
+            if not s:
+                return None
+            i = self.stamps.index(s)
+        else:
+            i = self._find(k)
+            if i < 0:
+                return None
+        with open(self.path, "r+b") as f:
+            f.seek(i * REC)
+            f.readinto(self.buf)
+            if k is not None and self.stamps[i] != self.clock:
+                self.clock += 1
+                self.stamps[i] = self.clock
+                struct.pack_into(FMT, self.buf, 0, self.keys[i], self.clock)
+                self._write(i, f, 6)
+        return preset.unpack(self.buf[6:])
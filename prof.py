@@ -0,0 +1,91 @@
+# 處理函式計時，可在執行中開關
+# Prof(n) - 固定大小的表，每個處理函式一列：次數、累計 us、最長 us (array 預先配置，計時不配置記憶體)
+# blynk(b) / router(r) 登記 BlynkLib 的 @blynk.on 與 topics.Router 的 @mq.on 處理函式
+# enable(True) 把分派表中的函式換成計時包裝；enable(False) 換回原函式，停用時分派直接呼叫原函式，沒有額外成本
+# dump() 回傳 "名稱 次數/累計ms/最長us ..."，依累計時間由大到小
+
+import time
+from array import array
+
+try:
+    ticks_us, ticks_diff = time.ticks_us, time.ticks_diff
+except AttributeError:
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+
+class Prof:
+    def __init__(self, n=32):
+        self.names = []
+        self.fs = []
+        self.puts = []
+        self.cnt = array("L", [0] * n)
+        self.tot = array("L", [0] * n)
+        self.mx = array("L", [0] * n)
+        self.on = False
+
+    def add(self, name, f, put):
+        """登記一個處理函式；put(g) 把分派表中的函式換成 g。表滿回傳 -1"""
+        i = len(self.names)
+        if i == len(self.cnt):
+            return -1
+        self.names.append(name)
+        self.fs.append(f)
+        self.puts.append(put)
+        if self.on:
+            put(self._wrap(i))
+        return i
+
+    def blynk(self, b):
+        cb = b._cbks
+        for k in list(cb):
+            def put(g, k=k):
+                cb[k] = g
+            self.add(k, cb[k], put)
+
+    def router(self, r):
+        for t, hs in r.exact.items():
+            for j in range(len(hs)):
+                def put(g, hs=hs, j=j):
+                    hs[j] = (g, hs[j][1])
+                    r.cache = {}
+                self.add(t.decode(), hs[j][0], put)
+        for j in range(len(r._wild)):
+            def put(g, j=j):
+                t, h = r._wild[j]
+                r._wild[j] = (t, (g, h[1]))
+                r.trie = None
+                r.cache = {}
+            self.add(r._wild[j][0].decode(), r._wild[j][1][0], put)
+
+    def _wrap(self, i):
+        f = self.fs[i]
+        cnt, tot, mx = self.cnt, self.tot, self.mx
+
+        def w(*a, **k):
+            t = ticks_us()
+            r = f(*a, **k)
+            d = ticks_diff(ticks_us(), t)
+            cnt[i] += 1
+            tot[i] += d
+            if d > mx[i]:
+                mx[i] = d
+            return r
+        return w
+
+    def enable(self, on=True):
+        if on == self.on:
+            return
+        self.on = on
+        for i in range(len(self.names)):
+            self.puts[i](self._wrap(i) if on else self.fs[i])
+
+    def reset(self):
+        for i in range(len(self.cnt)):
+            self.cnt[i] = self.tot[i] = self.mx[i] = 0
+
+    def dump(self):
+        o = sorted(range(len(self.names)), key=lambda i: -self.tot[i])
+        return " ".join(["%s %d/%d.%d/%d" % (self.names[i], self.cnt[i], self.tot[i] // 1000,
+                                              self.tot[i] // 100 % 10, self.mx[i])
+                         for i in o if self.cnt[i]])
@@ -0,0 +1,127 @@
+# 馬達轉速漸變：to() 只記錄目標 duty，主迴圈 (或計時器) 呼叫 step(now) 逐步推進，不阻塞
+# 曲線：LINEAR 等速；SCURVE 平滑起止 (smoothstep)，起步電流較小
+# 漸變時間與變化量成正比 (0 -> 1023 需 ms 毫秒)；降速與停止立即生效
+# stagger：兩個通道都從 0 起步時，後者延後 stagger ms，避免 3.7 V 電池同時承受兩顆馬達的啟動電流而重開機
+
+import time
+
+try:
+    from machine import Timer
+except ImportError:
+    Timer = None
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+try:
+    ticks_ms, ticks_diff, ticks_add = time.ticks_ms, time.ticks_diff, time.ticks_add
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+
+LINEAR = const(0)
+SCURVE = const(1)
+
+# 通道欄位
+_PW = const(0)
+_CUR = const(1)
+_FROM = const(2)
+_TO = const(3)
+_T0 = const(4)
+_T = const(5)
+_ST = const(6)  # 0 閒置 1 等待起步 2 漸變中
+
+
+class Ramp:
+    def __init__(self, ms=400, profile=SCURVE, stagger=150):
+        self.ms = ms
+        self.profile = profile
+        self.stagger = stagger
+        self.ch = []
+        self.busy = 0
+        self.t_start = None
+        self.steps = 0
+        self._tim = None
+
+    def _find(self, pw):
+        for c in self.ch:
+            if c[_PW] is pw:
+                return c
+        c = [pw, 0, 0, 0, 0, 0, 0]
+        self.ch.append(c)
+        return c
+
+    def to(self, pw, d):
+        """設定 pw 的目標 duty；升速排入漸變，降速/停止立即寫出"""
+        c = self._find(pw)
+        c[_TO] = d
+        if d <= c[_CUR] or not self.ms:
+            if c[_ST]:
+                c[_ST] = 0
+                self.busy -= 1
+            c[_CUR] = d
+            pw.duty(d)
+            return
+        c[_FROM] = c[_CUR]
+        if not c[_ST]:
+            self.busy += 1
+        c[_ST] = 1
+
+    def step(self, now=None):
+        """推進所有通道，回傳仍在漸變的通道數"""
+        if not self.busy:
+            return 0
+        if now is None:
+            now = ticks_ms()
+        self.steps += 1
+        for c in self.ch:
+            st = c[_ST]
+            if not st:
+                continue
+            if st == 1:
+                t0 = now
+                if c[_FROM] == 0 and self.stagger:
+                    if self.t_start is not None and ticks_diff(ticks_add(self.t_start, self.stagger), now) > 0:
+                        t0 = ticks_add(self.t_start, self.stagger)
+                    self.t_start = t0
+                c[_T0] = t0
+                c[_T] = max(1, self.ms * (c[_TO] - c[_FROM]) // 1023)
+                c[_ST] = 2
+            el = ticks_diff(now, c[_T0])
+            if el < 0:
+                continue
+            if el >= c[_T]:
+                d = c[_TO]
+                c[_ST] = 0
+                self.busy -= 1
+            else:
+                x = (el << 10) // c[_T]
+                if self.profile == SCURVE:
+                    x = x * x * (3072 - 2 * x) >> 20
+                d = c[_FROM] + ((c[_TO] - c[_FROM]) * x >> 10)
+            if d != c[_CUR]:
+                c[_CUR] = d
+                c[_PW].duty(d)
+                # 寫出途中被 to() 停止 (急停計時器) 時，不留下舊的 duty
+                if c[_TO] < d:
+                    c[_CUR] = c[_TO]
+                    c[_PW].duty(c[_TO])
+        return self.busy
+
+    def start(self, period=10):
+        """改由硬體計時器推進 (不經主迴圈)"""
+        if not Timer:
+            return
+        try:
+            self._tim = Timer(-1)
+        except ValueError:
+            self._tim = Timer(1)
+        self._tim.init(period=period, mode=Timer.PERIODIC, callback=lambda t: self.step())
+
+    def stop(self):
+        if self._tim:
+            self._tim.deinit()
+            self._tim = None
@@ -0,0 +1,70 @@
+# 單一 select.poll 等待多個 socket (Blynk、MQTT)
+# 每個 slot 綁定一個 socket 與 handler(ev)；socket 換掉 (重連) 時 watch() 會重新註冊
+# run(ms) 最多等 ms 毫秒，只對有資料的 socket 呼叫 handler，回傳處理的事件數
+# MicroPython 的 poll() 回傳註冊的物件，CPython 回傳 fd，兩者都對應回 slot
+# idle 為最近一次 run() 在 poll() 裡等待的 us (不含 handler)，供迴圈負載統計扣除
+
+import select
+import time
+
+try:
+    ticks_us, ticks_diff = time.ticks_us, time.ticks_diff
+except AttributeError:
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+
+class Reactor:
+    def __init__(self, slots=2):
+        self.p = select.poll()
+        self.socks = [None] * slots
+        self.fds = [None] * slots
+        self.fns = [None] * slots
+        self.keys = {}
+        self.polls = 0
+        self.events = 0
+        self.idle = 0
+
+    def watch(self, slot, sock, fn):
+        self.fns[slot] = fn
+        old = self.socks[slot]
+        if sock is old:
+            return
+        if old is not None:
+            fd = self.fds[slot]
+            try:
+                self.p.unregister(old)
+            except Exception:
+                try:
+                    self.p.unregister(fd)
+                except Exception:
+                    pass
+            self.keys.pop(id(old), None)
+            self.keys.pop(fd, None)
+        self.socks[slot] = sock
+        self.fds[slot] = None
+        if sock is not None:
+            self.p.register(sock, select.POLLIN)
+            self.keys[id(sock)] = slot
+            try:
+                self.fds[slot] = fd = sock.fileno()
+                self.keys[fd] = slot
+            except (AttributeError, OSError):
+                pass
+
+    def run(self, ms):
+        self.polls += 1
+        n = 0
+        t = ticks_us()
+        evs = self.p.poll(ms)
+        self.idle = ticks_diff(ticks_us(), t)
+        for ev in evs:
+            obj = ev[0]
+            slot = self.keys.get(obj if isinstance(obj, int) else id(obj))
+            if slot is None:
+                continue
+            n += 1
+            if self.fns[slot](ev[1]) is False:
+                self.watch(slot, None, self.fns[slot])
+        self.events += n
+        return n
@@ -0,0 +1,134 @@
+# 發球事件 log：固定長度紀錄只附加寫入 flash，輪替 n 個檔案 (前綴0.bin .. 前綴{n-1}.bin)
+# 紀錄 REC (little endian)：序號 u32 (跨開機遞增)、時間 u32、事件 u8、上馬達 u8、下馬達 u8、
+#   伺服等級 u8、觸發延遲 u16 (ms，實際發球比預定晚多少)、附註 u16 (長按的 Vpin / 多球的第幾顆)
+# 時間：synced 為真 (app 以 NTP 校正 RTC 後設定) 時為 time.time() 秒；否則 ESP8266 的 RTC 每次上電從 2000-01-01 起算，
+#   改記開機後的秒數並在事件加上 UNSYNC 旗標 (同一次開機的紀錄以前面的 BOOT 紀錄為基準)
+# add() 只寫進 RAM 緩衝；緩衝滿 page bytes 或距第一筆未寫入超過 flush_ms (tick()) 才整批附加到檔案
+# 檔案達 size bytes 就換下一個檔案 (覆寫最舊的)；開機時讀每個檔案最後一筆，由最大序號的檔案接續
+# 檔尾有不完整紀錄 (寫入中斷電) 時換下一個檔案，不在錯位的位置繼續附加
+# 主機端讀取：pongBot/Host/shotlog_read.py
+
+import os
+import struct
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+try:
+    ticks_ms, ticks_diff, ticks_us = time.ticks_ms, time.ticks_diff, time.ticks_us
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+FMT = "<IIBBBBHH"
+REC = struct.calcsize(FMT)
+
+BOOT = const(0)
+SHOT = const(1)    # 長按發球
+DRILL = const(2)   # 多球訓練發球
+STOP = const(3)    # 急停
+UNSYNC = const(0x80)  # 事件旗標：時間為開機後秒數 (RTC 未校正)
+
+
+def name(prefix, i):
+    return "%s%d.bin" % (prefix, i)
+
+
+def fsize(path):
+    try:
+        return os.stat(path)[6]
+    except OSError:
+        return 0
+
+
+def last(path):
+    """檔案最後一筆完整紀錄的序號；空檔案或無法讀取回傳 -1"""
+    n = fsize(path) // REC
+    if not n:
+        return -1
+    try:
+        with open(path, "rb") as f:
+            f.seek((n - 1) * REC)
+            return struct.unpack(FMT, f.read(REC))[0]
+    except (OSError, ValueError):
+        return -1
+
+
+class Log:
+    def __init__(self, prefix="shots", n=4, size=16384, page=512, flush_ms=30000):
+        self.prefix = prefix
+        self.n = n
+        self.max = size // REC * REC
+        self.buf = bytearray(page // REC * REC)
+        self.mv = memoryview(self.buf)
+        self.pos = 0
+        self.flush_ms = flush_ms
+        self.t = None
+        self.writes = 0
+        self.w_us = 0
+        self.w_max = 0
+        self.i = 0
+        self.seq = 0
+        self.synced = False
+        best = -1
+        for i in range(n):
+            s = last(name(prefix, i))
+            if s > best:
+                best, self.i = s, i
+        self.seq = best + 1
+        self.size = fsize(name(prefix, self.i))
+        if self.size % REC or self.size >= self.max:
+            self._next()
+
+    def _next(self):
+        self.i = (self.i + 1) % self.n
+        open(name(self.prefix, self.i), "wb").close()
+        self.size = 0
+
+    def add(self, ev, ma=0, mb=0, lv=0, lat=0, x=0, now=None):
+        if self.synced:
+            t = int(time.time())
+        else:
+            t = ticks_ms() // 1000
+            ev |= UNSYNC
+        struct.pack_into(FMT, self.buf, self.pos, self.seq, t, ev, ma, mb, lv,
+                         max(0, min(0xFFFF, lat)), x & 0xFFFF)
+        self.seq += 1
+        if not self.pos:
+            self.t = ticks_ms() if now is None else now
+        self.pos += REC
+        if self.pos == len(self.buf):
+            self.flush()
+
+    def tick(self, now=None):
+        if self.pos and ticks_diff(ticks_ms() if now is None else now, self.t) >= self.flush_ms:
+            self.flush()
+
+    def flush(self):
+        """緩衝附加到目前的檔案；超出檔案大小的部分寫到下一個檔案"""
+        if not self.pos:
+            return
+        t = ticks_us()
+        j = 0
+        while j < self.pos:
+            k = min(self.pos - j, self.max - self.size)
+            with open(name(self.prefix, self.i), "ab") as f:
+                f.write(self.mv[j:j + k])
+            self.size += k
+            j += k
+            if self.size >= self.max:
+                self._next()
+        self.pos = 0
+        us = ticks_diff(ticks_us(), t)
+        self.writes += 1
+        self.w_us += us
+        if us > self.w_max:
+            self.w_max = us
+
+    def files(self):
+        """由舊到新的檔名"""
+        return [name(self.prefix, (self.i + 1 + j) % self.n) for j in range(self.n)]
@@ -0,0 +1,184 @@
+# 發球輪閉迴路轉速控制
+# Tach  - tach 腳位上升緣中斷只記錄脈衝間隔與次數 (小整數，ISR 內不配置記憶體)
+#         sample() 取出後換算 RPM，寫入環狀緩衝
+# Wheel - PID (加前饋) 以整數運算把輪子推到目標 RPM，每次 duty 變化量受 slew 限制 (避免電池壓降)
+#         連續 settle 次誤差與波動都在 tol% 內即視為穩定
+# Ctl   - 每 period ms 更新所有輪子，全部穩定時 ready=True，變化時呼叫 on_ready(ready)；發球後 kick()
+
+import time
+from array import array
+from machine import Pin
+
+try:
+    from machine import disable_irq, enable_irq
+except ImportError:
+    disable_irq = lambda: 0
+    enable_irq = lambda s=0: None
+
+try:
+    ticks_us, ticks_ms, ticks_diff = time.ticks_us, time.ticks_ms, time.ticks_diff
+except AttributeError:
+    ticks_us = lambda: int(time.time() * 1000000)
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+
+
+class Tach:
+    def __init__(self, pin, ppr=2, n=8, timeout=200):
+        self.ppr = ppr
+        self.n = n
+        self.timeout = timeout * 1000
+        self.cnt = 0
+        self.per = 0
+        self.t_last = ticks_us()
+        self.ring = array("l", [0] * n)
+        self.i = 0
+        self.rpm = 0
+        self.pin = Pin(pin, Pin.IN)
+        self.pin.irq(handler=self._isr, trigger=Pin.IRQ_RISING)
+
+    def _isr(self, p):
+        t = ticks_us()
+        self.per = ticks_diff(t, self.t_last)
+        self.t_last = t
+        self.cnt += 1
+
+    def sample(self):
+        st = disable_irq()
+        c = self.cnt
+        per = self.per
+        tl = self.t_last
+        self.cnt = 0
+        enable_irq(st)
+        if c and per > 0:
+            r = 60000000 // (per * self.ppr)
+        else:
+            # 沒有新脈衝：依距上次脈衝的時間給出上限，逾時歸零
+            since = ticks_diff(ticks_us(), tl)
+            r = 0 if since > self.timeout else min(self.rpm, 60000000 // (max(1, since) * self.ppr))
+        self.rpm = r
+        self.ring[self.i] = r
+        self.i = (self.i + 1) % self.n
+        return r
+
+    def last(self, k):
+        """最近 k 筆的 (平均, 最大-最小)"""
+        s = 0
+        lo = hi = self.rpm
+        j = self.i
+        for _ in range(k):
+            j = (j - 1) % self.n
+            v = self.ring[j]
+            s += v
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+        return s // k, hi - lo
+
+
+class Wheel:
+    def __init__(self, tach, pw, rpm_max=6000, kp=120, ki=400, kd=0, slew=80, tol=3, settle=3):
+        self.tach = tach
+        self.pw = pw
+        self.rpm_max = rpm_max
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.slew = slew
+        self.tol = tol
+        self.settle = settle
+        self.target = 0
+        self.duty = 0
+        self.acc = 0
+        self.e_last = 0
+        self.ok = 0
+        self.ctl = None
+
+    def set(self, rpm):
+        if rpm != self.target:
+            self.target = rpm
+            self.ok = 0
+            if self.ctl:
+                self.ctl.ready = False
+        if not rpm:
+            self.acc = 0
+            self.duty = 0
+            self.pw.duty(0)
+
+    def step(self, dt):
+        r = self.tach.sample()
+        if not self.target:
+            return True
+        e = self.target - r
+        # 起轉或發球後的大誤差交給比例項與 slew，只在接近目標時積分 (避免積分飽和造成過衝)
+        if abs(e) * 5 < self.target:
+            self.acc += e * dt
+        lim = 1023000000 // max(1, self.ki)
+        if self.acc > lim:
+            self.acc = lim
+        elif self.acc < -lim:
+            self.acc = -lim
+        u = self.target * 1023 // self.rpm_max
+        u += (self.kp * e + self.ki * self.acc // 1000 + self.kd * (e - self.e_last) * 1000 // max(1, dt)) // 1000
+        self.e_last = e
+        u = max(0, min(1023, u))
+        if u > self.duty + self.slew:
+            u = self.duty + self.slew
+        elif u < self.duty - self.slew:
+            u = self.duty - self.slew
+        if u != self.duty:
+            self.duty = u
+            self.pw.duty(u)
+        band = self.target * self.tol // 100
+        avg, spread = self.tach.last(self.settle)
+        if abs(e) <= band and abs(self.target - avg) <= band and spread <= band:
+            self.ok += 1
+        else:
+            self.ok = 0
+        return self.ok >= self.settle
+
+
+class Ctl:
+    def __init__(self, period=20, on_ready=None):
+        self.period = period
+        self.on_ready = on_ready
+        self.w = []
+        self.t = None
+        self.ready = False
+        self._sent = False
+
+    def add(self, w):
+        w.ctl = self
+        self.w.append(w)
+        return w
+
+    def kick(self):
+        """發球後呼叫：轉速必將下降，重新等待穩定"""
+        self.ready = False
+        for w in self.w:
+            w.ok = 0
+
+    def step(self, now=None):
+        if now is None:
+            now = ticks_ms()
+        if self.t is None:
+            self.t = now
+            return self.ready
+        dt = ticks_diff(now, self.t)
+        if dt < self.period:
+            return self.ready
+        self.t = now
+        on = False
+        ok = True
+        for w in self.w:
+            if not w.step(dt):
+                ok = False
+            if w.target:
+                on = True
+        r = self.ready = on and ok
+        if r != self._sent:
+            self._sent = r
+            if self.on_ready:
+                self.on_ready(r)
+        return r
@@ -0,0 +1,123 @@
+# 週期性遙測：固定欄位取樣到預先配置的陣列，對上一次送出的報告做差分編碼
+# 報告格式: ver(1) flags(1, bit0=關鍵幀) seq(u16) mask(u16, 有變化的欄位) + 每個變化欄位一個 zigzag varint
+# 關鍵幀送出所有欄位的絕對值；每 key_every 份報告送一次，讓遺失訊息後能重新同步
+# budget 為每分鐘位元組上限 (token bucket)，超出時略過本次，差分基準不變
+
+import time
+from array import array
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+try:
+    ticks_diff, ticks_add = time.ticks_diff, time.ticks_add
+except AttributeError:
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+
+VER = const(1)
+KEY = const(1)
+N = const(9)
+
+# 欄位索引
+F_MA = const(0)      # 馬達 A 面板值 0-100
+F_MB = const(1)      # 馬達 B 面板值 0-100
+F_RUN = const(2)     # bit0 馬達A bit1 馬達B bit2 伺服 bit3 急停
+F_LEVEL = const(3)   # 伺服等級 0-5
+F_SHOTS = const(4)   # 發球次數
+F_LOOP = const(5)    # 平均迴圈時間 (0.1 ms，不含等待網路/sleep 的空檔)
+F_LOOPMAX = const(6)  # 最大迴圈時間 (0.1 ms，同上)
+F_HEAP = const(7)    # gc.mem_free()
+F_UP = const(8)      # 開機秒數
+
+
+def zigzag(d):
+    return d << 1 if d >= 0 else ((-d) << 1) - 1
+
+
+class Telemetry:
+    def __init__(self, fill, send, interval=5000, budget=1200, key_every=12):
+        self.fill = fill
+        self.send = send
+        self.interval = interval
+        self.budget = budget
+        self.key_every = key_every
+        self.cur = array("l", [0] * N)
+        self.last = array("l", [0] * N)
+        self.buf = bytearray(6 + N * 5)
+        self.mv = memoryview(self.buf)
+        self.seq = 0
+        self.next = None
+        self.tokens = budget
+        self.t_tok = None
+        self.lsum = 0
+        self.lcnt = 0
+        self.lmax = 0
+        self.sent = 0
+        self.bytes = 0
+        self.skipped = 0
+
+    def loop(self, dt_us):
+        self.lsum += dt_us
+        self.lcnt += 1
+        if dt_us > self.lmax:
+            self.lmax = dt_us
+
+    def tick(self, now, dt_us=None):
+        if dt_us is not None:
+            self.loop(dt_us)
+        if self.next is None:
+            self.next = now
+            self.t_tok = now
+        if ticks_diff(now, self.next) < 0:
+            return 0
+        self.next = ticks_add(self.next, self.interval)
+        if ticks_diff(now, self.next) > 0:
+            self.next = ticks_add(now, self.interval)
+        self.tokens = min(self.budget, self.tokens + ticks_diff(now, self.t_tok) * self.budget // 60000)
+        self.t_tok = now
+        v = self.cur
+        self.fill(v)
+        if self.lcnt:
+            v[F_LOOP] = self.lsum // self.lcnt // 100
+            v[F_LOOPMAX] = self.lmax // 100
+        self.lsum = self.lcnt = self.lmax = 0
+        n = self.encode(self.seq % self.key_every == 0)
+        if n > self.tokens:
+            self.skipped += 1
+            return 0
+        self.tokens -= n
+        self.send(self.mv[:n])
+        for i in range(N):
+            self.last[i] = v[i]
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.sent += 1
+        self.bytes += n
+        return n
+
+    def encode(self, key):
+        b = self.buf
+        v = self.cur
+        last = self.last
+        b[0] = VER
+        b[1] = KEY if key else 0
+        b[2] = self.seq >> 8
+        b[3] = self.seq & 0xFF
+        mask = 0
+        j = 6
+        for i in range(N):
+            d = v[i] if key else v[i] - last[i]
+            if d or key:
+                mask |= 1 << i
+                z = zigzag(d)
+                while z > 0x7F:
+                    b[j] = (z & 0x7F) | 0x80
+                    z >>= 7
+                    j += 1
+                b[j] = z
+                j += 1
+        b[4] = mask >> 8
+        b[5] = mask & 0xFF
+        return j
@@ -0,0 +1,103 @@
+# MQTT topic 分派表，用法同 BlynkLib 的 @blynk.on
+#   mq = topics.Router()
+#   @mq.on(b"pongBot/stop")            精確 topic：dict 查表，不配置記憶體
+#   @mq.on(b"pongBot/drill/+", text=True)  萬用字元 (+ / #)：預先編成 trie，逐層比對
+#   @mq.on(b"pongBot/drill", qos=0)    動作指令用 QoS0：離線時 broker 不排隊，重連後不會重播舊指令
+# handler(topic, msg)；text=True 時才把 msg 解碼成去頭尾空白的 str (lazy)
+# handler 丟出的例外 (含解碼失敗) 在這裡吃掉並計數 (n_err / last_err)，不往上傳到 MQTT 連線：
+# QoS1 + 持久 session 下，讓連線斷掉會使 broker 重送同一則壞訊息，變成無限重連
+# 每個收過的 topic 的比對結果會快取 (最多 cache_max 個)，之後分派只需一次 dict 查表
+
+
+class Router:
+    def __init__(self, cache_max=64):
+        self.exact = {}
+        self.trie = None
+        self.cache = {}
+        self.cache_max = cache_max
+        self._wild = []
+        self.qos = {}
+        self.n_err = 0
+        self.last_err = None
+
+    def on(self, topic, f=None, text=False, qos=1):
+        if f:
+            self._add(topic, f, text, qos)
+        else:
+            def D(f):
+                self._add(topic, f, text, qos)
+                return f
+            return D
+
+    def _add(self, topic, f, text, qos=1):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        self.qos[topic] = min(qos, self.qos.get(topic, qos))
+        h = (f, text)
+        self.cache = {}
+        if b"+" in topic or b"#" in topic:
+            self._wild.append((topic, h))
+            self.trie = None
+        else:
+            self.exact.setdefault(topic, []).append(h)
+
+    def topics(self):
+        return list(self.exact) + [t for t, h in self._wild]
+
+    def subs(self):
+        """[(topic, qos)]，供訂閱用"""
+        return [(t, self.qos[t]) for t in self.topics()]
+
+    def compile(self):
+        # 節點: [子節點 dict, '+' 節點, '#' handlers, 本層結束 handlers]
+        root = [{}, None, [], []]
+        for topic, h in self._wild:
+            n = root
+            for p in topic.split(b"/"):
+                if p == b"#":
+                    n[2].append(h)
+                    n = None
+                    break
+                if p == b"+":
+                    if n[1] is None:
+                        n[1] = [{}, None, [], []]
+                    n = n[1]
+                else:
+                    n = n[0].setdefault(p, [{}, None, [], []])
+            if n is not None:
+                n[3].append(h)
+        self.trie = root
+
+    def match(self, topic):
+        """回傳符合 topic 的 handler 清單"""
+        out = list(self.exact.get(topic, ()))
+        if self._wild:
+            if self.trie is None:
+                self.compile()
+            self._walk(self.trie, topic.split(b"/"), 0, out)
+        return out
+
+    def _walk(self, n, parts, i, out):
+        out.extend(n[2])
+        if i == len(parts):
+            out.extend(n[3])
+            return
+        c = n[0].get(parts[i])
+        if c:
+            self._walk(c, parts, i + 1, out)
+        if n[1]:
+            self._walk(n[1], parts, i + 1, out)
+
+    def dispatch(self, topic, msg):
+        hs = self.cache.get(topic)
+        if hs is None:
+            hs = self.match(topic)
+            if len(self.cache) < self.cache_max:
+                self.cache[topic] = hs
+        for f, text in hs:
+            try:
+                f(topic, msg.decode("utf-8", "replace").strip() if text else msg)
+            except Exception as e:
+                self.n_err += 1
+                self.last_err = (topic, e)
+        return len(hs)
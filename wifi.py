@@ -0,0 +1,222 @@
+# WiFi 快速連線
+# 1. flash 上記錄了上次成功的 ssid/bssid/channel：直接指定 bssid 連線 (晶片略過掃描)，fast_ms 內沒連上才退回
+# 2. 掃描一次，已知網路依 RSSI 由強到弱嘗試
+# 每 poll ms 檢查 status()：拿到 IP 立即返回；找不到基地台、密碼錯誤、連線失敗立即換下一個
+# boot() 為給開機排程用的產生器：等待快取 bssid 關聯時 yield，失敗才退回阻塞的 join()
+#        (進入 join() 前先 yield 一次，讓排程先跑完不需要網路的階段，如硬體初始化)
+# last 記錄最後一次 join 的方式 ('up' 已連線 / 'cache' / 'scan' / None 失敗) 與耗時 ms
+# Link - 開機後的連線監督，主迴圈每圈 tick()：只讀 status() 與送出 connect()，從不等待或掃描
+#        斷線時依序嘗試快取的 bssid 與各已知 SSID (由晶片自行掃描)，整輪失敗後指數退避
+#        連上時呼叫 on_up() (之後每 retry ms 再呼叫一次，讓傳輸層補連)，斷線時呼叫 on_down()
+
+import time
+import network
+
+try:
+    from ubinascii import hexlify, unhexlify
+except ImportError:
+    from binascii import hexlify, unhexlify
+
+try:
+    ticks_ms, ticks_diff, ticks_add, sleep_ms = time.ticks_ms, time.ticks_diff, time.ticks_add, time.sleep_ms
+except AttributeError:
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    ticks_add = lambda a, b: a + b
+    sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+FAIL = (network.STAT_NO_AP_FOUND, network.STAT_WRONG_PASSWORD, network.STAT_CONNECT_FAIL)
+
+last = (None, 0)
+
+
+def load(path):
+    try:
+        with open(path) as f:
+            s, b, c = f.read().split("\t")
+        return s, unhexlify(b), int(c)
+    except (OSError, ValueError):
+        return None
+
+
+def save(path, ssid, bssid, ch):
+    try:
+        with open(path, "w") as f:
+            f.write("%s\t%s\t%d" % (ssid, hexlify(bssid).decode(), ch))
+    except OSError:
+        pass
+
+
+def wait(w, ms, poll=50):
+    t0 = ticks_ms()
+    while ticks_diff(ticks_ms(), t0) < ms:
+        s = w.status()
+        if s == network.STAT_GOT_IP:
+            return True
+        if s in FAIL:
+            return False
+        sleep_ms(poll)
+    return False
+
+
+def join(w, nets, path="wifi.dat", timeout=10000, fast_ms=3000, poll=50, cached=True):
+    global last
+    t0 = ticks_ms()
+    w.active(True)
+    if w.isconnected():
+        last = ("up", 0)
+        return True
+    pw = {}
+    for n in nets:
+        pw[n["ssid"]] = n["password"]
+    c = load(path)
+    if cached and c and c[0] in pw:
+        w.connect(c[0], pw[c[0]], bssid=c[1])
+        if wait(w, fast_ms, poll):
+            last = ("cache", ticks_diff(ticks_ms(), t0))
+            return True
+        w.disconnect()
+    found = []
+    for r in w.scan():
+        s = r[0].decode()
+        if s in pw:
+            found.append((r[3], s, r[1], r[2]))
+    found.sort(reverse=True)
+    for rssi, s, b, ch in found:
+        w.connect(s, pw[s], bssid=b)
+        if wait(w, timeout, poll):
+            if not c or c[1] != b:
+                save(path, s, b, ch)
+            last = ("scan", ticks_diff(ticks_ms(), t0))
+            return True
+        w.disconnect()
+    last = (None, ticks_diff(ticks_ms(), t0))
+    return False
+
+
+def boot(w, nets, path="wifi.dat", timeout=10000, fast_ms=3000, poll=50):
+    global last
+    t0 = ticks_ms()
+    w.active(True)
+    c = load(path)
+    if c and not w.isconnected():
+        for n in nets:
+            if n["ssid"] != c[0]:
+                continue
+            w.connect(c[0], n["password"], bssid=c[1])
+            while ticks_diff(ticks_ms(), t0) < fast_ms:
+                s = w.status()
+                if s == network.STAT_GOT_IP:
+                    last = ("cache", ticks_diff(ticks_ms(), t0))
+                    return True
+                if s in FAIL:
+                    break
+                yield
+            w.disconnect()
+            break
+    yield
+    return join(w, nets, path, timeout, fast_ms, poll, False)
+
+
+class Link:
+    def __init__(self, w, nets, path="wifi.dat", on_up=None, on_down=None, check=500, poll=50,
+                 fast_ms=3000, join_ms=8000, backoff=1000, backoff_max=8000, retry=5000):
+        self.w = w
+        self.path = path
+        self.on_up = on_up
+        self.on_down = on_down
+        self.check = check
+        self.poll = poll
+        self.fast_ms = fast_ms
+        self.join_ms = join_ms
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry = retry
+        self.pw = {}
+        self.nets = []
+        for n in nets:
+            self.pw[n["ssid"]] = n["password"]
+            self.nets.append(n["ssid"])
+        self.up = w.isconnected()
+        self.q = []
+        self.cur = None
+        self.t = self.t_cb = ticks_ms()
+        self.deadline = self.t
+        self.delay = backoff
+        self.t_down = self.t_up = None
+        self.recover = self.recover_max = 0
+        self.drops = self.joins = self.tries = 0
+
+    def _plan(self):
+        q = []
+        c = load(self.path)
+        if c and c[0] in self.pw:
+            q.append((c[0], c[1]))
+        for s in self.nets:
+            q.append((s, None))
+        return q
+
+    def _start(self, now):
+        self.cur = self.q.pop(0)
+        s, b = self.cur
+        self.w.disconnect()
+        if b:
+            self.w.connect(s, self.pw[s], bssid=b)
+        else:
+            self.w.connect(s, self.pw[s])
+        self.tries += 1
+        self.deadline = ticks_add(now, self.fast_ms if b else self.join_ms)
+
+    def _up(self, now):
+        self.up = True
+        self.joins += 1
+        self.q = []
+        self.cur = None
+        self.delay = self.backoff
+        self.t_up = self.t_cb = now
+        if self.t_down is not None:
+            self.recover = ticks_diff(now, self.t_down)
+            self.recover_max = max(self.recover_max, self.recover)
+        if self.on_up:
+            self.on_up()
+
+    def tick(self, now=None):
+        """回傳連線狀態；不到下次檢查時間只比較一次時間就返回"""
+        if now is None:
+            now = ticks_ms()
+        if ticks_diff(now, self.t) < 0:
+            return self.up
+        s = self.w.status()
+        if self.up:
+            self.t = ticks_add(now, self.check)
+            if s == network.STAT_GOT_IP:
+                if self.on_up and ticks_diff(now, self.t_cb) >= self.retry:
+                    self.t_cb = now
+                    self.on_up()
+                return True
+            self.up = False
+            self.drops += 1
+            self.t_down = now
+            self.q = []
+            self.cur = None
+            if self.on_down:
+                self.on_down()
+        elif s == network.STAT_GOT_IP:
+            self._up(now)
+            self.t = ticks_add(now, self.check)
+            return True
+        self.t = ticks_add(now, self.poll)
+        if self.cur and s not in FAIL and ticks_diff(now, self.deadline) < 0:
+            return False
+        if not self.q:
+            if self.cur:
+                # 整輪都失敗：退避後重來
+                self.cur = None
+                self.t = ticks_add(now, self.delay)
+                self.delay = min(self.delay * 2, self.backoff_max)
+                return False
+            self.q = self._plan()
+            if not self.q:
+                return False
+        self._start(now)
+        return False